@@ -0,0 +1,147 @@
+"""Compare stdlib JSON with the SDK codec and streaming parser on a big snapshot.
+
+Usage: python benchmarks/bench_codec.py [--objects 50000] [--repeat 5] [--json]
+"""
+
+from pathlib import Path
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+
+SDK_DIR = Path(__file__).resolve().parents[1] / "python-sdk"
+sys.path.insert(0, str(SDK_DIR))
+
+from novablox import STREAM_CHUNK_SIZE, default_codec, iter_json_array  # noqa: E402
+
+OBJECTS_PATH = ("introspection", "scene", "objects")
+CLASSES = ["Part", "MeshPart", "WedgePart", "Model", "Folder", "SpawnLocation"]
+MATERIALS = ["Plastic", "Concrete", "Wood", "Metal", "Neon", "Grass"]
+
+
+def synthetic_snapshot(count: int, seed: int = 7) -> dict:
+    rng = random.Random(seed)
+    objects = []
+    for index in range(count):
+        row = index // 100
+        objects.append(
+            {
+                "name": f"Tile{index}",
+                "class_name": rng.choice(CLASSES),
+                "path": f"Workspace.Level.Row{row}.Tile{index}",
+                "parent_path": f"Workspace.Level.Row{row}",
+                "position": [round(rng.uniform(-2000, 2000), 3), round(rng.uniform(0, 300), 3), round(rng.uniform(-2000, 2000), 3)],
+                "size": [4, 1, 4],
+                "material": rng.choice(MATERIALS),
+                "color": [rng.randrange(256), rng.randrange(256), rng.randrange(256)],
+                "anchored": True,
+                "can_collide": rng.random() > 0.2,
+            }
+        )
+    return {
+        "status": "ok",
+        "introspection": {
+            "state": "succeeded",
+            "scene": {
+                "root": "Workspace",
+                "object_count": count,
+                "truncated": False,
+                "class_counts": {name: count // len(CLASSES) for name in CLASSES},
+                "objects": objects,
+            },
+        },
+    }
+
+
+def command_batch(count: int) -> dict:
+    return {
+        "commands": [
+            {
+                "route": "/bridge/scene/set-transform",
+                "category": "scene",
+                "action": "set-transform",
+                "payload": {"target_path": f"Workspace/Level/Tile{index}", "position": [index * 4.0, 1.0, 0.0]},
+                "idempotency_key": f"bench-{index}",
+            }
+            for index in range(count)
+        ]
+    }
+
+
+def best_of(repeat: int, func) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def chunked(raw: bytes):
+    return (raw[start : start + STREAM_CHUNK_SIZE] for start in range(0, len(raw), STREAM_CHUNK_SIZE))
+
+
+def stream_count(raw: bytes) -> int:
+    count = 0
+    for _obj in iter_json_array(chunked(raw), OBJECTS_PATH):
+        count += 1
+    return count
+
+
+def run(objects: int, repeat: int) -> dict:
+    codec = default_codec()
+    snapshot = synthetic_snapshot(objects)
+    raw = json.dumps(snapshot).encode("utf-8")
+    batch = command_batch(1000)
+    assert stream_count(raw) == objects
+
+    return {
+        "objects": objects,
+        "snapshot_bytes": len(raw),
+        "codec": codec.name,
+        "decode_stdlib_s": best_of(repeat, lambda: json.loads(raw)),
+        "decode_codec_s": best_of(repeat, lambda: codec.loads(raw)),
+        "stream_s": best_of(repeat, lambda: stream_count(raw)),
+        "encode_batch_stdlib_s": best_of(repeat, lambda: json.dumps(batch).encode("utf-8")),
+        "encode_batch_codec_s": best_of(repeat, lambda: codec.dumps(batch)),
+        "decode_stdlib_peak_bytes": peak_memory(lambda: json.loads(raw)),
+        "stream_peak_bytes": peak_memory(lambda: stream_count(raw)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--objects", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="print raw results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.objects, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    mb = 1024 * 1024
+    print(f"snapshot: {results['objects']} objects, {results['snapshot_bytes'] / mb:.1f} MiB, codec={results['codec']}")
+    print(f"decode   stdlib json.loads   {results['decode_stdlib_s'] * 1000:8.1f} ms")
+    print(f"decode   {results['codec']:<18} {results['decode_codec_s'] * 1000:8.1f} ms")
+    print(f"stream   iter_json_array     {results['stream_s'] * 1000:8.1f} ms")
+    print(f"encode   1000-command batch  {results['encode_batch_stdlib_s'] * 1000:8.2f} ms stdlib / "
+          f"{results['encode_batch_codec_s'] * 1000:.2f} ms {results['codec']}")
+    print(f"peak mem json.loads          {results['decode_stdlib_peak_bytes'] / mb:8.1f} MiB")
+    print(f"peak mem iter_json_array     {results['stream_peak_bytes'] / mb:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"use strict";
+
+// Measures CommandStore hot paths at different retention sizes: enqueue
+// (which also prunes once retention is full), dispatch of a page of work and
+// an empty poll, which is what an idle plugin does every tick. All three
+// should stay flat as the number of retained commands grows. With --persist
+// the store writes to a temporary directory using that persistence mode, so
+// journal and whole-snapshot costs can be compared.
+//
+// Usage: node benchmarks/bench_command_store.js [--quick] [--sizes 1000,100000]
+//   [--persist journal|snapshot] [--json out.json]
+
+const fs = require("fs");
+const os = require("os");
+const path = require("path");
+
+const { CommandStore } = require("../server/command_store");
+
+const PAGE = 20;
+const SAMPLES = 2000;
+
+function parseArgs(argv) {
+  const args = { quick: false, sizes: null, persist: null, json: null };
+  for (let i = 0; i < argv.length; i += 1) {
+    if (argv[i] === "--quick") {
+      args.quick = true;
+    } else if (argv[i] === "--sizes") {
+      args.sizes = argv[(i += 1)].split(",").map(Number);
+    } else if (argv[i] === "--persist") {
+      args.persist = argv[(i += 1)];
+    } else if (argv[i] === "--json") {
+      args.json = argv[(i += 1)];
+    }
+  }
+  if (!args.sizes) {
+    args.sizes = args.quick ? [1000, 10000] : [1000, 10000, 100000];
+  }
+  return args;
+}
+
+function percentile(samples, fraction) {
+  const ordered = samples.slice().sort((a, b) => a - b);
+  const index = Math.min(
+    ordered.length - 1,
+    Math.max(0, Math.round(fraction * (ordered.length - 1))),
+  );
+  return ordered[index];
+}
+
+function micros(start) {
+  return Number(process.hrtime.bigint() - start) / 1000;
+}
+
+function command(index, options = {}) {
+  return Object.assign(
+    {
+      route: "/bridge/scene/spawn-object",
+      category: "scene",
+      action: "spawn-object",
+      payload: { name: `Part${index}`, position: [index, 5, 0] },
+      priority: index % 7 === 0 ? 2 : 0,
+      idempotencyKey: `bench-${index}`,
+    },
+    options,
+  );
+}
+
+function complete(store, commands) {
+  for (const cmd of commands) {
+    store.result({
+      command_id: cmd.id,
+      dispatch_token: cmd.dispatch_token,
+      ok: true,
+      status: "ok",
+      execution_ms: 1,
+    });
+  }
+}
+
+// Fills the store to `retained` commands: most completed, a backlog still
+// queued, some dispatched with live leases and some with far-off deadlines.
+function fill(store, retained) {
+  const backlog = Math.max(PAGE * 4, Math.floor(retained / 20));
+  let index = 0;
+  while (index < retained - backlog) {
+    for (let i = 0; i < 100 && index < retained - backlog; i += 1) {
+      store.enqueueWithMeta(
+        command(index, {
+          expiresAt:
+            index % 3 === 0 ? new Date(Date.now() + 3_600_000) : undefined,
+        }),
+      );
+      index += 1;
+    }
+    const pulled = store.dispatch("bench-fill", 100);
+    // Every fifth page leaves one command dispatched, holding a live lease.
+    complete(store, index % 500 === 0 ? pulled.slice(1) : pulled);
+  }
+  for (; index < retained; index += 1) {
+    store.enqueueWithMeta(command(index));
+  }
+  return index;
+}
+
+function measure(retained, persist) {
+  const tempDir = persist
+    ? fs.mkdtempSync(path.join(os.tmpdir(), "novablox-bench-"))
+    : null;
+  const store = new CommandStore({
+    leaseMs: 120000,
+    maxRetention: retained,
+    snapshotPath: tempDir ? path.join(tempDir, "queue-snapshot.json") : null,
+    persistence: persist || undefined,
+  });
+  const fillStart = process.hrtime.bigint();
+  let next = fill(store, retained);
+  const fillMs = micros(fillStart) / 1000;
+
+  const enqueue = [];
+  const dispatch = [];
+  for (let sample = 0; sample < SAMPLES; sample += 1) {
+    for (let i = 0; i < PAGE; i += 1) {
+      const start = process.hrtime.bigint();
+      store.enqueueWithMeta(command(next));
+      enqueue.push(micros(start));
+      next += 1;
+    }
+    const start = process.hrtime.bigint();
+    const pulled = store.dispatch("bench", PAGE);
+    dispatch.push(micros(start));
+    complete(store, pulled);
+  }
+
+  // Drain the backlog so the pollers below find nothing to do.
+  for (let pulled = store.dispatch("bench", 100); pulled.length > 0; ) {
+    complete(store, pulled);
+    pulled = store.dispatch("bench", 100);
+  }
+  const idle = [];
+  for (let sample = 0; sample < SAMPLES; sample += 1) {
+    const start = process.hrtime.bigint();
+    store.dispatch(`poller-${sample % 4}`, PAGE);
+    idle.push(micros(start));
+  }
+  store.close();
+  if (tempDir) {
+    fs.rmSync(tempDir, { recursive: true, force: true });
+  }
+
+  return {
+    retained: store.commands.size,
+    fill_ms: Math.round(fillMs),
+    enqueue_p50_us: percentile(enqueue, 0.5),
+    enqueue_p99_us: percentile(enqueue, 0.99),
+    dispatch_p50_us: percentile(dispatch, 0.5),
+    dispatch_p99_us: percentile(dispatch, 0.99),
+    poll_empty_p50_us: percentile(idle, 0.5),
+    poll_empty_p99_us: percentile(idle, 0.99),
+  };
+}
+
+function main() {
+  const args = parseArgs(process.argv.slice(2));
+  const results = args.sizes.map((size) => measure(size, args.persist));
+  const columns = Object.keys(results[0]);
+  console.log(columns.join("\t"));
+  for (const row of results) {
+    console.log(
+      columns
+        .map((column) =>
+          Number.isInteger(row[column]) ? row[column] : row[column].toFixed(1),
+        )
+        .join("\t"),
+    );
+  }
+  if (args.json) {
+    fs.writeFileSync(
+      path.resolve(args.json),
+      JSON.stringify(
+        { node: process.version, persist: args.persist, results },
+        null,
+        2,
+      ),
+    );
+  }
+}
+
+main();
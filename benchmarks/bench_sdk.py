@@ -0,0 +1,314 @@
+"""Benchmark SDK and MCP hot paths against the in-process mock bridge.
+
+Covers single-call latency, enqueue throughput (single vs bulk vs asyncio),
+pull/report round trips, snapshot fetch/decode time and memory, and MCP tool
+dispatch overhead. Results can be written as JSON and compared against a
+stored baseline; any metric worse than the tolerance fails the run.
+
+Usage: python benchmarks/bench_sdk.py [--quick] [--json out.json]
+       [--baseline PATH] [--update-baseline] [--tolerance 0.5]
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "python-sdk"))
+sys.path.insert(0, str(ROOT / "examples" / "mock"))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from bench_codec import run as run_codec  # noqa: E402
+from mock_bridge import MockBridge  # noqa: E402
+from novablox import AsyncNovaBlox, NovaBlox  # noqa: E402
+
+BASELINE_PATH = ROOT / "benchmarks" / "baseline.json"
+QUICK_BASELINE_PATH = ROOT / "benchmarks" / "baseline-quick.json"
+DEFAULT_TOLERANCE = 0.5
+MIB = 1024 * 1024
+# Each measurement is repeated and the best round kept, which filters out
+# scheduler noise on shared machines.
+ROUNDS = 3
+
+# name -> (unit, direction); "lower" metrics regress when they grow.
+METRICS: Dict[str, tuple] = {
+    "latency_health_p50_ms": ("ms", "lower"),
+    "latency_health_p95_ms": ("ms", "lower"),
+    "latency_spawn_part_p50_ms": ("ms", "lower"),
+    "latency_spawn_part_p95_ms": ("ms", "lower"),
+    "latency_command_status_p50_ms": ("ms", "lower"),
+    "enqueue_single_per_s": ("cmd/s", "higher"),
+    "enqueue_bulk_per_s": ("cmd/s", "higher"),
+    "enqueue_async_per_s": ("cmd/s", "higher"),
+    "roundtrip_single_per_s": ("cmd/s", "higher"),
+    "roundtrip_batch_per_s": ("cmd/s", "higher"),
+    "snapshot_fetch_ms": ("ms", "lower"),
+    "snapshot_stream_ms": ("ms", "lower"),
+    "snapshot_decode_ms": ("ms", "lower"),
+    "snapshot_decode_peak_mib": ("MiB", "lower"),
+    "snapshot_stream_peak_mib": ("MiB", "lower"),
+    "mcp_tool_overhead_us": ("us", "lower"),
+}
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def latencies(count: int, func: Callable[[], Any]) -> List[float]:
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def best_percentiles(calls: int, func: Callable[[], Any]) -> tuple:
+    """(p50, p95) in ms from the round with the lowest median."""
+    rounds = [latencies(calls, func) for _ in range(ROUNDS)]
+    best = min(rounds, key=statistics.median)
+    return statistics.median(best), percentile(best, 0.95)
+
+
+def best_rate(count: int, func: Callable[[], Any], setup: Optional[Callable[[], Any]] = None) -> float:
+    best = 0.0
+    for _ in range(ROUNDS):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        best = max(best, count / (time.perf_counter() - start))
+    return best
+
+
+def bench_latency(client: NovaBlox, calls: int) -> Dict[str, float]:
+    latencies(50, client.health)  # warm the pool
+    health = best_percentiles(calls, client.health)
+    spawn = best_percentiles(calls, lambda: client.spawn_part(name="BenchPart", position=[0, 5, 0]))
+    command_id = client.spawn_part(name="BenchProbe")["command_id"]
+    status = best_percentiles(calls, lambda: client.command_status(command_id))
+    return {
+        "latency_health_p50_ms": health[0],
+        "latency_health_p95_ms": health[1],
+        "latency_spawn_part_p50_ms": spawn[0],
+        "latency_spawn_part_p95_ms": spawn[1],
+        "latency_command_status_p50_ms": status[0],
+    }
+
+
+def bench_enqueue(port: int, commands: int) -> Dict[str, float]:
+    client = NovaBlox(port=port)
+    positions = [[index * 4.0, 1.0, 0.0] for index in range(commands)]
+
+    def single() -> None:
+        for position in positions:
+            client.spawn_part(name="Single", position=position)
+
+    async def fan_out() -> None:
+        async with AsyncNovaBlox(port=port) as async_client:
+            await asyncio.gather(*(async_client.spawn_part(name="Async", position=p) for p in positions))
+
+    results = {
+        "enqueue_single_per_s": best_rate(commands, single),
+        "enqueue_bulk_per_s": best_rate(commands, lambda: client.spawn_parts(positions, name="Bulk")),
+        "enqueue_async_per_s": best_rate(commands, lambda: asyncio.run(fan_out())),
+    }
+    client.close()
+    return results
+
+
+def bench_roundtrip(port: int, commands: int) -> Dict[str, float]:
+    client = NovaBlox(port=port)
+    positions = [[index, 0.0, 0.0] for index in range(commands)]
+
+    def drain(limit: int, batch: bool) -> None:
+        done = 0
+        while done < commands:
+            pulled = client.pull_commands("bench-worker", limit=limit)["commands"]
+            if not pulled:
+                raise RuntimeError(f"queue ran dry after {done} of {commands} commands")
+            done += len(pulled)
+            if batch:
+                client.report_results(
+                    [
+                        {"command_id": c["id"], "dispatch_token": c["dispatch_token"], "ok": True, "result": {}}
+                        for c in pulled
+                    ]
+                )
+                continue
+            for c in pulled:
+                client.report_result(command_id=c["id"], dispatch_token=c["dispatch_token"], ok=True, result={})
+
+    def refill() -> None:
+        client.spawn_parts(positions, name="RoundTrip")
+
+    single = best_rate(commands, lambda: drain(1, batch=False), refill)
+    batched = best_rate(commands, lambda: drain(100, batch=True), refill)
+    client.close()
+    return {"roundtrip_single_per_s": single, "roundtrip_batch_per_s": batched}
+
+
+def bench_snapshot(port: int, objects: int, repeat: int) -> Dict[str, float]:
+    client = NovaBlox(port=port)
+    queued = client.introspect_scene(max_objects=objects)
+    client.wait_for([queued["command_id"]], timeout=60)
+    fetch = min(latencies(repeat, lambda: client.scene_introspection(include_objects=True)))
+    stream = min(latencies(repeat, lambda: sum(1 for _ in client.iter_scene_objects())))
+    client.close()
+    codec = run_codec(objects, repeat)
+    return {
+        "snapshot_fetch_ms": fetch,
+        "snapshot_stream_ms": stream,
+        "snapshot_decode_ms": codec["decode_codec_s"] * 1000.0,
+        "snapshot_decode_peak_mib": codec["decode_stdlib_peak_bytes"] / MIB,
+        "snapshot_stream_peak_mib": codec["stream_peak_bytes"] / MIB,
+    }
+
+
+def bench_mcp(port: int, calls: int) -> Dict[str, Any]:
+    """Per-call cost of an MCP tool over calling the SDK directly."""
+    os.environ["ROBLOXBRIDGE_HOST"] = "127.0.0.1"
+    os.environ["ROBLOXBRIDGE_PORT"] = str(port)
+    sys.path.insert(0, str(ROOT / "mcp-server"))
+    try:
+        import novablox_mcp
+    except (ImportError, SystemExit) as exc:
+        return {"skipped": f"novablox_mcp unavailable: {str(exc).splitlines()[0]}"}
+
+    async def measure() -> float:
+        server = novablox_mcp.mcp
+        client = novablox_mcp.client
+        for _ in range(20):
+            await server.call_tool("roblox_health", {})
+        direct = via_tool = float("inf")
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            for _ in range(calls):
+                await client.health()
+            direct = min(direct, time.perf_counter() - start)
+            start = time.perf_counter()
+            for _ in range(calls):
+                await server.call_tool("roblox_health", {})
+            via_tool = min(via_tool, time.perf_counter() - start)
+        await client.close()
+        return max(0.0, (via_tool - direct) / calls * 1e6)
+
+    return {"mcp_tool_overhead_us": asyncio.run(measure())}
+
+
+def run(quick: bool = False) -> Dict[str, Any]:
+    calls = 200 if quick else 1000
+    commands = 500 if quick else 3000
+    objects = 5000 if quick else 50000
+    repeat = 2 if quick else 5
+    metrics: Dict[str, float] = {}
+    skipped: Dict[str, str] = {}
+    with MockBridge(auto_complete=False, scene_objects=objects) as bridge:
+        client = NovaBlox(port=bridge.port)
+        metrics.update(bench_latency(client, calls))
+        client.close()
+        metrics.update(bench_enqueue(bridge.port, commands))
+    with MockBridge() as bridge:
+        metrics.update(bench_roundtrip(bridge.port, commands))
+    with MockBridge(auto_complete=True, scene_objects=objects) as bridge:
+        metrics.update(bench_snapshot(bridge.port, objects, repeat))
+        mcp = bench_mcp(bridge.port, calls)
+    if "skipped" in mcp:
+        skipped["mcp_tool_overhead_us"] = mcp["skipped"]
+    else:
+        metrics.update(mcp)
+    return {
+        "schema": 1,
+        "quick": quick,
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "metrics": {
+            name: {"value": round(value, 4), "unit": METRICS[name][0], "better": METRICS[name][1]}
+            for name, value in metrics.items()
+        },
+        "skipped": skipped,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Return one message per metric that regressed past `tolerance`."""
+    regressions = []
+    current = results["metrics"]
+    for name, base in baseline.get("metrics", {}).items():
+        if name not in current or not base.get("value"):
+            continue
+        value = current[name]["value"]
+        change = value / base["value"] - 1.0
+        # Slowdown as a ratio either way, so a tolerance of 1.0 fails at half
+        # the baseline throughput as well as at twice its latency.
+        slowdown = change if base["better"] == "lower" else (base["value"] / value - 1.0 if value else float("inf"))
+        if slowdown > tolerance:
+            regressions.append(f"{name}: {value:.4g} vs baseline {base['value']:.4g} ({change:+.0%})")
+    return regressions
+
+
+def report(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    base_metrics = (baseline or {}).get("metrics", {})
+    for name, metric in results["metrics"].items():
+        line = f"{name:<32} {metric['value']:>12.3f} {metric['unit']:<6}"
+        base = base_metrics.get(name)
+        if base and base.get("value"):
+            line += f" baseline {base['value']:>10.3f} ({metric['value'] / base['value'] - 1.0:+.0%})"
+        print(line)
+    for name, reason in results["skipped"].items():
+        print(f"{name:<32} skipped: {reason}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="smaller workloads, for CI smoke runs")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    parser.add_argument(
+        "--baseline",
+        metavar="PATH",
+        help=f"default: {BASELINE_PATH.name}, or {QUICK_BASELINE_PATH.name} with --quick",
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    results = run(quick=args.quick)
+    baseline_path = Path(args.baseline or (QUICK_BASELINE_PATH if args.quick else BASELINE_PATH))
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else None
+    if baseline is not None and baseline.get("quick") != results["quick"]:
+        print(f"baseline {baseline_path} was recorded with quick={baseline.get('quick')}; not comparing")
+        baseline = None
+
+    if args.json == "-":
+        print(json.dumps(results, indent=2))
+    else:
+        report(results, baseline)
+        if args.json:
+            Path(args.json).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.update_baseline:
+        baseline_path.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"baseline written to {baseline_path}")
+        return
+    if baseline is None:
+        return
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1111 @@
+"""Pure-Python stand-in for the NovaBlox bridge, for offline load tests and benchmarks.
+
+Speaks the core `/bridge/*` queue protocol of `server/index.js`: command
+enqueue (single, batch and the helper routes), dispatch with leases and
+`dispatch_token`, results and results/batch, requeue/cancel, the SSE stream,
+stats, and scene introspection with ETags. Auth, the planner and uploads are
+left out. With `auto_complete` a built-in executor plays the Studio plugin;
+its introspection results are synthetic scenes of `scene_objects` parts.
+
+Usage: python examples/mock/mock_bridge.py [--port 30010] [--auto-complete] [--scene-objects 5000]
+
+In-process:
+
+    with MockBridge(auto_complete=True) as bridge:
+        client = NovaBlox(port=bridge.port)
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import asyncio
+import base64
+import heapq
+import json
+import math
+import random
+import sys
+import threading
+import time
+import urllib.parse
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+SDK_DIR = Path(__file__).resolve().parents[2] / "python-sdk"
+sys.path.insert(0, str(SDK_DIR))
+
+from novablox import COMMAND_ROUTES  # noqa: E402
+
+VERSION = "1.1.0-mock"
+TERMINAL_STATUSES = ("succeeded", "failed", "canceled", "expired")
+SSE_HEARTBEAT_SECONDS = 15.0
+MAX_COMMAND_WAIT_MS = 25000
+MAX_STATUS_IDS = 1000
+CLASSES = ["Part", "MeshPart", "WedgePart", "Model", "Folder", "SpawnLocation"]
+MATERIALS = ["Plastic", "Concrete", "Wood", "Metal", "Neon", "Grass"]
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    411: "Length Required",
+    429: "Too Many Requests",
+}
+
+
+def _iso(ts: Optional[float] = None) -> str:
+    moment = datetime.fromtimestamp(time.time() if ts is None else ts, tz=timezone.utc)
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _parse_iso(value: Any) -> Optional[float]:
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _clamp_int(value: Any, default: int, low: int, high: int) -> int:
+    try:
+        parsed = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(low, min(high, parsed))
+
+
+def _idempotency_key(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    key = str(value).strip()
+    return key[:256] or None
+
+
+def synthetic_scene(count: int, *, seed: int = 7, root: str = "Workspace") -> Dict[str, Any]:
+    """Scene snapshot shaped like the plugin's introspect-scene result."""
+    rng = random.Random(seed)
+    objects = []
+    class_counts: Dict[str, int] = {}
+    for index in range(count):
+        row = index // 100
+        class_name = rng.choice(CLASSES)
+        class_counts[class_name] = class_counts.get(class_name, 0) + 1
+        objects.append(
+            {
+                "name": f"Tile{index}",
+                "class_name": class_name,
+                "path": f"{root}.Level.Row{row}.Tile{index}",
+                "parent_path": f"{root}.Level.Row{row}",
+                "position": [round(rng.uniform(-2000, 2000), 3), round(rng.uniform(0, 300), 3), round(rng.uniform(-2000, 2000), 3)],
+                "size": [4, 1, 4],
+                "material": rng.choice(MATERIALS),
+                "color": [rng.randrange(256), rng.randrange(256), rng.randrange(256)],
+                "anchored": True,
+                "can_collide": rng.random() > 0.2,
+            }
+        )
+    return {
+        "root": root,
+        "roots": [root],
+        "traversal_scope": "workspace",
+        "include_selection": True,
+        "include_non_workspace": False,
+        "requested_services": [],
+        "resolved_services": [],
+        "unresolved_services": [],
+        "object_count": count,
+        "max_objects": max(1, count),
+        "truncated": False,
+        "collected_at": _iso(),
+        "objects": objects,
+        "class_counts": class_counts,
+        "materials": sorted({obj["material"] for obj in objects}),
+        "selection": [],
+    }
+
+
+class MockCommandQueue:
+    """In-memory equivalent of server/command_store.js (without persistence)."""
+
+    def __init__(self, *, lease_ms: int = 120000, max_retention: int = 10000) -> None:
+        self.lease_ms = lease_ms
+        self.max_retention = max_retention
+        self.commands: Dict[str, Dict[str, Any]] = {}
+        self.idempotency: Dict[str, str] = {}
+        # (-priority, sequence, id); entries for commands that left "queued" are skipped.
+        self._pending: List[Tuple[int, int, str]] = []
+        self._queued_count = 0
+        self._dispatched: Set[str] = set()
+        self._sequence = 0
+        self.subscribers: Set[asyncio.Queue] = set()
+        # Long-poll pulls parked until something is queued.
+        self.waiters: Set[asyncio.Event] = set()
+        self.stats: Dict[str, int] = {
+            "queued_total": 0,
+            "dispatched_total": 0,
+            "succeeded_total": 0,
+            "failed_total": 0,
+            "canceled_total": 0,
+            "expired_total": 0,
+            "requeued_total": 0,
+            "rejected_results_total": 0,
+        }
+        self.queued_event: Optional[asyncio.Event] = None
+
+    def enqueue(self, spec: Dict[str, Any]) -> Tuple[Dict[str, Any], bool]:
+        key = _idempotency_key(spec.get("idempotency_key"))
+        if key and key in self.idempotency:
+            existing = self.commands.get(self.idempotency[key])
+            if existing is not None:
+                return existing, True
+        now = time.time()
+        command = {
+            "id": str(uuid.uuid4()),
+            "route": spec["route"],
+            "category": spec.get("category") or "generic",
+            "action": spec.get("action") or "command",
+            "payload": spec.get("payload") or {},
+            "priority": _clamp_int(spec.get("priority"), 0, -100, 100),
+            "metadata": spec.get("metadata") or {},
+            "status": "queued",
+            "attempts": 0,
+            "created_at": _iso(now),
+            "updated_at": _iso(now),
+            "dispatched_at": None,
+            "dispatch_token": None,
+            "lease_expires_at": None,
+            "completed_at": None,
+            "delivered_to": None,
+            "result": None,
+            "error": None,
+            "execution_ms": None,
+            "idempotency_key": key,
+            "expires_at": spec.get("expires_at"),
+        }
+        self.commands[command["id"]] = command
+        if key:
+            self.idempotency[key] = command["id"]
+        self._push_pending(command)
+        self.stats["queued_total"] += 1
+        self._prune()
+        self._broadcast(
+            "queued",
+            {
+                "id": command["id"],
+                "category": command["category"],
+                "action": command["action"],
+                "route": command["route"],
+                "created_at": command["created_at"],
+                "expires_at": command["expires_at"],
+                "deduped": False,
+            },
+        )
+        return command, False
+
+    def dispatch(self, client_id: str, limit: int) -> List[Dict[str, Any]]:
+        self._requeue_expired()
+        now = time.time()
+        out = []
+        while self._pending and len(out) < limit:
+            _, _, command_id = heapq.heappop(self._pending)
+            command = self.commands.get(command_id)
+            if command is None or command["status"] != "queued":
+                continue
+            self._queued_count -= 1
+            if self._is_expired(command, now):
+                self._expire(command, now)
+                continue
+            command.update(
+                status="dispatched",
+                delivered_to=client_id,
+                dispatched_at=_iso(now),
+                dispatch_token=str(uuid.uuid4()),
+                lease_expires_at=_iso(now + self.lease_ms / 1000.0),
+                updated_at=_iso(now),
+            )
+            command["attempts"] += 1
+            self._dispatched.add(command_id)
+            self.stats["dispatched_total"] += 1
+            out.append(command)
+        if out:
+            self._broadcast("dispatched", {"client_id": client_id, "count": len(out), "ids": [c["id"] for c in out]})
+        return out
+
+    def result(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        command_id = body.get("command_id") or body.get("id")
+        if not command_id:
+            return self._reject("command_id is required")
+        command = self.commands.get(command_id)
+        if command is None:
+            return self._reject(f"command {command_id} not found")
+        if command["status"] in ("succeeded", "failed"):
+            return {"ok": True, "duplicate": True, "command": command}
+        if command["status"] in ("canceled", "expired"):
+            return self._reject(f"command {command_id} is {command['status']}")
+        if command["status"] != "dispatched":
+            return self._reject(f"command {command_id} is not in dispatched state")
+        token = str(body.get("dispatch_token") or "").strip() or None
+        if command["dispatch_token"] and not token:
+            return self._reject(f"dispatch_token is required for command {command_id}")
+        if command["dispatch_token"] and token != command["dispatch_token"]:
+            return self._reject(f"dispatch token mismatch for command {command_id}")
+
+        now = time.time()
+        succeeded = body.get("ok") is True or str(body.get("status") or "").lower() == "ok"
+        command["result"] = body.get("result")
+        command["error"] = body.get("error")
+        execution_ms = body.get("execution_ms")
+        if isinstance(execution_ms, (int, float)) and execution_ms >= 0:
+            command["execution_ms"] = round(float(execution_ms), 3)
+        command["updated_at"] = _iso(now)
+        self._dispatched.discard(command_id)
+        if body.get("requeue") is True:
+            command.update(status="queued", delivered_to=None, dispatch_token=None, lease_expires_at=None)
+            self._push_pending(command)
+            self.stats["requeued_total"] += 1
+            self._broadcast("requeued", {"id": command_id, "attempts": command["attempts"]})
+            return {"ok": True, "command": command}
+        command.update(
+            status="succeeded" if succeeded else "failed",
+            completed_at=_iso(now),
+            lease_expires_at=None,
+            dispatch_token=None,
+        )
+        self.stats["succeeded_total" if succeeded else "failed_total"] += 1
+        self._broadcast(
+            command["status"],
+            {"id": command_id, "error": command["error"], "execution_ms": command["execution_ms"]},
+        )
+        return {"ok": True, "command": command}
+
+    def cancel(self, command_id: str) -> Dict[str, Any]:
+        command = self.commands.get(command_id)
+        if command is None:
+            return {"ok": False, "error": f"command {command_id} not found"}
+        if command["status"] in TERMINAL_STATUSES:
+            return {"ok": False, "error": f"command {command_id} already completed"}
+        if command["status"] == "queued":
+            self._queued_count -= 1
+        self._dispatched.discard(command_id)
+        now = _iso()
+        command.update(status="canceled", updated_at=now, completed_at=now, dispatch_token=None, lease_expires_at=None)
+        self.stats["canceled_total"] += 1
+        self._broadcast("canceled", {"id": command_id})
+        return {"ok": True, "command": command}
+
+    def requeue(self, command_id: str) -> Dict[str, Any]:
+        command = self.commands.get(command_id)
+        if command is None:
+            return {"ok": False, "error": f"command {command_id} not found"}
+        if command["status"] == "queued":
+            return {"ok": True, "command": command}
+        if command["status"] in ("canceled", "expired"):
+            return {"ok": False, "error": f"command {command_id} is {command['status']}"}
+        self._dispatched.discard(command_id)
+        now = time.time()
+        if self._is_expired(command, now):
+            self._expire(command, now)
+            return {"ok": False, "error": f"command {command_id} is expired"}
+        command.update(
+            status="queued",
+            updated_at=_iso(now),
+            delivered_to=None,
+            dispatch_token=None,
+            lease_expires_at=None,
+            error=None,
+        )
+        self._push_pending(command)
+        self.stats["requeued_total"] += 1
+        self._broadcast("requeued", {"id": command_id})
+        return {"ok": True, "command": command}
+
+    def statuses(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """`POST /bridge/commands/status`: many ids, optional projection."""
+        ids = list(dict.fromkeys(str(item).strip() for item in body.get("ids") or [] if str(item or "").strip()))
+        if not ids:
+            raise _HTTPError(400, "ids[] is required")
+        if len(ids) > MAX_STATUS_IDS:
+            raise _HTTPError(400, f"at most {MAX_STATUS_IDS} ids per request")
+        fields = body.get("fields")
+        if isinstance(fields, str):
+            fields = fields.split(",")
+        fields = [str(field).strip() for field in fields or [] if str(field).strip()]
+        found = [self.commands[cid] for cid in ids if cid in self.commands]
+        if fields:
+            found = [{"id": c["id"], **{field: c[field] for field in fields if field in c}} for c in found]
+        return {
+            "status": "ok",
+            "count": len(found),
+            "commands": found,
+            "missing": [cid for cid in ids if cid not in self.commands],
+        }
+
+    def recent(self, query: Dict[str, str]) -> Dict[str, Any]:
+        """One page of `listCommands`: filters, (created_at, id) cursor, projection."""
+        limit = _clamp_int(query.get("limit"), 50, 1, 500)
+        ascending = query.get("order") == "asc"
+        after = None
+        if query.get("cursor"):
+            try:
+                padded = query["cursor"] + "=" * (-len(query["cursor"]) % 4)
+                after = tuple(json.loads(base64.urlsafe_b64decode(padded)))
+            except ValueError:
+                raise _HTTPError(400, "invalid cursor") from None
+        bounds = []
+        for name in ("since", "until"):
+            value = str(query.get(name) or "").strip()
+            ts = (int(value) / 1000.0 if value.isdigit() else _parse_iso(value)) if value else None
+            if value and ts is None:
+                raise _HTTPError(400, "invalid since/until; expected ISO datetime or epoch ms")
+            bounds.append(None if ts is None else _iso(ts))
+        since, until = bounds
+        filters = {
+            key: {item.strip() for item in query[key].split(",") if item.strip()} or None
+            for key in ("status", "action", "category")
+            if query.get(key)
+        }
+        rows = []
+        for command in self.commands.values():
+            if any(command[key] not in values for key, values in filters.items() if values):
+                continue
+            if (since and command["created_at"] < since) or (until and command["created_at"] >= until):
+                continue
+            position = (command["created_at"], command["id"])
+            if after is not None and (position <= after if ascending else position >= after):
+                continue
+            rows.append(command)
+        rows.sort(key=lambda command: (command["created_at"], command["id"]), reverse=not ascending)
+        page = rows[:limit]
+        fields = [field.strip() for field in (query.get("fields") or "").split(",") if field.strip()]
+        if fields:
+            page = [{"id": c["id"], **{field: c[field] for field in fields if field in c}} for c in page]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            raw = json.dumps([last["created_at"], last["id"]], separators=(",", ":")).encode()
+            next_cursor = base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+        return {"status": "ok", "count": len(page), "commands": page, "next_cursor": next_cursor}
+
+    def summary(self) -> Dict[str, Any]:
+        self._requeue_expired()
+        by_status = dict.fromkeys(("queued", "dispatched") + TERMINAL_STATUSES, 0)
+        timings = []
+        for command in self.commands.values():
+            by_status[command["status"]] = by_status.get(command["status"], 0) + 1
+            if command["execution_ms"] is not None:
+                timings.append(command["execution_ms"])
+        return {
+            "total_commands": len(self.commands),
+            "pending_count": self._queued_count,
+            "by_status": by_status,
+            "counters": dict(self.stats),
+            "sse_clients": len(self.subscribers),
+            "lease_ms": self.lease_ms,
+            "average_execution_ms": round(sum(timings) / len(timings), 2) if timings else None,
+            "persisted_snapshot": None,
+        }
+
+    def _push_pending(self, command: Dict[str, Any]) -> None:
+        self._sequence += 1
+        heapq.heappush(self._pending, (-command["priority"], self._sequence, command["id"]))
+        self._queued_count += 1
+        if self.queued_event is not None:
+            self.queued_event.set()
+        for waiter in self.waiters:
+            waiter.set()
+
+    def _requeue_expired(self) -> None:
+        now = time.time()
+        for command_id in list(self._dispatched):
+            command = self.commands[command_id]
+            lease = _parse_iso(command["lease_expires_at"])
+            if lease is None or lease > now:
+                continue
+            self._dispatched.discard(command_id)
+            if self._is_expired(command, now):
+                self._expire(command, now)
+                continue
+            command.update(status="queued", updated_at=_iso(now), lease_expires_at=None, dispatch_token=None, delivered_to=None)
+            self._push_pending(command)
+            self.stats["requeued_total"] += 1
+            self._broadcast("lease-expired", {"id": command_id, "attempts": command["attempts"]})
+
+    def _is_expired(self, command: Dict[str, Any], now: float) -> bool:
+        expires = _parse_iso(command["expires_at"]) if command["expires_at"] else None
+        return expires is not None and expires <= now
+
+    def _expire(self, command: Dict[str, Any], now: float) -> None:
+        command.update(
+            status="expired",
+            updated_at=_iso(now),
+            completed_at=_iso(now),
+            lease_expires_at=None,
+            dispatch_token=None,
+            delivered_to=None,
+        )
+        command["error"] = command["error"] or "command expired before execution"
+        self.stats["expired_total"] += 1
+        self._broadcast("expired", {"id": command["id"], "expires_at": command["expires_at"]})
+
+    def _reject(self, error: str) -> Dict[str, Any]:
+        self.stats["rejected_results_total"] += 1
+        return {"ok": False, "error": error}
+
+    def _prune(self) -> None:
+        excess = len(self.commands) - self.max_retention
+        if excess <= 0:
+            return
+        for command_id in [cid for cid, cmd in self.commands.items() if cmd["status"] in TERMINAL_STATUSES][:excess]:
+            command = self.commands.pop(command_id)
+            if command["idempotency_key"]:
+                self.idempotency.pop(command["idempotency_key"], None)
+
+    def _broadcast(self, event: str, payload: Dict[str, Any]) -> None:
+        if not self.subscribers:
+            return
+        frame = f"event: {event}\ndata: {json.dumps(payload)}\n\n".encode("utf-8")
+        for queue in self.subscribers:
+            queue.put_nowait(frame)
+
+
+def _chunk(data: bytes) -> bytes:
+    return b"%x\r\n%s\r\n" % (len(data), data)
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, error: str) -> None:
+        super().__init__(error)
+        self.status = status
+        self.error = error
+
+
+# Use await start()/stop() inside a running loop, or the context manager /
+# start_in_thread() to run it on a background thread.
+class MockBridge:
+    """asyncio HTTP/1.1 server over a MockCommandQueue."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        *,
+        lease_ms: int = 120000,
+        auto_complete: bool = False,
+        execution_delay: float = 0.0,
+        scene_objects: int = 200,
+        seed: int = 7,
+        rate_limit_max: int = 0,
+        rate_limit_window_ms: int = 60000,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.queue = MockCommandQueue(lease_ms=lease_ms)
+        self.auto_complete = auto_complete
+        self.execution_delay = execution_delay
+        self.scene_objects = scene_objects
+        self.seed = seed
+        self.rate_limit_max = rate_limit_max
+        self.rate_limit_window_ms = rate_limit_window_ms
+        self.requests = 0
+        self._window: Optional[Tuple[int, float]] = None
+        self._etag_epoch = format(int(time.time() * 1000), "x")
+        self._introspection: Dict[str, Any] = {
+            "state": "idle",
+            "queued_command_id": None,
+            "last_command_id": None,
+            "queued_at": None,
+            "updated_at": None,
+            "error": None,
+            "revision": 0,
+            "scene": None,
+        }
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    async def start(self) -> "MockBridge":
+        self._loop = asyncio.get_running_loop()
+        self.queue.queued_event = asyncio.Event()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        if self.auto_complete:
+            self._spawn(self._executor())
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        assert self._server is not None
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    def start_in_thread(self) -> "MockBridge":
+        ready = threading.Event()
+        failure: List[BaseException] = []
+
+        def run() -> None:
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(self.start())
+            except BaseException as exc:  # surfaced to the caller below
+                failure.append(exc)
+                ready.set()
+                loop.close()
+                return
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="novablox-mock-bridge", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if failure:
+            raise failure[0]
+        return self
+
+    def close(self) -> None:
+        if self._thread is None or self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._thread = None
+
+    def __enter__(self) -> "MockBridge":
+        return self.start_in_thread()
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    def _spawn(self, coro: Any) -> asyncio.Task:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            self._tasks.add(task)
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    return
+                method, target, headers, body = request
+                if target.split("?", 1)[0] == "/bridge/stream" and method == "GET":
+                    await self._stream(writer, target, headers)
+                    return
+                status, extra, payload = self._dispatch(method, target, headers, body)
+                if payload is not None and payload.get("wait_ms") and not payload.get("commands"):
+                    payload = await self._long_poll(target, payload)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, extra, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            return
+        finally:
+            if task is not None:
+                self._tasks.discard(task)
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) < 2:
+            return None
+        headers: Dict[str, str] = {}
+        while True:
+            header = await reader.readline()
+            if header in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get("content-length") or 0)
+        body = await reader.readexactly(length) if length else b""
+        return parts[0].upper(), parts[1], headers, body
+
+    def _write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        extra: Dict[str, str],
+        payload: Optional[Dict[str, Any]],
+        keep_alive: bool,
+    ) -> None:
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {REASONS.get(status, 'OK')}", f"X-NovaBlox-Version: {VERSION}"]
+        if payload is not None:
+            lines.append("Content-Type: application/json; charset=utf-8")
+        lines.append(f"Content-Length: {len(body)}")
+        lines.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        lines.extend(f"{key}: {value}" for key, value in extra.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+
+    def _dispatch(
+        self, method: str, target: str, headers: Dict[str, str], raw: bytes
+    ) -> Tuple[int, Dict[str, str], Optional[Dict[str, Any]]]:
+        self.requests += 1
+        parsed = urllib.parse.urlsplit(target)
+        route = parsed.path
+        query = {key: values[-1] for key, values in urllib.parse.parse_qs(parsed.query).items()}
+        extra: Dict[str, str] = {}
+        if self.rate_limit_max > 0 and route != "/bridge/health":
+            blocked = self._consume_rate_limit(extra)
+            if blocked is not None:
+                return 429, extra, blocked
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            return 400, extra, {"status": "error", "error": "invalid JSON body"}
+        if not isinstance(body, dict):
+            body = {}
+        try:
+            status, payload = self._route(method, route, query, headers, body, extra)
+        except _HTTPError as exc:
+            return exc.status, extra, {"status": "error", "error": exc.error}
+        return status, extra, payload
+
+    def _consume_rate_limit(self, extra: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        # Same fixed window as server/rate_limiter.js, for one shared key.
+        now = time.time()
+        if self._window is None or self._window[1] <= now:
+            self._window = (0, now + self.rate_limit_window_ms / 1000.0)
+        count, reset_at = self._window
+        count += 1
+        self._window = (count, reset_at)
+        extra["X-RateLimit-Limit"] = str(self.rate_limit_max)
+        extra["X-RateLimit-Remaining"] = str(max(0, self.rate_limit_max - count))
+        extra["X-RateLimit-Reset"] = str(max(0, math.ceil(reset_at - now)))
+        if count <= self.rate_limit_max:
+            return None
+        retry_after_ms = max(0, int((reset_at - now) * 1000))
+        extra["Retry-After"] = str(max(1, math.ceil(retry_after_ms / 1000)))
+        return {"status": "error", "error": "rate limit exceeded", "retry_after_ms": retry_after_ms}
+
+    def _route(
+        self,
+        method: str,
+        route: str,
+        query: Dict[str, str],
+        headers: Dict[str, str],
+        body: Dict[str, Any],
+        extra: Dict[str, str],
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        queue = self.queue
+        if method == "GET":
+            if route == "/bridge/health":
+                return 200, {
+                    "status": "ok",
+                    "product": "NovaBlox",
+                    "service": "RobloxStudioBridge",
+                    "version": VERSION,
+                    "queue": queue.summary(),
+                    "introspection": {
+                        "state": self._introspection["state"],
+                        "updated_at": self._introspection["updated_at"],
+                        "last_command_id": self._introspection["last_command_id"],
+                        "object_count": (self._introspection["scene"] or {}).get("object_count", 0),
+                    },
+                }
+            if route == "/bridge/stats":
+                return 200, {"status": "ok", "stats": queue.summary()}
+            if route == "/bridge/commands":
+                client_id = query.get("client_id") or headers.get("x-client-id") or "roblox-studio"
+                commands = queue.dispatch(client_id, _clamp_int(query.get("limit"), 20, 1, 100))
+                return 200, {
+                    "status": "ok",
+                    "client_id": client_id,
+                    "count": len(commands),
+                    "commands": commands,
+                    "wait_ms": _clamp_int(query.get("wait_ms"), 0, 0, MAX_COMMAND_WAIT_MS),
+                }
+            if route == "/bridge/commands/recent":
+                return 200, queue.recent(query)
+            if route.startswith("/bridge/commands/"):
+                command = queue.commands.get(route.rsplit("/", 1)[1])
+                if command is None:
+                    raise _HTTPError(404, "not found")
+                return 200, {"status": "ok", "command": command}
+            if route == "/bridge/introspection/scene":
+                return self._introspection_snapshot(query, headers, extra)
+        elif method == "POST":
+            if route == "/bridge/command":
+                if not body.get("route") or not body.get("action"):
+                    raise _HTTPError(400, "route and action are required")
+                command, deduped = queue.enqueue(
+                    {
+                        "route": body["route"],
+                        "category": body.get("category") or "custom",
+                        "action": body["action"],
+                        "payload": body.get("payload"),
+                        "priority": body.get("priority"),
+                        "metadata": body.get("metadata"),
+                        "idempotency_key": headers.get("x-idempotency-key") or body.get("idempotency_key"),
+                        "expires_at": self._expires_at(body),
+                    }
+                )
+                return 200, {
+                    "status": "queued",
+                    "command_id": command["id"],
+                    "deduped": deduped,
+                    "idempotency_key": command["idempotency_key"],
+                    "expires_at": command["expires_at"],
+                    "command": command,
+                }
+            if route == "/bridge/commands/batch":
+                return 200, self._enqueue_batch(body)
+            if route == "/bridge/commands/status":
+                return 200, queue.statuses(body)
+            if route == "/bridge/results":
+                outcome = queue.result(body)
+                if not outcome["ok"]:
+                    raise _HTTPError(400, outcome["error"])
+                self._on_result(outcome["command"])
+                return 200, self._result_view(outcome)
+            if route == "/bridge/results/batch":
+                return 200, self._result_batch(body)
+            if route.startswith("/bridge/commands/") and route.endswith(("/requeue", "/cancel")):
+                _, _, command_id, verb = route.rsplit("/", 3)
+                outcome = queue.requeue(command_id) if verb == "requeue" else queue.cancel(command_id)
+                if not outcome["ok"]:
+                    raise _HTTPError(400, outcome["error"])
+                return 200, {"status": "ok", "command": outcome["command"]}
+            if route == "/bridge/introspection/scene":
+                payload = {
+                    "max_objects": _clamp_int(body.get("max_objects"), 2000, 1, 100000),
+                    "include_selection": body.get("include_selection") is not False,
+                    "include_non_workspace": body.get("include_non_workspace") is True,
+                    "traversal_scope": body.get("traversal_scope") or "workspace",
+                    "services": body.get("services") or [],
+                }
+                response = self._queue_route(route, "introspection", "introspect-scene", headers, body, payload)
+                state = self._introspection
+                state.update(state="queued", queued_command_id=response["command_id"], queued_at=response["queued_at"])
+                state["revision"] += 1
+                return 200, response
+            spec = COMMAND_ROUTES.get(route[len("/bridge") :]) if route.startswith("/bridge/") else None
+            if spec is not None:
+                category, action = spec
+                return 200, self._queue_route(route, category, action, headers, body, {})
+        raise _HTTPError(404, f"no mock route for {method} {route}")
+
+    def _expires_at(self, body: Dict[str, Any]) -> Optional[str]:
+        if body.get("expires_at"):
+            parsed = _parse_iso(body["expires_at"])
+            if parsed is None:
+                raise _HTTPError(400, "invalid expires_at; expected ISO datetime")
+            return _iso(parsed)
+        if body.get("expires_in_ms") not in (None, ""):
+            try:
+                delay_ms = float(body["expires_in_ms"])
+            except (TypeError, ValueError):
+                raise _HTTPError(400, "invalid expires_in_ms; expected positive integer") from None
+            if delay_ms <= 0:
+                raise _HTTPError(400, "invalid expires_in_ms; expected positive integer")
+            return _iso(time.time() + delay_ms / 1000.0)
+        return None
+
+    def _queue_route(
+        self,
+        route: str,
+        category: str,
+        action: str,
+        headers: Dict[str, str],
+        body: Dict[str, Any],
+        extra_payload: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        metadata = dict(body.get("metadata") or {})
+        metadata.update(requested_by=headers.get("x-request-by") or "api", client_hint=body.get("client_hint"))
+        command, deduped = self.queue.enqueue(
+            {
+                "route": route,
+                "category": category,
+                "action": action,
+                "payload": {**body, **extra_payload},
+                "priority": body.get("priority"),
+                "metadata": metadata,
+                "idempotency_key": headers.get("x-idempotency-key")
+                or body.get("idempotency_key")
+                or metadata.get("idempotency_key"),
+                "expires_at": self._expires_at(body),
+            }
+        )
+        return {
+            "status": "queued",
+            "command_id": command["id"],
+            "category": command["category"],
+            "action": command["action"],
+            "route": command["route"],
+            "queued_at": command["created_at"],
+            "deduped": deduped,
+            "idempotency_key": command["idempotency_key"],
+            "expires_at": command["expires_at"],
+        }
+
+    def _enqueue_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        commands = body.get("commands") if isinstance(body.get("commands"), list) else []
+        if not commands:
+            raise _HTTPError(400, "commands[] is required")
+        specs = []
+        for index, item in enumerate(commands):
+            item = item if isinstance(item, dict) else {}
+            try:
+                expires_at = self._expires_at(item)
+            except _HTTPError as exc:
+                raise _HTTPError(400, f"{exc.error} (commands[{index}])") from None
+            specs.append(
+                {
+                    "route": item.get("route") or "/bridge/custom",
+                    "category": item.get("category") or "custom",
+                    "action": item.get("action") or "command",
+                    "payload": item.get("payload"),
+                    "priority": item.get("priority"),
+                    "metadata": item.get("metadata"),
+                    "idempotency_key": item.get("idempotency_key"),
+                    "expires_at": expires_at,
+                }
+            )
+        queued = [self.queue.enqueue(spec) for spec in specs]
+        return {
+            "status": "queued",
+            "count": len(queued),
+            "deduped_count": sum(1 for _, deduped in queued if deduped),
+            "command_ids": [command["id"] for command, _ in queued],
+        }
+
+    def _result_view(self, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        command = outcome["command"]
+        return {
+            "status": "ok",
+            "duplicate": outcome.get("duplicate") is True,
+            "command_id": command["id"],
+            "command_status": command["status"],
+            "updated_at": command["updated_at"],
+            "execution_ms": command["execution_ms"],
+        }
+
+    def _result_batch(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        results = body.get("results") if isinstance(body.get("results"), list) else []
+        if not results:
+            raise _HTTPError(400, "results[] is required")
+        views = []
+        errors = duplicates = 0
+        for index, item in enumerate(results):
+            item = item if isinstance(item, dict) else {}
+            outcome = self.queue.result(item)
+            if not outcome["ok"]:
+                errors += 1
+                views.append(
+                    {"index": index, "ok": False, "command_id": item.get("command_id") or item.get("id"), "error": outcome["error"]}
+                )
+                continue
+            self._on_result(outcome["command"])
+            duplicates += 1 if outcome.get("duplicate") else 0
+            view = self._result_view(outcome)
+            view.pop("status")
+            views.append({"index": index, "ok": True, **view})
+        return {
+            "status": "ok" if errors == 0 else "partial",
+            "total_count": len(results),
+            "success_count": len(results) - errors,
+            "error_count": errors,
+            "duplicate_count": duplicates,
+            "results": views,
+        }
+
+    def _on_result(self, command: Dict[str, Any]) -> None:
+        if command["action"] != "introspect-scene":
+            return
+        state = self._introspection
+        state.update(last_command_id=command["id"], queued_command_id=None, updated_at=command["updated_at"])
+        state["revision"] += 1
+        result = command.get("result")
+        if command["status"] == "succeeded" and isinstance(result, dict):
+            state.update(state="succeeded", scene=result, error=None)
+        elif command["status"] == "succeeded":
+            state.update(state="failed", error="introspection result missing scene snapshot payload")
+        elif command["status"] == "failed":
+            state.update(state="failed", error=str(command.get("error") or "unknown error"))
+
+    def _introspection_snapshot(
+        self, query: Dict[str, str], headers: Dict[str, str], extra: Dict[str, str]
+    ) -> Tuple[int, Optional[Dict[str, Any]]]:
+        state = self._introspection
+        include_objects = str(query.get("include_objects", "true")).strip().lower() != "false"
+        etag = f'"scene-{self._etag_epoch}-{state["revision"]}-{"full" if include_objects else "summary"}"'
+        extra.update({"ETag": etag, "Cache-Control": "no-cache"})
+        candidates = [value.strip().replace("W/", "", 1) for value in headers.get("if-none-match", "").split(",")]
+        if "*" in candidates or etag in candidates:
+            return 304, None
+        scene = state["scene"]
+        if scene is not None and not include_objects:
+            scene = {key: value for key, value in scene.items() if key != "objects"}
+            scene["sample_objects"] = state["scene"].get("objects", [])[:60]
+        return 200, {
+            "status": "ok",
+            "introspection": {
+                "state": state["state"],
+                "queued_command_id": state["queued_command_id"],
+                "last_command_id": state["last_command_id"],
+                "queued_at": state["queued_at"],
+                "updated_at": state["updated_at"],
+                "error": state["error"],
+                "revision": state["revision"],
+                "etag": etag,
+                "scene": scene,
+            },
+        }
+
+    async def _long_poll(self, target: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Holds an empty GET /bridge/commands until work is queued or wait_ms passes."""
+        query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(target).query))
+        limit = _clamp_int(query.get("limit"), 20, 1, 100)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + payload["wait_ms"] / 1000.0
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return payload
+            waiter = asyncio.Event()
+            self.queue.waiters.add(waiter)
+            try:
+                await asyncio.wait_for(waiter.wait(), remaining)
+            except asyncio.TimeoutError:
+                return payload
+            finally:
+                self.queue.waiters.discard(waiter)
+            commands = self.queue.dispatch(payload["client_id"], limit)
+            if commands:
+                return dict(payload, count=len(commands), commands=commands)
+
+    async def _stream(self, writer: asyncio.StreamWriter, target: str, headers: Dict[str, str]) -> None:
+        query = dict(urllib.parse.parse_qsl(urllib.parse.urlsplit(target).query))
+        client_id = query.get("client_id") or headers.get("x-client-id") or "roblox-studio"
+        # Chunked like Node's streamed responses, so clients keep owning the socket.
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache, no-transform\r\n"
+            b"Connection: keep-alive\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        connected = f"event: connected\ndata: {json.dumps({'client_id': client_id, 'ts': _iso()})}\n\n"
+        writer.write(_chunk(connected.encode("utf-8")))
+        frames: asyncio.Queue = asyncio.Queue()
+        self.queue.subscribers.add(frames)
+        try:
+            await writer.drain()
+            while True:
+                try:
+                    frame = await asyncio.wait_for(frames.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    frame = f"event: heartbeat\ndata: {json.dumps({'ts': _iso()})}\n\n".encode("utf-8")
+                writer.write(_chunk(frame))
+                await writer.drain()
+        finally:
+            self.queue.subscribers.discard(frames)
+
+    async def _executor(self) -> None:
+        """Plays the Studio plugin: dispatches queued commands and reports results."""
+        event = self.queue.queued_event
+        assert event is not None
+        while True:
+            await event.wait()
+            event.clear()
+            while True:
+                commands = self.queue.dispatch("mock-executor", 100)
+                if not commands:
+                    break
+                if self.execution_delay:
+                    await asyncio.sleep(self.execution_delay * len(commands))
+                for command in commands:
+                    outcome = self.queue.result(
+                        {
+                            "command_id": command["id"],
+                            "dispatch_token": command["dispatch_token"],
+                            "ok": True,
+                            "result": self._execute(command),
+                            "execution_ms": self.execution_delay * 1000.0,
+                        }
+                    )
+                    if outcome["ok"]:
+                        self._on_result(outcome["command"])
+                # Let request handlers run between dispatch rounds.
+                await asyncio.sleep(0)
+
+    def _execute(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        payload = command.get("payload") or {}
+        action = command["action"]
+        if action == "introspect-scene":
+            count = min(self.scene_objects, _clamp_int(payload.get("max_objects"), self.scene_objects, 1, 100000))
+            scene = synthetic_scene(count, seed=self.seed)
+            scene["truncated"] = count < self.scene_objects
+            return scene
+        if action == "spawn-object":
+            name = payload.get("name") or payload.get("class_name") or "Part"
+            parent = str(payload.get("parent_path") or "Workspace").replace("/", ".")
+            return {"name": name, "class_name": payload.get("class_name") or "Part", "path": f"{parent}.{name}"}
+        return {"accepted": True, "action": action}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=30010)
+    parser.add_argument("--auto-complete", action="store_true", help="execute commands with the built-in mock executor")
+    parser.add_argument("--execution-delay", type=float, default=0.0, help="seconds per command for the mock executor")
+    parser.add_argument("--scene-objects", type=int, default=200, help="objects in synthetic introspection results")
+    parser.add_argument("--lease-ms", type=int, default=120000)
+    parser.add_argument("--rate-limit-max", type=int, default=0, help="requests per window (0 disables)")
+    parser.add_argument("--rate-limit-window-ms", type=int, default=60000)
+    args = parser.parse_args()
+
+    bridge = MockBridge(
+        args.host,
+        args.port,
+        lease_ms=args.lease_ms,
+        auto_complete=args.auto_complete,
+        execution_delay=args.execution_delay,
+        scene_objects=args.scene_objects,
+        rate_limit_max=args.rate_limit_max,
+        rate_limit_window_ms=args.rate_limit_window_ms,
+    )
+
+    async def run() -> None:
+        await bridge.start()
+        print(f"NovaBlox mock bridge listening on {bridge.url}", flush=True)
+        await bridge.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,7 @@ const BRIDGE_PORT = parseInt(process.env.ROBLOXBRIDGE_PORT || "30010", 10);
 const API_KEY = process.env.ROBLOXBRIDGE_API_KEY || "";
 const CLIENT_ID = process.env.MOCK_CLIENT_ID || "mock-studio";
 const POLL_MS = parseInt(process.env.MOCK_POLL_MS || "1000", 10);
+const WAIT_MS = parseInt(process.env.MOCK_WAIT_MS || "10000", 10);
 const RUN_SECONDS = parseInt(process.env.MOCK_RUN_SECONDS || "0", 10);
 
 const WORLD = {
@@ -358,11 +359,14 @@ async function reportBatch(results) {
 async function pollOnce() {
   const data = await req(
     "GET",
-    `/bridge/commands?client_id=${encodeURIComponent(CLIENT_ID)}&limit=20`,
+    `/bridge/commands?client_id=${encodeURIComponent(CLIENT_ID)}&limit=20` +
+      `&wait_ms=${Math.max(0, WAIT_MS)}`,
   );
   const commands = Array.isArray(data.commands) ? data.commands : [];
+  // Bridges without long polling omit wait_ms and answer at once.
+  const longPolled = Number(data.wait_ms) > 0;
   if (commands.length === 0) {
-    return 0;
+    return { count: 0, longPolled };
   }
   const results = [];
   for (const command of commands) {
@@ -388,7 +392,7 @@ async function pollOnce() {
     }
   }
   await reportBatch(results);
-  return commands.length;
+  return { count: commands.length, longPolled };
 }
 
 async function main() {
@@ -397,15 +401,20 @@ async function main() {
     `[mock] starting client=${CLIENT_ID} bridge=${BRIDGE_HOST}:${BRIDGE_PORT}\n`,
   );
   for (;;) {
+    let longPolled = false;
     try {
-      await pollOnce();
+      longPolled = (await pollOnce()).longPolled;
     } catch (err) {
       process.stderr.write(`[mock] poll error: ${err.message}\n`);
     }
     if (RUN_SECONDS > 0 && Date.now() - startedAt >= RUN_SECONDS * 1000) {
       break;
     }
-    await new Promise((resolve) => setTimeout(resolve, Math.max(100, POLL_MS)));
+    if (!longPolled) {
+      await new Promise((resolve) =>
+        setTimeout(resolve, Math.max(100, POLL_MS)),
+      );
+    }
   }
   process.stdout.write(
     `[mock] exiting objects=${WORLD.objects.size} scripts=${WORLD.scripts.length} terrain_ops=${WORLD.terrainOps.length}\n`,
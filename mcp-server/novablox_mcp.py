@@ -6,35 +6,49 @@ from __future__ import annotations
 import json
 import os
 import sys
+import uuid
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 SDK_DIR = Path(__file__).resolve().parents[1] / "python-sdk"
 if str(SDK_DIR) not in sys.path:
     sys.path.insert(0, str(SDK_DIR))
 
-from novablox import NovaBlox, NovaBloxError  # noqa: E402
+from novablox import AsyncNovaBlox, NovaBloxError  # noqa: E402
+from novablox_planner import PlanCache, summarize_risk  # noqa: E402
 
 try:
     from mcp.server.fastmcp import FastMCP
 except Exception as exc:  # pragma: no cover
     raise SystemExit(
         "Missing dependency: mcp\n"
-        "Install with: pip install mcp\n"
+        "Install with: pip install 'mcp<2'\n"
         f"Import error: {exc}"
     )
 
 HOST = os.environ.get("ROBLOXBRIDGE_HOST", "localhost")
 PORT = int(os.environ.get("ROBLOXBRIDGE_PORT", "30010"))
 API_KEY = os.environ.get("ROBLOXBRIDGE_API_KEY")
+MAX_CONCURRENCY = int(os.environ.get("ROBLOXBRIDGE_MCP_MAX_CONCURRENCY", "16"))
+PLAN_CACHE_TTL_S = float(os.environ.get("ROBLOXBRIDGE_MCP_PLAN_CACHE_TTL_S", "3600"))
+PLAN_CACHE_PATH = os.environ.get("ROBLOXBRIDGE_MCP_PLAN_CACHE_PATH") or None
+MAX_BATCH_OPERATIONS = int(os.environ.get("ROBLOXBRIDGE_MCP_MAX_BATCH", "200"))
 
 mcp = FastMCP("novablox")
-client = NovaBlox(host=HOST, port=PORT, api_key=API_KEY)
-
-
-def _wrap(func):
+plan_cache = PlanCache(ttl=PLAN_CACHE_TTL_S, path=PLAN_CACHE_PATH) if PLAN_CACHE_TTL_S > 0 else None
+client = AsyncNovaBlox(
+    host=HOST,
+    port=PORT,
+    api_key=API_KEY,
+    max_concurrency=MAX_CONCURRENCY,
+    plan_cache=plan_cache,
+)
+_catalog: Optional[Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]] = None
+
+
+async def _wrap(func):
     try:
-        return func()
+        return await func()
     except NovaBloxError as exc:
         return {"status": "error", "error": str(exc)}
     except Exception as exc:  # pragma: no cover
@@ -53,14 +67,71 @@ def _parse_json_object(raw: Optional[str], label: str) -> Optional[Dict[str, Any
     return parsed
 
 
+async def _catalog_index() -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """Planner catalog by route and by action, fetched once per process."""
+    global _catalog
+    if _catalog is None:
+        by_route: Dict[str, Dict[str, Any]] = {}
+        by_action: Dict[str, Dict[str, Any]] = {}
+        for entry in (await client.planner_catalog()).get("catalog") or []:
+            # Upload routes take multipart bodies and cannot be queued.
+            if not entry.get("route") or str(entry["route"]).endswith("/upload"):
+                continue
+            by_route[str(entry["route"])] = entry
+            by_action.setdefault(str(entry.get("action") or "").lower(), entry)
+        _catalog = (by_route, by_action)
+    return _catalog
+
+
+def _validate_operations(
+    operations: List[Any],
+    by_route: Dict[str, Dict[str, Any]],
+    by_action: Dict[str, Dict[str, Any]],
+    allow_dangerous: bool,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Resolve each operation to a catalog entry, like the assistant's plan normalizer."""
+    resolved: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            errors.append({"index": index, "error": "operation must be a JSON object"})
+            continue
+        route = str(operation.get("route") or "").strip()
+        action = str(operation.get("action") or "").strip().lower()
+        entry = by_route.get(route) or by_route.get(f"/bridge{route}") or by_action.get(action)
+        if entry is None:
+            errors.append({"index": index, "error": f"unknown action/route: {route or action or '<missing>'}"})
+            continue
+        payload = operation.get("payload", {})
+        if not isinstance(payload, dict):
+            errors.append({"index": index, "action": entry["action"], "error": "payload must be a JSON object"})
+            continue
+        risk = entry.get("risk") or "safe"
+        if risk == "dangerous" and not allow_dangerous:
+            errors.append(
+                {"index": index, "action": entry["action"], "error": "dangerous action; set allow_dangerous=true"}
+            )
+            continue
+        resolved.append(
+            {
+                "route": entry["route"],
+                "category": entry.get("category"),
+                "action": entry["action"],
+                "risk": risk,
+                "payload": payload,
+            }
+        )
+    return resolved, errors
+
+
 @mcp.tool()
-def roblox_health() -> Dict[str, Any]:
+async def roblox_health() -> Dict[str, Any]:
     """Check NovaBlox server health."""
-    return _wrap(client.health)
+    return await _wrap(client.health)
 
 
 @mcp.tool()
-def roblox_spawn_part(
+async def roblox_spawn_part(
     name: str = "MCPPart",
     x: float = 0.0,
     y: float = 5.0,
@@ -69,18 +140,18 @@ def roblox_spawn_part(
     anchored: bool = True,
 ) -> Dict[str, Any]:
     """Spawn a part in Studio."""
-    return _wrap(lambda: client.spawn_part(name=name, position=[x, y, z], color=color, anchored=anchored))
+    return await _wrap(lambda: client.spawn_part(name=name, position=[x, y, z], color=color, anchored=anchored))
 
 
 @mcp.tool()
-def roblox_set_property(
+async def roblox_set_property(
     property_name: str,
     value: Any,
     target_name: Optional[str] = None,
     target_path: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Set any property on an object."""
-    return _wrap(
+    return await _wrap(
         lambda: client.set_property(
             property_name=property_name,
             value=value,
@@ -91,18 +162,18 @@ def roblox_set_property(
 
 
 @mcp.tool()
-def roblox_delete(target_name: Optional[str] = None, target_path: Optional[str] = None) -> Dict[str, Any]:
+async def roblox_delete(target_name: Optional[str] = None, target_path: Optional[str] = None) -> Dict[str, Any]:
     """Delete an object."""
-    return _wrap(lambda: client.delete_object(target_name=target_name, target_path=target_path))
+    return await _wrap(lambda: client.delete_object(target_name=target_name, target_path=target_path))
 
 
 @mcp.tool()
-def roblox_set_lighting(
+async def roblox_set_lighting(
     brightness: Optional[float] = None,
     exposure_compensation: Optional[float] = None,
 ) -> Dict[str, Any]:
     """Set Roblox Lighting properties."""
-    return _wrap(
+    return await _wrap(
         lambda: client.set_lighting(
             brightness=brightness,
             exposure_compensation=exposure_compensation,
@@ -111,7 +182,7 @@ def roblox_set_lighting(
 
 
 @mcp.tool()
-def roblox_generate_terrain(
+async def roblox_generate_terrain(
     center_x: float = 0.0,
     center_y: float = 0.0,
     center_z: float = 0.0,
@@ -121,7 +192,7 @@ def roblox_generate_terrain(
     material: str = "Grass",
 ) -> Dict[str, Any]:
     """Fill terrain in a block region."""
-    return _wrap(
+    return await _wrap(
         lambda: client.generate_terrain(
             center=[center_x, center_y, center_z],
             size=[size_x, size_y, size_z],
@@ -131,25 +202,25 @@ def roblox_generate_terrain(
 
 
 @mcp.tool()
-def roblox_insert_script(source: str, name: str = "MCPGeneratedScript", parent_path: Optional[str] = None) -> Dict[str, Any]:
+async def roblox_insert_script(source: str, name: str = "MCPGeneratedScript", parent_path: Optional[str] = None) -> Dict[str, Any]:
     """Insert a Script into Studio."""
-    return _wrap(lambda: client.insert_script(source=source, name=name, parent_path=parent_path))
+    return await _wrap(lambda: client.insert_script(source=source, name=name, parent_path=parent_path))
 
 
 @mcp.tool()
-def roblox_publish_place() -> Dict[str, Any]:
+async def roblox_publish_place() -> Dict[str, Any]:
     """Queue a publish operation."""
-    return _wrap(client.publish_place)
+    return await _wrap(client.publish_place)
 
 
 @mcp.tool()
-def roblox_command_status(command_id: str) -> Dict[str, Any]:
+async def roblox_command_status(command_id: str) -> Dict[str, Any]:
     """Get command status."""
-    return _wrap(lambda: client.command_status(command_id))
+    return await _wrap(lambda: client.command_status(command_id))
 
 
 @mcp.tool()
-def roblox_test_spawn(
+async def roblox_test_spawn(
     text: str = "NovaBlox Connected",
     x: float = 0.0,
     y: float = 8.0,
@@ -157,18 +228,18 @@ def roblox_test_spawn(
     color: str = "Bright bluish green",
 ) -> Dict[str, Any]:
     """Queue an instant connectivity marker in Studio."""
-    return _wrap(lambda: client.test_spawn(text=text, position=[x, y, z], color=color))
+    return await _wrap(lambda: client.test_spawn(text=text, position=[x, y, z], color=color))
 
 
 @mcp.tool()
-def roblox_import_blender(
+async def roblox_import_blender(
     file_path: Optional[str] = None,
     asset_id: Optional[int] = None,
     scale_factor: float = 3.571428,
     parent_path: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Queue blender import with scale fix support."""
-    return _wrap(
+    return await _wrap(
         lambda: client.blender_import(
             file_path=file_path,
             asset_id=asset_id,
@@ -179,31 +250,31 @@ def roblox_import_blender(
 
 
 @mcp.tool()
-def roblox_planner_templates() -> Dict[str, Any]:
+async def roblox_planner_templates() -> Dict[str, Any]:
     """List deterministic assistant templates."""
-    return _wrap(client.planner_templates)
+    return await _wrap(client.planner_templates)
 
 
 @mcp.tool()
-def roblox_planner_catalog() -> Dict[str, Any]:
+async def roblox_planner_catalog() -> Dict[str, Any]:
     """List assistant command catalog with risk levels."""
-    return _wrap(client.planner_catalog)
+    return await _wrap(client.planner_catalog)
 
 
 @mcp.tool()
-def roblox_assistant_templates() -> Dict[str, Any]:
+async def roblox_assistant_templates() -> Dict[str, Any]:
     """Alias: list assistant templates."""
-    return _wrap(client.planner_templates)
+    return await _wrap(client.planner_templates)
 
 
 @mcp.tool()
-def roblox_assistant_catalog() -> Dict[str, Any]:
+async def roblox_assistant_catalog() -> Dict[str, Any]:
     """Alias: list assistant route catalog."""
-    return _wrap(client.planner_catalog)
+    return await _wrap(client.planner_catalog)
 
 
 @mcp.tool()
-def roblox_assistant_plan(
+async def roblox_assistant_plan(
     prompt: str,
     template: Optional[str] = None,
     use_llm: bool = False,
@@ -217,9 +288,9 @@ def roblox_assistant_plan(
 ) -> Dict[str, Any]:
     """Generate a command plan from natural language."""
 
-    def _run() -> Dict[str, Any]:
+    async def _run() -> Dict[str, Any]:
         scene_context = _parse_json_object(scene_context_json, "scene_context_json")
-        return client.plan(
+        return await client.plan(
             prompt=prompt,
             template=template,
             use_llm=use_llm,
@@ -232,11 +303,22 @@ def roblox_assistant_plan(
             scene_context=scene_context,
         )
 
-    return _wrap(_run)
+    return await _wrap(_run)
 
 
 @mcp.tool()
-def roblox_assistant_execute(
+async def roblox_plan_cache_stats(clear: bool = False) -> Dict[str, Any]:
+    """Report LLM plan cache hits/misses; clear=true empties it."""
+    if plan_cache is None:
+        return {"status": "ok", "enabled": False}
+    stats = plan_cache.snapshot()
+    if clear:
+        plan_cache.clear()
+    return {"status": "ok", "enabled": True, "cache": stats}
+
+
+@mcp.tool()
+async def roblox_assistant_execute(
     prompt: Optional[str] = None,
     template: Optional[str] = None,
     plan_json: Optional[str] = None,
@@ -251,10 +333,10 @@ def roblox_assistant_execute(
 ) -> Dict[str, Any]:
     """Queue commands from generated prompt or provided plan JSON."""
 
-    def _run() -> Dict[str, Any]:
+    async def _run() -> Dict[str, Any]:
         plan = _parse_json_object(plan_json, "plan_json")
         scene_context = _parse_json_object(scene_context_json, "scene_context_json")
-        return client.execute_plan(
+        return await client.execute_plan(
             plan=plan,
             prompt=prompt,
             template=template,
@@ -268,11 +350,94 @@ def roblox_assistant_execute(
             scene_context=scene_context,
         )
 
-    return _wrap(_run)
+    return await _wrap(_run)
+
+
+@mcp.tool()
+async def roblox_batch(
+    operations_json: str,
+    allow_dangerous: bool = False,
+    wait: bool = True,
+    timeout_s: float = 60.0,
+    include_results: bool = False,
+    idempotency_prefix: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Queue many scene operations in one call, in order.
+
+    operations_json is a JSON list of {"action": "<catalog action>", "payload": {...}}
+    objects ("route" may be given instead of "action"); see roblox_planner_catalog.
+    Every operation is checked against the catalog first, and nothing is queued
+    if any is unknown or dangerous without allow_dangerous. With wait=true the
+    call returns once all operations finish or timeout_s passes.
+    """
+
+    async def _run() -> Dict[str, Any]:
+        try:
+            operations = json.loads(operations_json)
+        except json.JSONDecodeError as exc:
+            raise NovaBloxError(f"operations_json must be valid JSON: {exc}") from exc
+        if not isinstance(operations, list) or not operations:
+            raise NovaBloxError("operations_json must decode to a non-empty JSON list")
+        if len(operations) > MAX_BATCH_OPERATIONS:
+            raise NovaBloxError(f"at most {MAX_BATCH_OPERATIONS} operations per batch")
+
+        by_route, by_action = await _catalog_index()
+        resolved, errors = _validate_operations(operations, by_route, by_action, allow_dangerous)
+        if errors:
+            return {"status": "error", "error": "validation failed; nothing was queued", "errors": errors}
+
+        prefix = idempotency_prefix or f"mcp-batch-{uuid.uuid4().hex[:12]}"
+        specs = [
+            {
+                "route": item["route"],
+                "category": item["category"],
+                "action": item["action"],
+                "payload": item["payload"],
+                "idempotency_key": f"{prefix}:{index + 1}:{item['action']}",
+                "metadata": {"source": "mcp-batch", "batch_step": index + 1, "batch_risk": item["risk"]},
+            }
+            for index, item in enumerate(resolved)
+        ]
+        queued = await client.queue_commands(specs)
+        command_ids = [str(item) for item in queued.get("command_ids") or []]
+        items: List[Dict[str, Any]] = [
+            {"index": index, "action": item["action"], "command_id": command_id, "status": "queued"}
+            for index, (item, command_id) in enumerate(zip(resolved, command_ids))
+        ]
+        response: Dict[str, Any] = {
+            "status": "queued",
+            "count": len(items),
+            "deduped_count": int(queued.get("deduped_count") or 0),
+            "idempotency_prefix": prefix,
+            "risk_summary": summarize_risk(resolved),
+        }
+        if wait and command_ids:
+            settled = await client.wait_for(command_ids, timeout_s)
+            records = (
+                await client.command_statuses(command_ids, fields=("result",)) if include_results else {}
+            )
+            for item in items:
+                outcome = settled.get(item["command_id"]) or {}
+                item["status"] = outcome.get("status") or "pending"
+                if outcome.get("error"):
+                    item["error"] = outcome["error"]
+                if outcome.get("execution_ms") is not None:
+                    item["execution_ms"] = outcome["execution_ms"]
+                if item["command_id"] in records:
+                    item["result"] = records[item["command_id"]].get("result")
+            counts: Dict[str, int] = {}
+            for item in items:
+                counts[item["status"]] = counts.get(item["status"], 0) + 1
+            response["status"] = "ok" if counts.get("succeeded") == len(items) else "partial"
+            response["by_status"] = counts
+        response["items"] = items
+        return response
+
+    return await _wrap(_run)
 
 
 @mcp.tool()
-def roblox_scene_introspect(
+async def roblox_scene_introspect(
     max_objects: int = 500,
     include_selection: bool = True,
     include_non_workspace: bool = False,
@@ -286,7 +451,7 @@ def roblox_scene_introspect(
         for item in str(services_csv or "").split(",")
         if item.strip()
     ]
-    return _wrap(
+    return await _wrap(
         lambda: client.introspect_scene(
             max_objects=max_objects,
             include_selection=include_selection,
@@ -298,9 +463,9 @@ def roblox_scene_introspect(
 
 
 @mcp.tool()
-def roblox_scene_introspection(include_objects: bool = False) -> Dict[str, Any]:
+async def roblox_scene_introspection(include_objects: bool = False) -> Dict[str, Any]:
     """Get latest cached scene introspection snapshot."""
-    return _wrap(lambda: client.scene_introspection(include_objects=include_objects))
+    return await _wrap(lambda: client.scene_introspection(include_objects=include_objects))
 
 
 def main() -> None:
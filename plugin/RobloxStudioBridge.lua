@@ -14,6 +14,8 @@ local BLENDER_TO_ROBLOX_SCALE = 3.571428
 local DEFAULT_HOST = "http://127.0.0.1:30010"
 local DEFAULT_POLL_SECONDS = 2
 local DEFAULT_BATCH_SIZE = 20
+-- Long-poll wait per pull; the bridge answers as soon as a command is queued.
+local LONG_POLL_MS = 10000
 local STUDIO_SYNC_HINT = "Tip: run `npm run studio:sync` in your NovaBlox terminal to auto-fill host/API key."
 local WIZARD_TERMINAL_HINT = "Terminal next: npm run doctor && npm run showcase:run"
 local HEALTH_COLOR_OK = Color3.fromRGB(190, 220, 255)
@@ -1445,9 +1447,12 @@ local function processCommands(commands)
   end
 end
 
-local function pullCommands()
+local function pullCommands(waitMs)
   local limit = math.clamp(tonumber(STATE.batchSize) or DEFAULT_BATCH_SIZE, 1, 100)
   local url = "/bridge/commands?client_id=" .. HttpService:UrlEncode(STATE.clientId) .. "&limit=" .. tostring(limit)
+  if waitMs and waitMs > 0 then
+    url = url .. "&wait_ms=" .. tostring(waitMs)
+  end
   local response = request("GET", url, nil)
   if not response.Success then
     local statusCode = tostring(response.StatusCode)
@@ -1486,7 +1491,8 @@ local function pullCommands()
   if refreshPanelState then
     refreshPanelState()
   end
-  return #decoded.commands
+  -- Bridges without long polling leave wait_ms out and answer at once.
+  return #decoded.commands, decoded.wait_ms ~= nil and (tonumber(decoded.wait_ms) or 0) > 0
 end
 
 local function stopStreamClient()
@@ -1567,8 +1573,10 @@ local function startPollingLoop()
   end
   STATE.pollThread = task.spawn(function()
     while STATE.enabled do
+      local longPolled = false
       local ok, err = pcall(function()
-        pullCommands()
+        local _, held = pullCommands(LONG_POLL_MS)
+        longPolled = held
       end)
       if not ok then
         if applyStudioHttpPermissionFailure("polling loop error", err) then
@@ -1586,7 +1594,9 @@ local function startPollingLoop()
           refreshPanelState()
         end
       end
-      task.wait(math.max(0.2, tonumber(STATE.pollSeconds) or DEFAULT_POLL_SECONDS))
+      if not longPolled then
+        task.wait(math.max(0.2, tonumber(STATE.pollSeconds) or DEFAULT_POLL_SECONDS))
+      end
     end
     STATE.pollThread = nil
   end)
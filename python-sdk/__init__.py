@@ -1,3 +1,71 @@
-from .novablox import NovaBlox, NovaBloxError
+from .novablox import (
+    AsyncHTTPConnectionPool,
+    AsyncNovaBlox,
+    BridgeEvent,
+    CommandBatch,
+    CommandSpool,
+    EventStream,
+    HTTPConnectionPool,
+    JSONCodec,
+    LatencyCollector,
+    LatencyHistogram,
+    MultipartUpload,
+    NovaBlox,
+    NovaBloxError,
+    NovaBloxWorker,
+    PlanExecutor,
+    RateLimitThrottle,
+    RequestEvent,
+    RequestHook,
+    TransportResponse,
+    default_codec,
+    file_sha256,
+    iter_json_array,
+    route_template,
+)
+from .novablox_planner import (
+    LocalPlanner,
+    PlanCache,
+    command_footprint,
+    plan_cache_key,
+    plan_dependencies,
+    scene_fingerprint,
+)
+from .novablox_scene import SceneCache, SceneColumns, SceneDelta, SceneIndex, SceneRow
 
-__all__ = ["NovaBlox", "NovaBloxError"]
+__all__ = [
+    "AsyncHTTPConnectionPool",
+    "AsyncNovaBlox",
+    "BridgeEvent",
+    "CommandBatch",
+    "CommandSpool",
+    "EventStream",
+    "HTTPConnectionPool",
+    "JSONCodec",
+    "LatencyCollector",
+    "LatencyHistogram",
+    "LocalPlanner",
+    "MultipartUpload",
+    "NovaBlox",
+    "NovaBloxError",
+    "NovaBloxWorker",
+    "PlanCache",
+    "PlanExecutor",
+    "RateLimitThrottle",
+    "RequestEvent",
+    "RequestHook",
+    "SceneCache",
+    "SceneColumns",
+    "SceneDelta",
+    "SceneIndex",
+    "SceneRow",
+    "TransportResponse",
+    "command_footprint",
+    "default_codec",
+    "file_sha256",
+    "iter_json_array",
+    "plan_cache_key",
+    "plan_dependencies",
+    "route_template",
+    "scene_fingerprint",
+]
@@ -5,17 +5,1301 @@ Zero-dependency client for the NovaBlox Roblox Studio bridge.
 
 from __future__ import annotations
 
+import asyncio
+import codecs
+import hashlib
+import http.client
 import json
-import urllib.error
+import os
+import queue
+import random
+import re
+import select
+import threading
+import time
+import types
 import urllib.parse
-import urllib.request
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple, Union
+
+try:
+    from .novablox_planner import (
+        LocalPlanner,
+        PlanCache,
+        plan_cache_key,
+        plan_dependencies,
+        plans_locally,
+        scene_fingerprint,
+    )
+except ImportError:  # loaded as a top-level module, e.g. from examples/
+    from novablox_planner import (
+        LocalPlanner,
+        PlanCache,
+        plan_cache_key,
+        plan_dependencies,
+        plans_locally,
+        scene_fingerprint,
+    )
+
+try:  # optional fast JSON codecs, picked up by default_codec()
+    import orjson as _orjson
+except ImportError:  # pragma: no cover - optional dependency
+    _orjson = None
+try:
+    import ujson as _ujson
+except ImportError:  # pragma: no cover - optional dependency
+    _ujson = None
+
+# Node's http server closes idle keep-alive sockets after 5s by default, so
+# pooled connections are evicted a little before that.
+DEFAULT_IDLE_TIMEOUT = 4.0
+DEFAULT_POOL_SIZE = 8
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_BATCH_DELAY = 0.25
+DEFAULT_MAX_CONCURRENCY = 16
+# The bridge sends an SSE heartbeat every 15s; a silent stream past this is dead.
+DEFAULT_STREAM_READ_TIMEOUT = 45.0
+TERMINAL_STATUSES = ("succeeded", "failed", "canceled", "expired")
+STATUS_FIELDS = ("status", "attempts", "execution_ms", "error")
+STREAM_CHUNK_SIZE = 64 * 1024
+DEFAULT_RATE_LIMIT_RETRIES = 8
+# X-RateLimit-Reset is rounded up to whole seconds; wait a little past it.
+RATE_LIMIT_RESET_MARGIN = 0.05
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Mirrors `commandRoutes` in server/index.js: route -> (category, action).
+COMMAND_ROUTES: Dict[str, Tuple[str, str]] = {
+    "/scene/spawn-object": ("scene", "spawn-object"),
+    "/scene/set-property": ("scene", "set-property"),
+    "/scene/set-transform": ("scene", "set-transform"),
+    "/scene/set-color": ("scene", "set-color"),
+    "/scene/set-material": ("scene", "set-material"),
+    "/scene/set-size": ("scene", "set-size"),
+    "/scene/set-anchored": ("scene", "set-anchored"),
+    "/scene/set-collidable": ("scene", "set-collidable"),
+    "/scene/group-objects": ("scene", "group-objects"),
+    "/scene/duplicate-object": ("scene", "duplicate-object"),
+    "/scene/delete-object": ("scene", "delete-object"),
+    "/scene/select-object": ("scene", "select-object"),
+    "/scene/clear-selection": ("scene", "clear-selection"),
+    "/scene/rename-object": ("scene", "rename-object"),
+    "/scene/create-folder": ("scene", "create-folder"),
+    "/scene/parent-object": ("scene", "parent-object"),
+    "/asset/import-model": ("asset", "import-model"),
+    "/asset/import-from-url": ("asset", "import-from-url"),
+    "/asset/insert-toolbox-asset": ("asset", "insert-toolbox-asset"),
+    "/asset/insert-asset-id": ("asset", "insert-asset-id"),
+    "/asset/create-script": ("asset", "create-script"),
+    "/asset/create-local-script": ("asset", "create-local-script"),
+    "/asset/create-module-script": ("asset", "create-module-script"),
+    "/asset/save-place": ("asset", "save-place"),
+    "/asset/export-place": ("asset", "export-place"),
+    "/asset/publish-place": ("asset", "publish-place"),
+    "/terrain/generate-terrain": ("terrain", "generate-terrain"),
+    "/terrain/fill-region": ("terrain", "fill-region"),
+    "/terrain/replace-material": ("terrain", "replace-material"),
+    "/terrain/clear-region": ("terrain", "clear-region"),
+    "/environment/set-lighting": ("environment", "set-lighting"),
+    "/environment/set-atmosphere": ("environment", "set-atmosphere"),
+    "/environment/set-skybox": ("environment", "set-skybox"),
+    "/environment/set-time": ("environment", "set-time"),
+    "/environment/set-fog": ("environment", "set-fog"),
+    "/script/insert-script": ("script", "insert-script"),
+    "/script/insert-local-script": ("script", "insert-local-script"),
+    "/script/insert-module-script": ("script", "insert-module-script"),
+    "/script/run-command": ("script", "run-command"),
+    "/simulation/playtest/start": ("simulation", "playtest-start"),
+    "/simulation/playtest/stop": ("simulation", "playtest-stop"),
+    "/viewport/set-camera": ("viewport", "set-camera"),
+    "/viewport/focus-selection": ("viewport", "focus-selection"),
+    "/viewport/screenshot": ("viewport", "screenshot"),
+    "/viewport/render-frame": ("viewport", "render-frame"),
+    "/workspace/autosave": ("workspace", "autosave"),
+    "/test-spawn": ("test", "test-spawn"),
+}
+
+_STALE_CONNECTION_ERRORS = (
+    http.client.BadStatusLine,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+_ASYNC_STALE_CONNECTION_ERRORS = (
+    asyncio.IncompleteReadError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+_REPLAY_SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+def _may_replay(method: str, body: Any, headers: Optional[Dict[str, str]], sent: bool) -> bool:
+    # A one-shot body iterator cannot be sent twice. Otherwise a request that
+    # never left the client is always safe to resend; one the bridge may have
+    # read is only replayed when it is idempotent or carries its own key.
+    if isinstance(body, Iterator):
+        return False
+    if not sent or method.upper() in _REPLAY_SAFE_METHODS:
+        return True
+    return any(key.lower() == "x-idempotency-key" for key in (headers or {}))
 
 
 class NovaBloxError(RuntimeError):
     """Raised on bridge communication failures."""
 
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        # HTTP status of the bridge's response; None if none was received.
+        self.status = status
+
+
+class JSONCodec:
+    """Request/response body codec backed by the stdlib `json` module."""
+
+    name = "json"
+
+    def dumps(self, data: Any) -> bytes:
+        return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        if _orjson is None:
+            raise NovaBloxError("orjson is not installed")
+        self._options = _orjson.OPT_SERIALIZE_NUMPY | _orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, data: Any) -> bytes:
+        return _orjson.dumps(data, option=self._options)
+
+    def loads(self, raw: bytes) -> Any:
+        return _orjson.loads(raw)
+
+
+class UjsonCodec(JSONCodec):
+    name = "ujson"
+
+    def __init__(self) -> None:
+        if _ujson is None:
+            raise NovaBloxError("ujson is not installed")
+
+    def dumps(self, data: Any) -> bytes:
+        return _ujson.dumps(data, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+    def loads(self, raw: bytes) -> Any:
+        return _ujson.loads(raw)
+
+
+_CODECS = {"orjson": OrjsonCodec, "ujson": UjsonCodec, "json": JSONCodec}
+
+
+def default_codec(name: Optional[Union[str, JSONCodec]] = None) -> JSONCodec:
+    """Return the named codec, or the fastest installed one (orjson, ujson, json)."""
+    if isinstance(name, JSONCodec):
+        return name
+    if name is not None:
+        if name not in _CODECS:
+            raise NovaBloxError(f"unknown JSON codec: {name}")
+        return _CODECS[name]()
+    if _orjson is not None:
+        return OrjsonCodec()
+    if _ujson is not None:
+        return UjsonCodec()
+    return JSONCodec()
+
+
+# Values are decoded with json.JSONDecoder.raw_decode, so each element goes
+# through the C scanner; only the buffer bookkeeping runs in Python.
+class _JSONChunkReader:
+    """Pull parser over a chunked UTF-8 JSON body."""
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        while not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                text = self._utf8.decode(b"", final=True)
+            else:
+                text = self._utf8.decode(chunk)
+            if text:
+                self.buf = self.buf[self.pos :] + text
+                self.pos = 0
+                return True
+        return False
+
+    def peek(self) -> str:
+        while True:
+            buf = self.buf
+            pos = self.pos
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            self.pos = pos
+            if pos < len(buf):
+                return buf[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise NovaBloxError(f"Invalid JSON response: expected {char!r}, found {found or 'end of body'!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as exc:
+                # Incomplete value: read until the unread part has doubled so a
+                # value spanning many chunks isn't rescanned once per chunk.
+                pending = len(self.buf) - self.pos
+                grew = False
+                while len(self.buf) - self.pos < 2 * pending + 1 and self._fill():
+                    grew = True
+                if grew:
+                    continue
+                raise NovaBloxError(f"Invalid JSON response: {exc}") from exc
+            # A number ending exactly at the buffer edge may continue in the next chunk.
+            if end >= len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+# Sibling values before the key are parsed and dropped; a missing key or a null
+# value yields nothing. Only one element is held in memory at a time.
+def iter_json_array(chunks: Iterable[bytes], path: Sequence[str] = ()) -> Iterator[Any]:
+    """Yield the elements of the array at key chain `path` in a chunked JSON document."""
+    reader = _JSONChunkReader(chunks)
+    for key in path:
+        if reader.peek() == "n":
+            return
+        reader.expect("{")
+        while True:
+            if reader.peek() == "}":
+                return
+            name = reader.value()
+            reader.expect(":")
+            if name == key:
+                break
+            reader.value()
+            if reader.peek() == ",":
+                reader.pos += 1
+    if reader.peek() == "n":
+        return
+    reader.expect("[")
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        char = reader.peek()
+        if char == ",":
+            reader.pos += 1
+        elif char == "]":
+            return
+        else:
+            raise NovaBloxError(f"Invalid JSON response: expected ',' or ']', found {char or 'end of body'!r}")
+
+
+# (real path, size, mtime_ns) -> sha256, so unchanged files are hashed once.
+_FILE_DIGESTS: Dict[Tuple[str, int, int], str] = {}
+_FILE_DIGESTS_LOCK = threading.Lock()
+
+
+def file_sha256(file_path: str, *, chunk_size: int = UPLOAD_CHUNK_SIZE) -> str:
+    """Hex SHA-256 of a file, read in chunks; cached while size and mtime hold."""
+    real_path = os.path.realpath(file_path)
+    stat = os.stat(real_path)
+    key = (real_path, stat.st_size, stat.st_mtime_ns)
+    with _FILE_DIGESTS_LOCK:
+        cached = _FILE_DIGESTS.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+    with open(real_path, "rb") as handle:
+        while True:
+            read = handle.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    value = digest.hexdigest()
+    with _FILE_DIGESTS_LOCK:
+        _FILE_DIGESTS[key] = value
+    return value
+
+
+# The length is known up front and the body can be iterated again, so a retried
+# request resends it. progress(sent, total) is called after each file chunk.
+class MultipartUpload:
+    """multipart/form-data body that streams one file from disk."""
+
+    def __init__(
+        self,
+        file_path: str,
+        *,
+        fields: Optional[Dict[str, Any]] = None,
+        field_name: str = "file",
+        filename: Optional[str] = None,
+        content_type: str = "application/octet-stream",
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> None:
+        self.file_path = file_path
+        self.size = os.path.getsize(file_path)
+        self.chunk_size = max(1, int(chunk_size))
+        self.progress = progress
+        self.boundary = f"novablox-{uuid.uuid4().hex}"
+        parts = []
+        for key, value in (fields or {}).items():
+            if value is None:
+                continue
+            if isinstance(value, bool):
+                value = "true" if value else "false"
+            parts.append(
+                f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{_form_quote(key)}"\r\n\r\n'
+                f"{value}\r\n"
+            )
+        name = filename or os.path.basename(file_path)
+        parts.append(
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{_form_quote(field_name)}"; filename="{_form_quote(name)}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        )
+        self._head = "".join(parts).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+
+    @property
+    def content_type(self) -> str:
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return len(self._head) + self.size + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self._head
+        sent = 0
+        with open(self.file_path, "rb") as handle:
+            while sent < self.size:
+                chunk = handle.read(min(self.chunk_size, self.size - sent))
+                if not chunk:
+                    break
+                sent += len(chunk)
+                yield chunk
+                if self.progress is not None:
+                    self.progress(sent, self.size)
+        if sent != self.size:
+            # The declared Content-Length can no longer be met.
+            raise NovaBloxError(f"{self.file_path} changed size during upload")
+        yield self._tail
+
+
+def _form_quote(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+@dataclass
+class TransportResponse:
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    body: bytes
+    # Phase timings in ms filled in by the pooled transports: connect_ms
+    # (0 on a reused connection), ttfb_ms and read_ms.
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def header(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.headers.get(name.lower(), default)
+
+
+class Transport(Protocol):
+    """Anything that can carry one HTTP exchange to the bridge."""
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: Optional[Union[bytes, Iterable[bytes]]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+# Up to pool_size idle connections are kept; extras opened under contention are
+# closed on release. A request that fails on a reused socket is retried on a
+# fresh one only when replaying it cannot run a command twice (see
+# _may_replay).
+class HTTPConnectionPool:
+    """Thread-safe pool of HTTP/1.1 keep-alive connections to one bridge host."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        timeout: float = 60.0,
+    ) -> None:
+        self.host = host
+        self.port = int(port)
+        self.pool_size = max(0, int(pool_size))
+        self.idle_timeout = float(idle_timeout)
+        self.timeout = float(timeout)
+        self._idle: List[Tuple[http.client.HTTPConnection, float]] = []
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats: Dict[str, int] = {"opened": 0, "reused": 0, "evicted": 0, "retried": 0}
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: Optional[Union[bytes, Iterable[bytes]]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        call_timeout = self.timeout if timeout is None else float(timeout)
+        while True:
+            started = time.perf_counter()
+            conn, reused = self._acquire(call_timeout)
+            sent = False
+            try:
+                if not reused:
+                    conn.connect()
+                connected = time.perf_counter()
+                conn.request(method, path, body=body, headers=headers or {})
+                sent = True
+                resp = conn.getresponse()
+                first_byte = time.perf_counter()
+                payload = resp.read()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and _may_replay(method, body, headers, sent):
+                    with self._lock:
+                        self.stats["retried"] += 1
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            self._release(conn, reusable=not resp.will_close)
+            return TransportResponse(
+                status=resp.status,
+                reason=resp.reason,
+                headers={key.lower(): value for key, value in resp.getheaders()},
+                body=payload,
+                timings={
+                    "connect_ms": (connected - started) * 1000.0 if not reused else 0.0,
+                    "ttfb_ms": (first_byte - connected) * 1000.0,
+                    "read_ms": (time.perf_counter() - first_byte) * 1000.0,
+                },
+            )
+
+    # The connection goes back to the pool once the body is read to the end;
+    # closing the iterator early closes the connection instead.
+    def stream(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> Tuple[TransportResponse, Iterator[bytes]]:
+        """Send a request and return its head plus an iterator over the body."""
+        call_timeout = self.timeout if timeout is None else float(timeout)
+        while True:
+            conn, reused = self._acquire(call_timeout)
+            sent = False
+            try:
+                conn.request(method, path, body=body, headers=headers or {})
+                sent = True
+                resp = conn.getresponse()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and _may_replay(method, body, headers, sent):
+                    with self._lock:
+                        self.stats["retried"] += 1
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            head = TransportResponse(
+                status=resp.status,
+                reason=resp.reason,
+                headers={key.lower(): value for key, value in resp.getheaders()},
+                body=b"",
+            )
+            return head, self._body_chunks(conn, resp, chunk_size)
+
+    def _body_chunks(
+        self,
+        conn: http.client.HTTPConnection,
+        resp: http.client.HTTPResponse,
+        chunk_size: int,
+    ) -> Iterator[bytes]:
+        finished = False
+        try:
+            while True:
+                chunk = resp.read1(chunk_size)
+                if not chunk:
+                    finished = True
+                    return
+                yield chunk
+        finally:
+            if finished:
+                resp.close()
+                self._release(conn, reusable=not resp.will_close)
+            else:
+                conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            conn.close()
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return len(self._idle)
+
+    def _acquire(self, timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        expired: List[http.client.HTTPConnection] = []
+        conn: Optional[http.client.HTTPConnection] = None
+        now = time.monotonic()
+        with self._lock:
+            fresh = []
+            for item, last_used in self._idle:
+                if now - last_used > self.idle_timeout or _peer_closed(item):
+                    expired.append(item)
+                else:
+                    fresh.append((item, last_used))
+            self._idle = fresh
+            self.stats["evicted"] += len(expired)
+            if self._idle:
+                conn = self._idle.pop()[0]
+                self.stats["reused"] += 1
+            else:
+                self.stats["opened"] += 1
+        for item in expired:
+            item.close()
+
+        if conn is None:
+            return http.client.HTTPConnection(self.host, self.port, timeout=timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, conn: http.client.HTTPConnection, *, reusable: bool) -> None:
+        if reusable:
+            with self._lock:
+                if not self._closed and len(self._idle) < self.pool_size:
+                    self._idle.append((conn, time.monotonic()))
+                    return
+        conn.close()
+
+
+def _peer_closed(conn: http.client.HTTPConnection) -> bool:
+    # An idle keep-alive socket should have nothing to read; if it polls
+    # readable the server has sent FIN (or stray bytes) and it cannot be reused.
+    if conn.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+# Timeouts cover the whole exchange, including connect. A request that is
+# cancelled or times out mid-flight closes its connection rather than pooling a
+# half-read socket.
+class AsyncHTTPConnectionPool:
+    """asyncio counterpart of `HTTPConnectionPool` built on asyncio streams."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+        timeout: float = 60.0,
+    ) -> None:
+        self.host = host
+        self.port = int(port)
+        self.pool_size = max(0, int(pool_size))
+        self.idle_timeout = float(idle_timeout)
+        self.timeout = float(timeout)
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter, float]] = []
+        self._closed = False
+        self.stats: Dict[str, int] = {"opened": 0, "reused": 0, "evicted": 0, "retried": 0}
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> TransportResponse:
+        call_timeout = self.timeout if timeout is None else float(timeout)
+        return await asyncio.wait_for(self._request(method, path, body, headers or {}), call_timeout)
+
+    async def close(self) -> None:
+        self._closed = True
+        idle, self._idle = self._idle, []
+        for _, writer, _ in idle:
+            writer.close()
+
+    def idle_count(self) -> int:
+        return len(self._idle)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+    ) -> TransportResponse:
+        while True:
+            started = time.perf_counter()
+            reader, writer, reused = await self._acquire()
+            connect_ms = (time.perf_counter() - started) * 1000.0 if not reused else 0.0
+            sent = False
+            try:
+                sending = time.perf_counter()
+                await self._send_request(writer, method, path, body, headers)
+                sent = True
+                resp, keep_alive = await self._read_response(reader, method, sending)
+            except _ASYNC_STALE_CONNECTION_ERRORS:
+                writer.close()
+                if reused and _may_replay(method, body, headers, sent):
+                    self.stats["retried"] += 1
+                    continue
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            self._release(reader, writer, reusable=keep_alive)
+            resp.timings["connect_ms"] = connect_ms
+            return resp
+
+    async def _acquire(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter, bool]:
+        now = time.monotonic()
+        fresh = []
+        for reader, writer, last_used in self._idle:
+            if now - last_used > self.idle_timeout or reader.at_eof():
+                writer.close()
+                self.stats["evicted"] += 1
+            else:
+                fresh.append((reader, writer, last_used))
+        self._idle = fresh
+        if self._idle:
+            reader, writer, _ = self._idle.pop()
+            self.stats["reused"] += 1
+            return reader, writer, True
+        self.stats["opened"] += 1
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        return reader, writer, False
+
+    def _release(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, *, reusable: bool) -> None:
+        if reusable and not self._closed and len(self._idle) < self.pool_size:
+            self._idle.append((reader, writer, time.monotonic()))
+            return
+        writer.close()
+
+    async def _send_request(
+        self,
+        writer: asyncio.StreamWriter,
+        method: str,
+        path: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+    ) -> None:
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        outgoing = dict(headers)
+        if body is not None or method in ("POST", "PUT", "PATCH"):
+            outgoing.setdefault("Content-Length", str(len(body or b"")))
+        lines.extend(f"{key}: {value}" for key, value in outgoing.items())
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + (body or b""))
+        await writer.drain()
+
+    async def _read_response(
+        self,
+        reader: asyncio.StreamReader,
+        method: str,
+        started: float,
+    ) -> Tuple[TransportResponse, bool]:
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed by bridge")
+        first_byte = time.perf_counter()
+        parts = status_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ConnectionResetError(f"malformed status line: {status_line!r}")
+        version, status = parts[0], int(parts[1])
+        reason = parts[2] if len(parts) > 2 else ""
+
+        response_headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        keep_alive = version == "HTTP/1.1" and response_headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            payload = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size_line = await reader.readline()
+                size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            payload = b"".join(chunks)
+        elif "content-length" in response_headers:
+            payload = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            payload = await reader.read()
+            keep_alive = False
+        timings = {
+            "ttfb_ms": (first_byte - started) * 1000.0,
+            "read_ms": (time.perf_counter() - first_byte) * 1000.0,
+        }
+        resp = TransportResponse(status=status, reason=reason, headers=response_headers, body=payload, timings=timings)
+        return resp, keep_alive
+
+
+def _header_number(headers: Dict[str, str], name: str) -> Optional[float]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+# reserve() books a send slot against the current fixed window and returns how
+# long to sleep first, so callers queue locally instead of hitting 429. With
+# pace the remaining budget is spread over the rest of the window. Until the
+# bridge reports a limit it never delays anything.
+class RateLimitThrottle:
+    """Client-side pacing driven by the bridge's X-RateLimit-* headers."""
+
+    def __init__(
+        self,
+        *,
+        headroom: int = 1,
+        pace: bool = True,
+        max_retries: int = DEFAULT_RATE_LIMIT_RETRIES,
+    ) -> None:
+        self.headroom = max(0, int(headroom))
+        self.pace = pace
+        self.max_retries = max(0, int(max_retries))
+        self._lock = threading.Lock()
+        self._limit: Optional[int] = None
+        self._remaining: Optional[int] = None
+        self._reset_at: Optional[float] = None
+        self._reset_floor: Optional[float] = None
+        self._window: Optional[float] = None
+        self._booked: Deque[float] = deque()
+        self._blocked_until = 0.0
+        self._next_slot = 0.0
+        self._window_opens = 0.0
+        self._in_flight = 0
+        self.stats: Dict[str, Any] = {
+            "requests": 0,
+            "throttled": 0,
+            "throttled_seconds": 0.0,
+            "rate_limited": 0,
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current view of the server window, for logging."""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "limit": self._limit,
+                "remaining": self._remaining,
+                "reset_in": None if self._reset_at is None else max(0.0, self._reset_at - now),
+                "in_flight": self._in_flight,
+                **self.stats,
+            }
+
+    def reserve(self) -> float:
+        """Book the next send slot; returns seconds to wait before sending."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._blocked_until, self._next_slot, self._window_opens)
+            self.stats["requests"] += 1
+            if self._limit:
+                if self._reset_at is not None and start >= self._reset_at:
+                    self._roll_window(start)
+                if self._remaining is not None and self._remaining <= self.headroom:
+                    # Budget spent: the request waits for the next window.
+                    resume = (self._reset_at if self._reset_at is not None else start + 1.0) + RATE_LIMIT_RESET_MARGIN
+                    start = max(start, resume)
+                    self._roll_window(start)
+                if self._remaining is not None:
+                    self._remaining -= 1
+                self._booked.append(start)
+                if self.pace and self._reset_floor is not None and self._remaining is not None:
+                    # Spread over the part of the window that is surely
+                    # still open; the reset is only known to the second.
+                    spare = max(1, self._remaining - self.headroom + 1)
+                    self._next_slot = start + max(0.0, self._reset_floor - start) / spare
+            wait = start - now
+            if wait > 0:
+                self.stats["throttled"] += 1
+                self.stats["throttled_seconds"] += wait
+            return max(0.0, wait)
+
+    def begin(self) -> None:
+        """Mark a reserved request as sent, once its wait is over."""
+        with self._lock:
+            self._in_flight += 1
+
+    def _roll_window(self, start: float) -> None:
+        # Sends booked after the old window's earliest possible reset may
+        # already have opened the next server window; charge them to it.
+        floor = self._reset_floor if self._reset_floor is not None else start
+        while self._booked and self._booked[0] < floor:
+            self._booked.popleft()
+        carried = sum(1 for booked in self._booked if booked < start)
+        self._window_opens = start
+        self._remaining = (self._limit or 0) - carried
+        if self._window:
+            self._reset_at = start + self._window
+            self._reset_floor = start + max(0.0, self._window - 1.0)
+        else:
+            self._reset_at = self._reset_floor = None
+
+    def observe(self, status: Optional[int], headers: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """Record a sent request's outcome; return a retry delay if the bridge answered 429."""
+        headers = headers or {}
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            now = time.monotonic()
+            limit = _header_number(headers, "x-ratelimit-limit")
+            if limit is not None:
+                if limit <= 0:
+                    self._limit = 0
+                else:
+                    self._limit = int(limit)
+                    remaining = _header_number(headers, "x-ratelimit-remaining")
+                    reset = _header_number(headers, "x-ratelimit-reset")
+                    new_window = False
+                    stale = False
+                    if reset is not None:
+                        self._window = max(self._window or 0.0, reset)
+                        reset_at = now + reset
+                        # Reset is whole seconds, so readings from one window
+                        # agree to within a second; a much earlier one is a
+                        # late response from the previous window.
+                        if self._reset_at is None or reset_at > self._reset_at + 1.0:
+                            new_window = True
+                            self._reset_at = reset_at
+                            self._reset_floor = reset_at - 1.0
+                        elif reset_at < self._reset_at - 1.0:
+                            stale = True
+                        else:
+                            self._reset_at = min(self._reset_at, reset_at)
+                            self._reset_floor = max(self._reset_floor or 0.0, reset_at - 1.0)
+                    if remaining is not None and not stale:
+                        # Requests sent but not answered yet may not be counted
+                        # in this header.
+                        reported = int(remaining) - (self._in_flight if new_window else 0)
+                        if new_window or self._remaining is None:
+                            self._remaining = reported
+                        else:
+                            self._remaining = min(self._remaining, reported)
+            if status != 429:
+                return None
+            self.stats["rate_limited"] += 1
+            retry_after = _header_number(headers, "retry-after")
+            if retry_after is None:
+                retry_after = _header_number(headers, "x-ratelimit-reset") or 1.0
+            self._blocked_until = max(self._blocked_until, now + retry_after + RATE_LIMIT_RESET_MARGIN)
+            if self._window_opens <= now:
+                # Otherwise an earlier 429 already moved bookings to the next window.
+                self._remaining = 0
+                if self._reset_at is None or self._reset_at < self._blocked_until:
+                    self._reset_at = self._reset_floor = self._blocked_until
+            return retry_after
+
+
+_ROUTE_ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}|[0-9a-fA-F]{16,}|\d+)$")
+
+
+def route_template(route: str) -> str:
+    """Collapse ids in a bridge route (``/commands/:id``) so metrics group by endpoint."""
+    path = route.split("?", 1)[0]
+    return "/".join(":id" if _ROUTE_ID_SEGMENT.match(part) else part for part in path.split("/"))
+
+
+# throttle_ms is time spent waiting on the rate-limit throttle; the transport
+# phases describe the final attempt and stay 0 when the transport does not
+# report them.
+@dataclass
+class RequestEvent:
+    """One `NovaBlox._request` call as seen by instrumentation hooks; timings in ms."""
+
+    method: str
+    route: str
+    target: str
+    payload: Any = None
+    bytes_out: int = 0
+    started: float = 0.0
+    attempts: int = 0
+    status: Optional[int] = None
+    bytes_in: int = 0
+    throttle_ms: float = 0.0
+    connect_ms: float = 0.0
+    ttfb_ms: float = 0.0
+    read_ms: float = 0.0
+    decode_ms: float = 0.0
+    total_ms: float = 0.0
+    error: Optional[str] = None
+    response: Optional[Dict[str, Any]] = None
+    context: Dict[str, Any] = field(default_factory=dict)
+
+
+# Hooks run inline on the calling thread (or event loop), so keep them cheap.
+class RequestHook:
+    """No-op base for `NovaBlox.hooks`; any object with some of these methods works."""
+
+    def pre_request(self, event: RequestEvent) -> None:
+        pass
+
+    def post_request(self, event: RequestEvent) -> None:
+        pass
+
+    def command_settled(self, outcome: Dict[str, Any]) -> None:
+        pass
+
+
+# Values are recorded in whole microseconds into buckets whose width grows with
+# magnitude, keeping relative error under 2 ** -(significant_bits - 1) (about
+# 1.6% by default).
+class LatencyHistogram:
+    """Log-linear latency histogram in the style of HdrHistogram, in milliseconds."""
+
+    def __init__(self, significant_bits: int = 7) -> None:
+        self.significant_bits = max(2, int(significant_bits))
+        self._half = 1 << (self.significant_bits - 1)
+        self._exact = 1 << self.significant_bits
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms: Optional[float] = None
+        self.max_ms: Optional[float] = None
+
+    def record(self, value_ms: float) -> None:
+        value_ms = max(0.0, float(value_ms))
+        index = self._index(int(value_ms * 1000.0))
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total_ms += value_ms
+        if self.min_ms is None or value_ms < self.min_ms:
+            self.min_ms = value_ms
+        if self.max_ms is None or value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.significant_bits != self.significant_bits:
+            raise ValueError("cannot merge histograms with different precision")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total_ms += other.total_ms
+        for value in (other.min_ms, other.max_ms):
+            if value is not None:
+                self.min_ms = value if self.min_ms is None else min(self.min_ms, value)
+                self.max_ms = value if self.max_ms is None else max(self.max_ms, value)
+
+    def percentile(self, percent: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, int(-(-self.count * min(100.0, max(0.0, percent)) // 100)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._upper(index) / 1000.0, self.max_ms or 0.0)
+        return self.max_ms or 0.0
+
+    def cumulative(self, bounds_ms: Sequence[float]) -> List[int]:
+        """Counts of values at or below each bound, for Prometheus buckets."""
+        ordered = sorted(self.counts.items())
+        result = []
+        for bound in bounds_ms:
+            limit = int(bound * 1000.0)
+            result.append(sum(count for index, count in ordered if self._upper(index) <= limit))
+        return result
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "min_ms": self.min_ms or 0.0,
+            "max_ms": self.max_ms or 0.0,
+            "p50_ms": self.percentile(50),
+            "p90_ms": self.percentile(90),
+            "p99_ms": self.percentile(99),
+        }
+
+    def _index(self, value: int) -> int:
+        if value < self._exact:
+            return value
+        shift = value.bit_length() - self.significant_bits
+        return shift * self._half + (value >> shift)
+
+    def _upper(self, index: int) -> int:
+        if index < self._exact:
+            return index
+        shift = index // self._half - 1
+        return ((index - shift * self._half + 1) << shift) - 1
+
+
+# Prometheus `le` bounds in ms; exported as seconds.
+LATENCY_BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+REQUEST_PHASES = ("total", "throttle", "connect", "ttfb", "read", "decode")
+COMMAND_PHASES = ("enqueue", "queue_wait", "execution", "end_to_end", "overhead")
+
+
+def _prom_labels(labels: Dict[str, Any]) -> str:
+    parts = []
+    for key, value in labels.items():
+        text = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{text}"')
+    return "{" + ",".join(parts) + "}"
+
+
+# Command ids returned by enqueue calls are remembered (up to max_tracked) and
+# joined with the execution_ms the plugin reports once the command settles,
+# seen through wait_for, command_status or record_command.
+class LatencyCollector(RequestHook):
+    """Hook that keeps per-route latency histograms and a per-action breakdown."""
+
+    def __init__(self, *, significant_bits: int = 7, max_tracked: int = 10000) -> None:
+        self.significant_bits = significant_bits
+        self.max_tracked = max(0, int(max_tracked))
+        self._lock = threading.Lock()
+        self._requests: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self._commands: Dict[str, Dict[str, LatencyHistogram]] = {}
+        self._tracked: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        self._settled: "OrderedDict[str, None]" = OrderedDict()
+
+    def post_request(self, event: RequestEvent) -> None:
+        key = (event.method, event.route)
+        with self._lock:
+            entry = self._requests.get(key)
+            if entry is None:
+                entry = self._requests[key] = {
+                    "phases": {phase: LatencyHistogram(self.significant_bits) for phase in REQUEST_PHASES},
+                    "statuses": {},
+                    "errors": 0,
+                    "bytes_in": 0,
+                    "bytes_out": 0,
+                }
+            phases = entry["phases"]
+            phases["total"].record(event.total_ms)
+            phases["throttle"].record(event.throttle_ms)
+            phases["connect"].record(event.connect_ms)
+            phases["ttfb"].record(event.ttfb_ms)
+            phases["read"].record(event.read_ms)
+            phases["decode"].record(event.decode_ms)
+            status = str(event.status) if event.status is not None else "error"
+            entry["statuses"][status] = entry["statuses"].get(status, 0) + 1
+            entry["errors"] += event.error is not None
+            entry["bytes_in"] += event.bytes_in
+            entry["bytes_out"] += event.bytes_out
+        response = event.response
+        if event.error is not None or not isinstance(response, dict):
+            return
+        if event.method == "POST":
+            self._track_enqueued(event, response)
+        command = response.get("command")
+        if isinstance(command, dict):
+            self.record_command(command)
+
+    def command_settled(self, outcome: Dict[str, Any]) -> None:
+        self.record_command(outcome)
+
+    def record_commands(self, commands: Iterable[Dict[str, Any]]) -> None:
+        for command in commands:
+            self.record_command(command)
+
+    def record_command(self, command: Dict[str, Any]) -> None:
+        """Fold in a settled command record or `wait_for` outcome."""
+        if command.get("status") not in TERMINAL_STATUSES:
+            return
+        now = time.perf_counter()
+        command_id = str(command.get("id"))
+        with self._lock:
+            if command_id in self._settled:
+                return
+            self._settled[command_id] = None
+            while len(self._settled) > self.max_tracked:
+                self._settled.popitem(last=False)
+            tracked = self._tracked.pop(command_id, None)
+            action = command.get("action") or (tracked[0] if tracked else None)
+            if action is None:
+                return
+            phases = self._command_phases(str(action))
+            execution_ms = command.get("execution_ms")
+            if isinstance(execution_ms, (int, float)):
+                phases["execution"].record(execution_ms)
+            created = _parse_iso_timestamp(command.get("created_at"))
+            dispatched = _parse_iso_timestamp(command.get("dispatched_at"))
+            if created is not None and dispatched is not None:
+                phases["queue_wait"].record((dispatched - created) * 1000.0)
+            if tracked is not None:
+                end_to_end = (now - tracked[1]) * 1000.0
+                phases["enqueue"].record(tracked[2])
+                phases["end_to_end"].record(end_to_end)
+                if isinstance(execution_ms, (int, float)):
+                    phases["overhead"].record(end_to_end - execution_ms)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests.clear()
+            self._commands.clear()
+            self._tracked.clear()
+            self._settled.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            requests = [
+                {
+                    "method": method,
+                    "route": route,
+                    "count": entry["phases"]["total"].count,
+                    "errors": entry["errors"],
+                    "statuses": dict(entry["statuses"]),
+                    "bytes_in": entry["bytes_in"],
+                    "bytes_out": entry["bytes_out"],
+                    "phases": {phase: hist.summary() for phase, hist in entry["phases"].items()},
+                }
+                for (method, route), entry in sorted(self._requests.items())
+            ]
+            commands = [
+                {
+                    "action": action,
+                    "count": max(hist.count for hist in phases.values()),
+                    "phases": {phase: hist.summary() for phase, hist in phases.items() if hist.count},
+                }
+                for action, phases in sorted(self._commands.items())
+            ]
+            return {"requests": requests, "commands": commands, "pending_commands": len(self._tracked)}
+
+    def prometheus(self, prefix: str = "novablox") -> str:
+        """Render the collected metrics in the Prometheus text format."""
+        lines: List[str] = []
+        with self._lock:
+            request_metric = f"{prefix}_request_duration_seconds"
+            lines.append(f"# HELP {request_metric} Client-side bridge request latency by phase.")
+            lines.append(f"# TYPE {request_metric} histogram")
+            for (method, route), entry in sorted(self._requests.items()):
+                for phase, hist in entry["phases"].items():
+                    self._prom_histogram(lines, request_metric, {"method": method, "route": route, "phase": phase}, hist)
+            counter = f"{prefix}_requests_total"
+            lines.append(f"# HELP {counter} Bridge requests by final status.")
+            lines.append(f"# TYPE {counter} counter")
+            for (method, route), entry in sorted(self._requests.items()):
+                for status, count in sorted(entry["statuses"].items()):
+                    lines.append(f"{counter}{_prom_labels({'method': method, 'route': route, 'status': status})} {count}")
+            byte_counter = f"{prefix}_request_bytes_total"
+            lines.append(f"# HELP {byte_counter} Request and response body bytes.")
+            lines.append(f"# TYPE {byte_counter} counter")
+            for (method, route), entry in sorted(self._requests.items()):
+                for direction in ("in", "out"):
+                    labels = _prom_labels({"method": method, "route": route, "direction": direction})
+                    lines.append(f"{byte_counter}{labels} {entry['bytes_' + direction]}")
+            command_metric = f"{prefix}_command_duration_seconds"
+            lines.append(f"# HELP {command_metric} End-to-end command latency breakdown by action.")
+            lines.append(f"# TYPE {command_metric} histogram")
+            for action, phases in sorted(self._commands.items()):
+                for phase, hist in phases.items():
+                    if hist.count:
+                        self._prom_histogram(lines, command_metric, {"action": action, "phase": phase}, hist)
+        return "\n".join(lines) + "\n"
+
+    def _command_phases(self, action: str) -> Dict[str, LatencyHistogram]:
+        phases = self._commands.get(action)
+        if phases is None:
+            phases = self._commands[action] = {
+                phase: LatencyHistogram(self.significant_bits) for phase in COMMAND_PHASES
+            }
+        return phases
+
+    def _track_enqueued(self, event: RequestEvent, response: Dict[str, Any]) -> None:
+        if not self.max_tracked:
+            return
+        ids = response.get("command_ids")
+        if isinstance(ids, list):
+            specs = (event.payload or {}).get("commands") if isinstance(event.payload, dict) else None
+            actions = [spec.get("action") if isinstance(spec, dict) else None for spec in specs or []]
+        elif response.get("command_id"):
+            ids = [response["command_id"]]
+            actions = [response.get("action")]
+        else:
+            return
+        with self._lock:
+            for index, command_id in enumerate(ids):
+                action = actions[index] if index < len(actions) and actions[index] else "custom"
+                self._tracked[str(command_id)] = (str(action), event.started, event.total_ms)
+            while len(self._tracked) > self.max_tracked:
+                self._tracked.popitem(last=False)
+
+    @staticmethod
+    def _prom_histogram(lines: List[str], metric: str, labels: Dict[str, str], hist: LatencyHistogram) -> None:
+        for bound, count in zip(LATENCY_BUCKETS_MS, hist.cumulative(LATENCY_BUCKETS_MS)):
+            lines.append(f"{metric}_bucket{_prom_labels(dict(labels, le=f'{bound / 1000:g}'))} {count}")
+        lines.append(f"{metric}_bucket{_prom_labels(dict(labels, le='+Inf'))} {hist.count}")
+        lines.append(f"{metric}_sum{_prom_labels(labels)} {hist.total_ms / 1000:.6f}")
+        lines.append(f"{metric}_count{_prom_labels(labels)} {hist.count}")
+
 
 @dataclass
 class NovaBlox:
@@ -23,49 +1307,249 @@ class NovaBlox:
     port: int = 30010
     timeout: int = 60
     api_key: Optional[str] = None
+    pool_size: int = DEFAULT_POOL_SIZE
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT
+    transport: Optional[Transport] = field(default=None, repr=False, compare=False)
+    codec: Optional[Union[str, JSONCodec]] = field(default=None, repr=False, compare=False)
+    throttle: Optional[RateLimitThrottle] = field(default=None, repr=False, compare=False)
+    rate_limit: bool = True
+    hooks: List[Any] = field(default_factory=list, repr=False, compare=False)
+    local_planner: bool = True
+    plan_cache: Optional[PlanCache] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._planner: Optional[LocalPlanner] = None
+        self._scene_etag: Optional[str] = None
+        self.codec = default_codec(self.codec)
+        if self.throttle is None and self.rate_limit:
+            self.throttle = RateLimitThrottle()
+        if self.transport is None:
+            self.transport = HTTPConnectionPool(
+                self.host,
+                self.port,
+                pool_size=self.pool_size,
+                idle_timeout=self.idle_timeout,
+                timeout=self.timeout,
+            )
+
+    def __enter__(self) -> "NovaBlox":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.transport is not None:
+            self.transport.close()
 
     @property
     def base_url(self) -> str:
         return f"http://{self.host}:{self.port}/bridge"
 
-    def _request(self, method: str, route: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def _request(
+        self,
+        method: str,
+        route: str,
+        data: Optional[Union[Dict[str, Any], MultipartUpload]] = None,
+        *,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        body, headers = self._encode_request(data, headers)
+        if not self.hooks:
+            return self._decode_response(self._send(method, route, body, headers, timeout))
+        event = self._begin_event(method, route, data, body)
+        try:
+            resp = self._send(method, route, body, headers, timeout, event)
+            return self._finish_event(event, resp)
+        except NovaBloxError as exc:
+            self._fail_event(event, exc)
+            raise
+
+    def _send(
+        self,
+        method: str,
+        route: str,
+        body: Optional[Union[bytes, MultipartUpload]],
+        headers: Dict[str, str],
+        timeout: Optional[float],
+        event: Optional[RequestEvent] = None,
+    ) -> TransportResponse:
+        throttle = self.throttle
+        attempt = 0
+        while True:
+            if event is not None:
+                event.attempts += 1
+            if throttle is not None:
+                wait = throttle.reserve()
+                if wait:
+                    if event is not None:
+                        event.throttle_ms += wait * 1000.0
+                    time.sleep(wait)
+                throttle.begin()
+            try:
+                resp = self.transport.request(
+                    method,
+                    f"/bridge{route}",
+                    body=body,
+                    headers=headers,
+                    timeout=timeout,
+                )
+            except (OSError, http.client.HTTPException) as exc:
+                if throttle is not None:
+                    throttle.observe(None)
+                raise NovaBloxError(f"Connection failed: {exc}") from exc
+            if throttle is not None and throttle.observe(resp.status, resp.headers) is not None:
+                # The limiter rejects before the route runs, so a retry is safe.
+                attempt += 1
+                if attempt <= throttle.max_retries:
+                    continue
+            return resp
+
+    def _begin_event(self, method: str, route: str, data: Any, body: Any) -> RequestEvent:
+        event = RequestEvent(
+            method=method,
+            route=route_template(route),
+            target=route,
+            payload=data,
+            bytes_out=len(body) if body is not None else 0,
+            started=time.perf_counter(),
+        )
+        self._emit("pre_request", event)
+        return event
+
+    def _finish_event(self, event: RequestEvent, resp: TransportResponse) -> Dict[str, Any]:
+        event.status = resp.status
+        event.bytes_in = len(resp.body)
+        event.connect_ms = resp.timings.get("connect_ms", 0.0)
+        event.ttfb_ms = resp.timings.get("ttfb_ms", 0.0)
+        event.read_ms = resp.timings.get("read_ms", 0.0)
+        decode_started = time.perf_counter()
+        try:
+            decoded = self._decode_response(resp)
+        except NovaBloxError:
+            event.decode_ms = (time.perf_counter() - decode_started) * 1000.0
+            raise
+        finished = time.perf_counter()
+        event.decode_ms = (finished - decode_started) * 1000.0
+        event.total_ms = (finished - event.started) * 1000.0
+        event.response = decoded
+        self._emit("post_request", event)
+        return decoded
+
+    def _fail_event(self, event: RequestEvent, exc: NovaBloxError) -> None:
+        event.total_ms = (time.perf_counter() - event.started) * 1000.0
+        event.error = str(exc)
+        self._emit("post_request", event)
+
+    def _emit(self, name: str, arg: Any) -> None:
+        for hook in self.hooks:
+            callback = getattr(hook, name, None)
+            if callback is not None:
+                callback(arg)
+
+    def instrument(self, collector: Optional["LatencyCollector"] = None) -> "LatencyCollector":
+        """Attach a `LatencyCollector` (a new one by default) and return it."""
+        collector = collector or LatencyCollector()
+        self.hooks.append(collector)
+        return collector
+
+    def _encode_request(
+        self,
+        data: Optional[Union[Dict[str, Any], MultipartUpload]],
+        extra_headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[Optional[Union[bytes, MultipartUpload]], Dict[str, str]]:
         body = None
-        headers = {}
-        if data is not None:
-            body = json.dumps(data).encode("utf-8")
+        headers = dict(extra_headers or {})
+        if isinstance(data, MultipartUpload):
+            body = data
+            headers["Content-Type"] = data.content_type
+            headers["Content-Length"] = str(len(data))
+        elif data is not None:
+            body = self.codec.dumps(data)
             headers["Content-Type"] = "application/json"
             headers["Content-Length"] = str(len(body))
+        if isinstance(data, dict) and data.get("idempotency_key"):
+            # Lets the transport replay the request after a dropped connection.
+            headers.setdefault("X-Idempotency-Key", str(data["idempotency_key"]))
         if self.api_key:
             headers["X-API-Key"] = self.api_key
+        return body, headers
 
-        req = urllib.request.Request(
-            f"{self.base_url}{route}",
-            method=method,
-            data=body,
-            headers=headers,
-        )
+    def _decode_response(self, resp: TransportResponse) -> Dict[str, Any]:
+        if resp.status >= 400:
+            detail = resp.body.decode("utf-8", errors="replace")
+            raise NovaBloxError(f"HTTP {resp.status}: {detail}", status=resp.status)
+        if resp.status == 304:
+            return {"status": "not_modified", "etag": resp.header("etag")}
+        if not resp.body:
+            return {"status": "ok"}
         try:
-            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
-                payload = resp.read()
-                if not payload:
-                    return {"status": "ok"}
-                return json.loads(payload)
-        except urllib.error.HTTPError as exc:
-            detail = exc.read().decode("utf-8", errors="replace")
-            raise NovaBloxError(f"HTTP {exc.code}: {detail}") from exc
-        except urllib.error.URLError as exc:
-            raise NovaBloxError(f"Connection failed: {exc.reason}") from exc
-        except json.JSONDecodeError as exc:
+            return self.codec.loads(resp.body)
+        except ValueError as exc:
             raise NovaBloxError(f"Invalid JSON response: {exc}") from exc
 
-    def _get(self, route: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    def batch(
+        self,
+        *,
+        max_size: int = DEFAULT_BATCH_SIZE,
+        max_delay: Optional[float] = DEFAULT_BATCH_DELAY,
+        idempotency_prefix: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+    ) -> "CommandBatch":
+        return CommandBatch(
+            self,
+            max_size=max_size,
+            max_delay=max_delay,
+            idempotency_prefix=idempotency_prefix,
+            expires_in_ms=expires_in_ms,
+        )
+
+    def spool(
+        self,
+        path: str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        fsync: bool = True,
+        retry_delay: float = 0.25,
+        max_retry_delay: float = 10.0,
+        compact_bytes: int = 4 * 1024 * 1024,
+        idempotency_prefix: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+    ) -> "CommandSpool":
+        return CommandSpool(
+            self,
+            path,
+            batch_size=batch_size,
+            fsync=fsync,
+            retry_delay=retry_delay,
+            max_retry_delay=max_retry_delay,
+            compact_bytes=compact_bytes,
+            idempotency_prefix=idempotency_prefix,
+            expires_in_ms=expires_in_ms,
+        )
+
+    def _get(
+        self,
+        route: str,
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
         final_route = route
         if params:
             final_route = f"{route}?{urllib.parse.urlencode(params)}"
-        return self._request("GET", final_route)
+        return self._request("GET", final_route, timeout=timeout, headers=headers)
 
-    def _post(self, route: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        return self._request("POST", route, data or {})
+    def _post(
+        self,
+        route: str,
+        data: Optional[Dict[str, Any]] = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        return self._request("POST", route, data or {}, timeout=timeout)
 
     def health(self) -> Dict[str, Any]:
         return self._get("/health")
@@ -79,6 +1563,10 @@ class NovaBlox:
     def planner_catalog(self) -> Dict[str, Any]:
         return self._get("/planner/catalog")
 
+    # Deterministic plans are built by LocalPlanner once the planner catalog is
+    # fetched; LLM plans, or any it cannot build, go to POST
+    # /bridge/assistant/plan. With a plan_cache, bridge answers are reused for
+    # the same request against an unchanged scene.
     def plan(
         self,
         *,
@@ -92,6 +1580,48 @@ class NovaBlox:
         timeout_ms: Optional[int] = None,
         include_scene_context: bool = True,
         scene_context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Build a command plan for ``prompt``, locally when `LocalPlanner` can."""
+        if self.local_planner and plans_locally(use_llm, provider):
+            local = self._plan_locally(prompt, template, provider, include_scene_context, scene_context)
+            if local is not None:
+                return local
+        key = None
+        if self.plan_cache is not None:
+            scene = self._scene_fingerprint(include_scene_context, scene_context)
+            key = self._plan_cache_key(prompt, template, use_llm, allow_dangerous, provider, model, temperature, scene)
+            cached = self.plan_cache.get(key) if key else None
+            if cached is not None:
+                return cached
+        payload = self._plan_payload(
+            prompt=prompt,
+            template=template,
+            use_llm=use_llm,
+            allow_dangerous=allow_dangerous,
+            provider=provider,
+            model=model,
+            temperature=temperature,
+            timeout_ms=timeout_ms,
+            include_scene_context=include_scene_context,
+            scene_context=scene_context,
+        )
+        response = self._post("/assistant/plan", payload)
+        self._cache_plan(key, response)
+        return response
+
+    def _plan_payload(
+        self,
+        *,
+        prompt: str,
+        template: Optional[str],
+        use_llm: bool,
+        allow_dangerous: bool,
+        provider: Optional[str],
+        model: Optional[str],
+        temperature: Optional[float],
+        timeout_ms: Optional[int],
+        include_scene_context: bool,
+        scene_context: Optional[Dict[str, Any]],
     ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
             "prompt": prompt,
@@ -112,7 +1642,76 @@ class NovaBlox:
             payload["allow_dangerous"] = True
         if scene_context and isinstance(scene_context, dict):
             payload["scene_context"] = scene_context
-        return self._post("/assistant/plan", payload)
+        return payload
+
+    def _scene_fingerprint(self, include_scene_context: bool, scene_context: Optional[Dict[str, Any]]) -> Optional[str]:
+        """What the bridge will plan against: the given context, or its own scene summary."""
+        if not include_scene_context:
+            return "none"
+        if isinstance(scene_context, dict) and scene_context:
+            return scene_fingerprint(scene_context)
+        try:
+            response = self.scene_introspection(if_none_match=self._scene_etag)
+        except NovaBloxError:
+            return None
+        return self._remember_scene_etag(response)
+
+    def _remember_scene_etag(self, response: Dict[str, Any]) -> Optional[str]:
+        if response.get("status") != "not_modified":
+            self._scene_etag = (response.get("introspection") or {}).get("etag")
+        return f"etag:{self._scene_etag}" if self._scene_etag else None
+
+    @staticmethod
+    def _plan_cache_key(
+        prompt: str,
+        template: Optional[str],
+        use_llm: bool,
+        allow_dangerous: bool,
+        provider: Optional[str],
+        model: Optional[str],
+        temperature: Optional[float],
+        scene: Optional[str],
+    ) -> Optional[str]:
+        if scene is None:
+            return None
+        return plan_cache_key(
+            prompt,
+            template,
+            provider,
+            model,
+            temperature,
+            scene,
+            use_llm=use_llm,
+            allow_dangerous=allow_dangerous,
+        )
+
+    def _cache_plan(self, key: Optional[str], response: Dict[str, Any]) -> None:
+        # An LLM failure answered with the deterministic fallback is not worth keeping.
+        if key and self.plan_cache is not None and not (response.get("assistant") or {}).get("fallback"):
+            self.plan_cache.put(key, response)
+
+    def _plan_locally(
+        self,
+        prompt: str,
+        template: Optional[str],
+        provider: Optional[str],
+        include_scene_context: bool,
+        scene_context: Optional[Dict[str, Any]],
+    ) -> Optional[Dict[str, Any]]:
+        planner = self._local_planner()
+        if planner is None:
+            return None
+        if not include_scene_context or not isinstance(scene_context, dict):
+            scene_context = None
+        return planner.plan(prompt, template, provider=provider, scene_context=scene_context)
+
+    def _local_planner(self) -> Optional[LocalPlanner]:
+        if self._planner is None:
+            try:
+                self._planner = LocalPlanner.from_responses(self.planner_catalog(), self.planner_templates())
+            except NovaBloxError:
+                return None
+        return self._planner
 
     def assistant_plan(
         self,
@@ -185,6 +1784,30 @@ class NovaBlox:
             payload["idempotency_prefix"] = idempotency_prefix
         return self._post("/assistant/execute", payload)
 
+    def run_plan(
+        self,
+        plan: Dict[str, Any],
+        *,
+        timeout: Optional[float] = None,
+        allow_dangerous: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        stop_on_failure: bool = False,
+        idempotency_prefix: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+        client_id: str = "python-plan",
+    ) -> Dict[str, Any]:
+        """Execute a plan client-side with `PlanExecutor`, independent steps in parallel."""
+        return PlanExecutor(
+            self,
+            plan,
+            allow_dangerous=allow_dangerous,
+            batch_size=batch_size,
+            stop_on_failure=stop_on_failure,
+            idempotency_prefix=idempotency_prefix,
+            expires_in_ms=expires_in_ms,
+            client_id=client_id,
+        ).run(timeout)
+
     def introspect_scene(
         self,
         *,
@@ -209,24 +1832,223 @@ class NovaBlox:
             ]
         return self._post("/introspection/scene", payload)
 
-    def scene_introspection(self, *, include_objects: bool = False) -> Dict[str, Any]:
-        return self._get(
+    def scene_introspection(
+        self,
+        *,
+        include_objects: bool = False,
+        if_none_match: Optional[str] = None,
+        columnar: bool = False,
+    ) -> Dict[str, Any]:
+        response = self._get(
             "/introspection/scene",
             {"include_objects": "true" if include_objects else "false"},
+            headers={"If-None-Match": if_none_match} if if_none_match else None,
         )
+        return _columnar_scene(response) if columnar else response
 
-    def command_status(self, command_id: str) -> Dict[str, Any]:
-        return self._get(f"/commands/{urllib.parse.quote(command_id)}")
-
-    def queue_command(
+    def iter_json(
         self,
-        *,
         route: str,
-        action: str,
-        payload: Optional[Dict[str, Any]] = None,
-        category: str = "custom",
-        priority: int = 0,
-        idempotency_key: Optional[str] = None,
+        path: Sequence[str],
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Any]:
+        """Stream the array at `path` of a GET response one element at a time."""
+        final_route = route
+        if params:
+            final_route = f"{route}?{urllib.parse.urlencode(params)}"
+        _body, headers = self._encode_request(None)
+        stream = getattr(self.transport, "stream", None)
+        chunks: Iterator[bytes] = iter(())
+        throttle = self.throttle
+        if throttle is not None:
+            wait = throttle.reserve()
+            if wait:
+                time.sleep(wait)
+            throttle.begin()
+        try:
+            try:
+                if stream is None:
+                    resp = self.transport.request("GET", f"/bridge{final_route}", headers=headers, timeout=timeout)
+                    chunks = iter([resp.body])
+                else:
+                    resp, chunks = stream("GET", f"/bridge{final_route}", headers=headers, timeout=timeout)
+            except BaseException:
+                if throttle is not None:
+                    throttle.observe(None)
+                raise
+            if throttle is not None:
+                throttle.observe(resp.status, resp.headers)
+            if resp.status >= 400:
+                detail = (resp.body or b"".join(chunks)).decode("utf-8", errors="replace")
+                raise NovaBloxError(f"HTTP {resp.status}: {detail}", status=resp.status)
+            yield from iter_json_array(chunks, path)
+            # Read the closing brackets so the connection can be reused.
+            for _chunk in chunks:
+                pass
+        except (OSError, http.client.HTTPException) as exc:
+            raise NovaBloxError(f"Connection failed: {exc}") from exc
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+
+    def iter_scene_objects(self, *, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """Stream `scene.objects` from the cached introspection snapshot."""
+        return self.iter_json(
+            "/introspection/scene",
+            ("introspection", "scene", "objects"),
+            {"include_objects": "true"},
+            timeout=timeout,
+        )
+
+    def recent_commands(
+        self,
+        limit: int = 50,
+        *,
+        cursor: Optional[str] = None,
+        status: Union[str, Iterable[str], None] = None,
+        action: Union[str, Iterable[str], None] = None,
+        category: Union[str, Iterable[str], None] = None,
+        since: Any = None,
+        until: Any = None,
+        fields: Union[str, Iterable[str], None] = None,
+        order: str = "desc",
+    ) -> Dict[str, Any]:
+        """One page of command history; pass its ``next_cursor`` back for the next."""
+        params = _command_query(limit, cursor, status, action, category, since, until, fields, order)
+        return self._get("/commands/recent", params)
+
+    def iter_commands(
+        self,
+        *,
+        status: Union[str, Iterable[str], None] = None,
+        action: Union[str, Iterable[str], None] = None,
+        category: Union[str, Iterable[str], None] = None,
+        since: Any = None,
+        until: Any = None,
+        fields: Union[str, Iterable[str], None] = None,
+        order: str = "desc",
+        page_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield every matching retained command, fetching one page at a time."""
+        cursor = None
+        while True:
+            page = self.recent_commands(
+                page_size,
+                cursor=cursor,
+                status=status,
+                action=action,
+                category=category,
+                since=since,
+                until=until,
+                fields=fields,
+                order=order,
+            )
+            yield from page.get("commands") or []
+            cursor = page.get("next_cursor")
+            if not cursor:
+                return
+
+    def iter_recent_commands(self, limit: int = 50, *, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        return self.iter_json("/commands/recent", ("commands",), {"limit": int(limit)}, timeout=timeout)
+
+    def command_status(self, command_id: str) -> Dict[str, Any]:
+        return self._get(f"/commands/{urllib.parse.quote(command_id)}")
+
+    # Ids the bridge no longer retains are left out; ids are sent chunk_size at
+    # a time.
+    def command_statuses(
+        self,
+        command_ids: Iterable[str],
+        *,
+        fields: Union[str, Iterable[str], None] = STATUS_FIELDS,
+        chunk_size: int = 500,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Look up many commands via ``POST /bridge/commands/status`` as ``{id: record}``."""
+        bodies = _status_chunks(command_ids, fields, chunk_size)
+        return _merge_status_responses([self._post("/commands/status", body) for body in bodies])
+
+    def events(self, *, client_id: str = "python-events", **options: Any) -> "EventStream":
+        return EventStream(self, client_id=client_id, **options)
+
+    # Commands still unfinished when timeout elapses report "pending".
+    def wait_for(
+        self,
+        command_ids: Iterable[str],
+        timeout: Optional[float] = None,
+        *,
+        client_id: str = "python-wait",
+    ) -> Dict[str, Dict[str, Any]]:
+        """Block until every command reaches a terminal status, over one SSE stream."""
+        remaining = {str(item) for item in command_ids}
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def settle(command_id: str, status: str, error: Any = None, execution_ms: Any = None) -> None:
+            with lock:
+                if command_id not in remaining:
+                    return
+                remaining.discard(command_id)
+                outcome = outcomes[command_id] = {
+                    "id": command_id,
+                    "status": status,
+                    "error": error,
+                    "execution_ms": execution_ms,
+                }
+                if not remaining:
+                    done.set()
+            if self.hooks:
+                self._emit("command_settled", outcome)
+
+        def reconcile(_event: BridgeEvent) -> None:
+            # Catch completions that happened before (or between) connections.
+            with lock:
+                pending = list(remaining)
+            try:
+                records = self.command_statuses(pending)
+            except NovaBloxError:
+                return
+            for command_id, command in records.items():
+                if command.get("status") in TERMINAL_STATUSES:
+                    settle(command_id, command["status"], command.get("error"), command.get("execution_ms"))
+
+        def on_terminal(event: BridgeEvent) -> None:
+            data = event.data if isinstance(event.data, dict) else {}
+            if data.get("id"):
+                settle(str(data["id"]), event.event, data.get("error"), data.get("execution_ms"))
+
+        if not remaining:
+            return outcomes
+        stream = self.events(client_id=client_id)
+        stream.on("connected", reconcile)
+        for status in TERMINAL_STATUSES:
+            stream.on(status, on_terminal)
+        # A refused stream ends the thread; wake up instead of waiting out the timeout.
+        stream.on_exit(lambda _error: done.set())
+        stream.start()
+        try:
+            done.wait(timeout)
+        finally:
+            stream.close()
+        with lock:
+            if stream.error is not None and remaining:
+                raise stream.error
+            for command_id in remaining:
+                outcomes[command_id] = {"id": command_id, "status": "pending", "error": None, "execution_ms": None}
+        return outcomes
+
+    def queue_command(
+        self,
+        *,
+        route: str,
+        action: str,
+        payload: Optional[Dict[str, Any]] = None,
+        category: str = "custom",
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
         expires_in_ms: Optional[int] = None,
         expires_at: Optional[str] = None,
     ) -> Dict[str, Any]:
@@ -248,6 +2070,123 @@ class NovaBlox:
             body,
         )
 
+    def queue_commands(self, commands: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return self._post("/commands/batch", {"commands": list(commands)})
+
+    def _submit_bulk(
+        self,
+        route: str,
+        payloads: List[Dict[str, Any]],
+        *,
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        idempotency_prefix: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        chunks = _bulk_chunks(route, payloads, chunk_size, idempotency_prefix)
+        return _merge_bulk_responses([self.queue_commands(chunk) for chunk in chunks])
+
+    def spawn_parts(
+        self,
+        positions: Iterable[Any],
+        sizes: Any = None,
+        colors: Any = None,
+        *,
+        names: Optional[Iterable[str]] = None,
+        name: str = "Part",
+        class_name: str = "Part",
+        material: Optional[str] = None,
+        anchored: bool = True,
+        parent_path: Optional[str] = None,
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        idempotency_prefix: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Queue one spawn-object per position through /commands/batch."""
+        points = _vector_rows(positions, "positions")
+        count = len(points)
+        size_rows = _broadcast_vectors(sizes, count, "sizes", [4.0, 1.0, 2.0])
+        color_rows = _broadcast(colors, count, "colors", "Bright red", atom=_is_color)
+        name_rows = _broadcast(None if names is None else list(names), count, "names", name)
+        payloads = []
+        for index in range(count):
+            payload: Dict[str, Any] = {
+                "class_name": class_name,
+                "name": name_rows[index],
+                "position": points[index],
+                "size": size_rows[index],
+                "color": color_rows[index],
+                "anchored": anchored,
+            }
+            if material:
+                payload["material"] = material
+            if parent_path:
+                payload["parent_path"] = parent_path
+            payloads.append(payload)
+        return self._submit_bulk(
+            "/scene/spawn-object",
+            payloads,
+            chunk_size=chunk_size,
+            idempotency_prefix=idempotency_prefix,
+        )
+
+    def set_transforms(
+        self,
+        paths: Iterable[str],
+        positions: Any = None,
+        rotations: Any = None,
+        *,
+        sizes: Any = None,
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        idempotency_prefix: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Queue one set-transform per path; vectors are per path or shared."""
+        targets = _target_paths(paths)
+        count = len(targets)
+        if positions is None and rotations is None and sizes is None:
+            raise NovaBloxError("set_transforms needs positions, rotations or sizes")
+        position_rows = _broadcast_vectors(positions, count, "positions")
+        rotation_rows = _broadcast_vectors(rotations, count, "rotations")
+        size_rows = _broadcast_vectors(sizes, count, "sizes")
+        payloads = []
+        for index, target in enumerate(targets):
+            payload: Dict[str, Any] = {"target_path": target}
+            if position_rows[index] is not None:
+                payload["position"] = position_rows[index]
+            if rotation_rows[index] is not None:
+                payload["rotation"] = rotation_rows[index]
+            if size_rows[index] is not None:
+                payload["size"] = size_rows[index]
+            payloads.append(payload)
+        return self._submit_bulk(
+            "/scene/set-transform",
+            payloads,
+            chunk_size=chunk_size,
+            idempotency_prefix=idempotency_prefix,
+        )
+
+    def set_properties(
+        self,
+        paths: Iterable[str],
+        property_name: str,
+        values: Any,
+        *,
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        idempotency_prefix: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Queue one set-property per path; `values` is per path or shared."""
+        if not property_name or not isinstance(property_name, str):
+            raise NovaBloxError("property_name is required")
+        targets = _target_paths(paths)
+        value_rows = _broadcast(values, len(targets), "values", None)
+        payloads = [
+            {"target_path": target, "property": property_name, "value": value}
+            for target, value in zip(targets, value_rows)
+        ]
+        return self._submit_bulk(
+            "/scene/set-property",
+            payloads,
+            chunk_size=chunk_size,
+            idempotency_prefix=idempotency_prefix,
+        )
+
     def spawn_part(
         self,
         *,
@@ -366,6 +2305,9 @@ class NovaBlox:
         scale_factor: Optional[float] = 3.571428,
         scale_fix: str = "blender_to_roblox",
         parent_path: Optional[str] = None,
+        upload_path: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dedup: bool = True,
     ) -> Dict[str, Any]:
         payload: Dict[str, Any] = {
             "scale_fix": scale_fix,
@@ -378,14 +2320,70 @@ class NovaBlox:
             payload["scale_factor"] = float(scale_factor)
         if parent_path:
             payload["parent_path"] = parent_path
+        if upload_path:
+            return self.upload_file("/asset/import-blender", upload_path, fields=payload, progress=progress, dedup=dedup)
         return self._post("/asset/import-blender", payload)
 
-    def blender_import_legacy(self, *, file_path: str, scale_factor: Optional[float] = None) -> Dict[str, Any]:
-        payload: Dict[str, Any] = {"file_path": file_path}
+    def blender_import_legacy(
+        self,
+        *,
+        file_path: Optional[str] = None,
+        scale_factor: Optional[float] = None,
+        upload_path: Optional[str] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dedup: bool = True,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {}
+        if file_path:
+            payload["file_path"] = file_path
         if scale_factor is not None:
             payload["scale_factor"] = float(scale_factor)
+        if upload_path:
+            return self.upload_file("/blender/import", upload_path, fields=payload, progress=progress, dedup=dedup)
         return self._post("/blender/import", payload)
 
+    def upload_model(
+        self,
+        file_path: str,
+        *,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dedup: bool = True,
+    ) -> Dict[str, Any]:
+        """Upload a local model file and queue its import."""
+        return self.upload_file("/asset/import-model/upload", file_path, progress=progress, dedup=dedup)
+
+    # With dedup the file's SHA-256 is looked up on the bridge first; if the
+    # import dir already holds an identical file only the digest is sent. The
+    # response's upload entry says which happened.
+    def upload_file(
+        self,
+        route: str,
+        file_path: str,
+        *,
+        fields: Optional[Dict[str, Any]] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dedup: bool = True,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """Stream a local file to an import route as multipart/form-data."""
+        form = {key: value for key, value in (fields or {}).items() if value is not None}
+        name = os.path.basename(file_path)
+        digest = file_sha256(file_path) if dedup else None
+        if digest is not None:
+            stored = self._get(f"/asset/imports/{digest}", {"name": name})
+            if stored.get("exists"):
+                form.update(content_sha256=digest, original_name=name)
+                result = self._post(route, form, timeout=timeout)
+                result["upload"] = {"content_sha256": digest, "uploaded": False, "bytes": stored.get("bytes")}
+                return result
+            # Sent ahead of the file so the bridge can verify what it received.
+            form["content_sha256"] = digest
+        body = MultipartUpload(file_path, fields=form, filename=name, chunk_size=chunk_size, progress=progress)
+        result = self._request("POST", route, body, timeout=timeout)
+        result["upload"] = {"content_sha256": digest, "uploaded": True, "bytes": body.size}
+        return result
+
     def test_spawn(
         self,
         *,
@@ -413,8 +2411,22 @@ class NovaBlox:
             payload["external_capture_url"] = external_capture_url
         return self._post("/viewport/screenshot", payload)
 
-    def pull_commands(self, client_id: str = "python-client", limit: int = 20) -> Dict[str, Any]:
-        return self._get("/commands", {"client_id": client_id, "limit": max(1, min(100, int(limit)))})
+    # With wait_ms the bridge holds an empty pull open until a command is
+    # queued or the wait (capped at 25 s) runs out. Older bridges ignore it and
+    # answer at once; their responses carry no wait_ms.
+    def pull_commands(
+        self,
+        client_id: str = "python-client",
+        limit: int = 20,
+        *,
+        wait_ms: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """Lease up to ``limit`` queued commands."""
+        params: Dict[str, Any] = {"client_id": client_id, "limit": max(1, min(100, int(limit)))}
+        if not wait_ms:
+            return self._get("/commands", params)
+        params["wait_ms"] = max(0, int(wait_ms))
+        return self._get("/commands", params, timeout=self.timeout + params["wait_ms"] / 1000.0)
 
     def report_result(
         self,
@@ -443,3 +2455,1705 @@ class NovaBlox:
             "/results",
             payload,
         )
+
+    def report_results(self, results: List[Dict[str, Any]], *, client_id: Optional[str] = None) -> Dict[str, Any]:
+        body: Dict[str, Any] = {"results": list(results)}
+        if client_id:
+            body["client_id"] = client_id
+        return self._post("/results/batch", body)
+
+
+class _CommandSink(ABC):
+    """Routes `NovaBlox` queueing helpers to `add()` instead of over HTTP."""
+
+    def __getattr__(self, name: str) -> Any:
+        helper = getattr(NovaBlox, name, None)
+        if name.startswith("_") or not isinstance(helper, types.FunctionType):
+            raise AttributeError(name)
+        return types.MethodType(helper, self)
+
+    @abstractmethod
+    def add(self, **_command: Any) -> "Future[str]":
+        ...
+
+    def _post(
+        self,
+        route: str,
+        data: Optional[Dict[str, Any]] = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> "Future[str]":
+        body = dict(data or {})
+        if route == "/command":
+            return self.add(
+                route=body["route"],
+                action=body["action"],
+                payload=body.get("payload"),
+                category=body.get("category", "custom"),
+                priority=body.get("priority", 0),
+                idempotency_key=body.get("idempotency_key"),
+                expires_in_ms=body.get("expires_in_ms"),
+                expires_at=body.get("expires_at"),
+            )
+        spec = COMMAND_ROUTES.get(route)
+        if spec is None:
+            raise NovaBloxError(f"{route} cannot be batched")
+        category, action = spec
+        return self.add(route=f"/bridge{route}", action=action, category=category, payload=body)
+
+    def _get(self, route: str, *_args: Any, **_kwargs: Any) -> Dict[str, Any]:
+        raise NovaBloxError(f"GET {route} cannot be batched")
+
+    def _submit_bulk(
+        self,
+        route: str,
+        payloads: List[Dict[str, Any]],
+        **_options: Any,
+    ) -> "List[Future[str]]":
+        return [self._post(route, payload) for payload in payloads]
+
+
+# Queueing helpers return a Future that resolves to the command id. Commands
+# are flushed at max_size, after max_delay, on flush() and on close; each
+# carries an idempotency key so a retried flush is deduped by the bridge.
+class CommandBatch(_CommandSink):
+    """Buffers command helpers and flushes them through /bridge/commands/batch."""
+
+    def __init__(
+        self,
+        client: NovaBlox,
+        *,
+        max_size: int = DEFAULT_BATCH_SIZE,
+        max_delay: Optional[float] = DEFAULT_BATCH_DELAY,
+        idempotency_prefix: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+    ) -> None:
+        self.client = client
+        self.max_size = max(1, int(max_size))
+        self.max_delay = None if max_delay is None else max(0.0, float(max_delay))
+        self.idempotency_prefix = idempotency_prefix or f"sdk-batch-{uuid.uuid4().hex[:12]}"
+        self.expires_in_ms = expires_in_ms
+        self.requests_sent = 0
+        self.commands_sent = 0
+        self.deduped_count = 0
+        self.last_error: Optional[Exception] = None
+        self._buffer: List[Tuple[Dict[str, Any], Future]] = []
+        self._oldest_at: Optional[float] = None
+        self._sequence = 0
+        self._closed = False
+        self._lock = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._timer: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "CommandBatch":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def add(
+        self,
+        *,
+        route: str,
+        action: str,
+        payload: Optional[Dict[str, Any]] = None,
+        category: str = "custom",
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+        expires_at: Optional[str] = None,
+    ) -> "Future[str]":
+        future: "Future[str]" = Future()
+        with self._lock:
+            if self._closed:
+                raise NovaBloxError("command batch is closed")
+            self._sequence += 1
+            command: Dict[str, Any] = {
+                "route": route,
+                "category": category,
+                "action": action,
+                "priority": int(priority),
+                "payload": payload or {},
+                "idempotency_key": idempotency_key or f"{self.idempotency_prefix}-{self._sequence}",
+            }
+            if expires_at:
+                command["expires_at"] = expires_at
+            elif expires_in_ms is not None or self.expires_in_ms is not None:
+                command["expires_in_ms"] = int(expires_in_ms if expires_in_ms is not None else self.expires_in_ms)
+            self._buffer.append((command, future))
+            if self._oldest_at is None:
+                self._oldest_at = time.monotonic()
+            full = len(self._buffer) >= self.max_size
+            if not full:
+                self._ensure_timer()
+                self._lock.notify_all()
+        if full:
+            self.flush()
+        return future
+
+    def flush(self) -> List[str]:
+        command_ids: List[str] = []
+        with self._flush_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+                self._oldest_at = None
+            # Adds that race a running flush can leave more than max_size
+            # pending. If one chunk fails the rest are not sent, but their
+            # futures still fail with the same error.
+            for start in range(0, len(pending), self.max_size):
+                chunk = pending[start : start + self.max_size]
+                try:
+                    command_ids.extend(self._send(chunk))
+                except Exception as exc:
+                    for _, future in pending[start + self.max_size :]:
+                        future.set_exception(exc)
+                    raise
+        return command_ids
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._lock.notify_all()
+        self.flush()
+        if self._timer is not None and self._timer is not threading.current_thread():
+            self._timer.join()
+
+    def _send(self, chunk: List[Tuple[Dict[str, Any], Future]]) -> List[str]:
+        try:
+            response = self.client.queue_commands([command for command, _ in chunk])
+            command_ids = list(response.get("command_ids") or [])
+            if len(command_ids) != len(chunk):
+                raise NovaBloxError(
+                    f"batch response returned {len(command_ids)} ids for {len(chunk)} commands"
+                )
+        except Exception as exc:
+            self.last_error = exc
+            for _, future in chunk:
+                future.set_exception(exc)
+            raise
+        self.requests_sent += 1
+        self.commands_sent += len(chunk)
+        self.deduped_count += int(response.get("deduped_count") or 0)
+        for (_, future), command_id in zip(chunk, command_ids):
+            future.set_result(command_id)
+        return command_ids
+
+    def _ensure_timer(self) -> None:
+        if self.max_delay is None or self._timer is not None:
+            return
+        self._timer = threading.Thread(target=self._run_timer, name="novablox-batch-flush", daemon=True)
+        self._timer.start()
+
+    def _run_timer(self) -> None:
+        while True:
+            with self._lock:
+                while not self._closed and self._oldest_at is None:
+                    self._lock.wait()
+                if self._closed:
+                    return
+                due = self._oldest_at + self.max_delay - time.monotonic()
+                if due > 0:
+                    self._lock.wait(due)
+                    continue
+            try:
+                self.flush()
+            except Exception:
+                # The affected futures and last_error carry the failure.
+                pass
+
+
+# Helpers append to the log and return a Future at once. A commit thread writes
+# everything appended since its last pass with one write and one fsync (group
+# commit); a drain thread replays durable records in order through
+# /bridge/commands/batch with backoff and resolves the futures. Records keep
+# their idempotency keys, so a batch resent after a crash is deduped by the
+# bridge. Reopening a log resumes its unacknowledged records. A batch rejected
+# with a 4xx other than 429 is dropped so it cannot block the log. Only one
+# spool should use a path at a time.
+class CommandSpool(_CommandSink):
+    """Write-ahead log that queues commands while the bridge is slow or down."""
+
+    def __init__(
+        self,
+        client: NovaBlox,
+        path: str,
+        *,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        fsync: bool = True,
+        retry_delay: float = 0.25,
+        max_retry_delay: float = 10.0,
+        compact_bytes: int = 4 * 1024 * 1024,
+        idempotency_prefix: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+    ) -> None:
+        self.client = client
+        self.path = os.path.expanduser(str(path))
+        self.batch_size = max(1, int(batch_size))
+        self.fsync = fsync
+        self.retry_delay = max(0.0, float(retry_delay))
+        self.max_retry_delay = max(self.retry_delay, float(max_retry_delay))
+        self.compact_bytes = max(0, int(compact_bytes))
+        self.idempotency_prefix = idempotency_prefix or f"sdk-spool-{uuid.uuid4().hex[:12]}"
+        self.expires_in_ms = expires_in_ms
+        self.last_error: Optional[Exception] = None
+        self.stats: Dict[str, int] = {
+            "appended": 0,
+            "recovered": 0,
+            "fsyncs": 0,
+            "requests_sent": 0,
+            "commands_sent": 0,
+            "deduped_count": 0,
+            "rejected": 0,
+            "retries": 0,
+            "compactions": 0,
+        }
+        self._lock = threading.Condition()
+        self._pending: Deque[Tuple[int, Dict[str, Any], Optional[Future]]] = deque()
+        self._unwritten: List[bytes] = []
+        self._seq = 0
+        self._durable = 0
+        self._acked = 0
+        self._size = 0
+        self._closed = False
+        self._stopping = False
+        self._fd = self._recover()
+        self._committer = threading.Thread(target=self._run_commit, name="novablox-spool-commit", daemon=True)
+        self._drainer = threading.Thread(target=self._run_drain, name="novablox-spool-drain", daemon=True)
+        self._committer.start()
+        self._drainer.start()
+
+    def __enter__(self) -> "CommandSpool":
+        return self
+
+    def __exit__(self, *_exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def add(
+        self,
+        *,
+        route: str,
+        action: str,
+        payload: Optional[Dict[str, Any]] = None,
+        category: str = "custom",
+        priority: int = 0,
+        idempotency_key: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+        expires_at: Optional[str] = None,
+    ) -> "Future[str]":
+        future: "Future[str]" = Future()
+        if expires_in_ms is None:
+            expires_in_ms = self.expires_in_ms
+        if not expires_at and expires_in_ms is not None:
+            # Fixed now, so a command replayed after an outage keeps its deadline.
+            expires_at = _utc_iso(time.time() + int(expires_in_ms) / 1000.0)
+        with self._lock:
+            if self._closed:
+                raise NovaBloxError("command spool is closed")
+            self._seq += 1
+            command: Dict[str, Any] = {
+                "route": route,
+                "category": category,
+                "action": action,
+                "priority": int(priority),
+                "payload": payload or {},
+                "idempotency_key": idempotency_key or f"{self.idempotency_prefix}-{self._seq}",
+            }
+            if expires_at:
+                command["expires_at"] = expires_at
+            self._pending.append((self._seq, command, future))
+            self._unwritten.append(self._record({"seq": self._seq, "command": command}))
+            self.stats["appended"] += 1
+            self._lock.notify_all()
+        return future
+
+    def sync(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every command added so far is on disk."""
+        with self._lock:
+            target = self._seq
+            return self._lock.wait_for(lambda: self._durable >= target or self._stopping, timeout) and (
+                self._durable >= target
+            )
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until the bridge has accepted every command added so far."""
+        with self._lock:
+            target = self._seq
+            return self._lock.wait_for(lambda: self._acked >= target or self._stopping, timeout) and (
+                self._acked >= target
+            )
+
+    # Anything left is sent by the next spool opened on the same path.
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Stop accepting commands and drain for up to ``timeout`` seconds; return whether it drained."""
+        with self._lock:
+            if self._stopping:
+                return not self._pending
+            self._closed = True
+        drained = self.flush(timeout)
+        with self._lock:
+            self._stopping = True
+            self._lock.notify_all()
+        self._drainer.join()
+        self._committer.join()
+        os.close(self._fd)
+        return drained
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "pending": len(self._pending),
+                "unwritten": len(self._unwritten),
+                "appended_seq": self._seq,
+                "durable_seq": self._durable,
+                "acked_seq": self._acked,
+                "log_bytes": self._size,
+                "last_error": None if self.last_error is None else str(self.last_error),
+                "path": self.path,
+            }
+
+    def _record(self, record: Dict[str, Any]) -> bytes:
+        return self.client.codec.dumps(record) + b"\n"
+
+    def _recover(self) -> int:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.path, "rb") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            data = b""
+        commands: Dict[int, Dict[str, Any]] = {}
+        valid = 0
+        for line in data.splitlines(keepends=True):
+            # A torn final line is what a crash mid-write leaves behind.
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = self.client.codec.loads(line)
+            except ValueError:
+                break
+            valid += len(line)
+            if "ack" in record:
+                self._acked = max(self._acked, int(record["ack"]))
+            else:
+                commands[int(record["seq"])] = record["command"]
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o600)
+        if valid < len(data):
+            os.ftruncate(fd, valid)
+        self._size = valid
+        self._seq = self._durable = max([self._acked, *commands])
+        for seq in sorted(commands):
+            if seq > self._acked:
+                self._pending.append((seq, commands[seq], None))
+        self.stats["recovered"] = len(self._pending)
+        return fd
+
+    def _run_commit(self) -> None:
+        while True:
+            with self._lock:
+                self._lock.wait_for(lambda: self._unwritten or self._stopping)
+                if not self._unwritten:
+                    return
+                # Everything appended while the last fsync ran goes out together.
+                chunk, self._unwritten = self._unwritten, []
+                last = self._seq
+            data = memoryview(b"".join(chunk))
+            written = 0
+            try:
+                while written < len(data):
+                    written += os.write(self._fd, data[written:])
+                if self.fsync:
+                    os.fsync(self._fd)
+            except OSError as exc:
+                with self._lock:
+                    self.last_error = exc
+                    self._size += written
+                    self._unwritten[:0] = [bytes(data[written:])]
+                    self._lock.wait(self.retry_delay)
+                continue
+            with self._lock:
+                self._size += written
+                self._durable = last
+                self.stats["fsyncs"] += 1
+                compact = self._acked >= last and self._size > self.compact_bytes
+                high_water = self._acked
+                self._lock.notify_all()
+            if compact:
+                # Every record written so far is acknowledged; later ones are
+                # still in memory and land in the emptied file. The ack record
+                # keeps the sequence so a reopened spool does not reuse keys.
+                header = self._record({"ack": high_water})
+                os.ftruncate(self._fd, 0)
+                os.write(self._fd, header)
+                if self.fsync:
+                    os.fsync(self._fd)
+                with self._lock:
+                    self._size = len(header)
+                    self.stats["compactions"] += 1
+
+    def _run_drain(self) -> None:
+        delay = self.retry_delay
+        while True:
+            with self._lock:
+                self._lock.wait_for(lambda: self._stopping or (self._pending and self._pending[0][0] <= self._durable))
+                if self._stopping:
+                    return
+                chunk = []
+                for item in self._pending:
+                    if item[0] > self._durable or len(chunk) >= self.batch_size:
+                        break
+                    chunk.append(item)
+            error: Optional[Exception] = None
+            command_ids: List[str] = []
+            try:
+                response = self.client.queue_commands([command for _, command, _ in chunk])
+                command_ids = [str(command_id) for command_id in response.get("command_ids") or []]
+                if len(command_ids) != len(chunk):
+                    raise NovaBloxError(f"batch response returned {len(command_ids)} ids for {len(chunk)} commands")
+            except Exception as exc:
+                status = getattr(exc, "status", None)
+                # Any 4xx but 429 means the bridge refused this batch as sent.
+                if status is None or status == 429 or status >= 500:
+                    with self._lock:
+                        self.last_error = exc
+                        self.stats["retries"] += 1
+                        deadline = time.monotonic() + delay
+                        while not self._stopping and time.monotonic() < deadline:
+                            self._lock.wait(deadline - time.monotonic())
+                    delay = min(delay * 2 or self.retry_delay, self.max_retry_delay)
+                    continue
+                error = exc
+            delay = self.retry_delay
+            with self._lock:
+                for _ in chunk:
+                    self._pending.popleft()
+                self._acked = chunk[-1][0]
+                self._unwritten.append(self._record({"ack": self._acked}))
+                if error is None:
+                    self.last_error = None
+                    self.stats["requests_sent"] += 1
+                    self.stats["commands_sent"] += len(chunk)
+                    self.stats["deduped_count"] += int(response.get("deduped_count") or 0)
+                else:
+                    self.last_error = error
+                    self.stats["rejected"] += len(chunk)
+                self._lock.notify_all()
+            for index, (_, _, future) in enumerate(chunk):
+                if future is None:
+                    continue
+                if error is None:
+                    future.set_result(command_ids[index])
+                else:
+                    future.set_exception(error)
+
+
+# plan_dependencies decides which commands wait for which. Ready commands are
+# queued together through /bridge/commands/batch; completions arrive over one
+# event stream and release their dependents. A failure skips everything
+# downstream of it, and stop_on_failure also stops unrelated work. Idempotency
+# keys follow queuePlan (<plan id>:<step>:<action>), so a re-run dedupes steps
+# already queued.
+class PlanExecutor:
+    """Runs a plan's commands as a dependency graph instead of one flat queue."""
+
+    def __init__(
+        self,
+        client: NovaBlox,
+        plan: Dict[str, Any],
+        *,
+        allow_dangerous: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        stop_on_failure: bool = False,
+        idempotency_prefix: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+        client_id: str = "python-plan",
+    ) -> None:
+        if "commands" not in plan and isinstance(plan.get("plan"), dict):
+            plan = plan["plan"]
+        self.client = client
+        self.plan = plan
+        self.commands: List[Dict[str, Any]] = list(plan.get("commands") or [])
+        if not allow_dangerous and any(command.get("risk") == "dangerous" for command in self.commands):
+            raise NovaBloxError("plan includes dangerous commands; set allow_dangerous=True to execute")
+        self.batch_size = max(1, int(batch_size))
+        self.stop_on_failure = stop_on_failure
+        self.idempotency_prefix = idempotency_prefix or str(plan.get("id") or f"sdk-plan-{uuid.uuid4().hex[:12]}")
+        self.expires_in_ms = expires_in_ms
+        self.client_id = client_id
+        self.dependencies = plan_dependencies(self.commands)
+
+    def run(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        count = len(self.commands)
+        started = time.perf_counter()
+        deadline = None if timeout is None else started + float(timeout)
+        dependents: List[List[int]] = [[] for _ in range(count)]
+        for index, deps in enumerate(self.dependencies):
+            for dep in deps:
+                dependents[dep].append(index)
+        waiting = [len(deps) for deps in self.dependencies]
+        states: List[Dict[str, Any]] = [
+            {"status": "not_submitted", "command_id": None, "error": None, "execution_ms": None} for _ in range(count)
+        ]
+        submitted_at: List[Optional[float]] = [None] * count
+        completed_at: List[Optional[float]] = [None] * count
+        by_id: Dict[str, int] = {}
+        early: Dict[str, Tuple[str, Any, Any]] = {}
+        events: "queue.Queue[Tuple[str, Any, Any, Any]]" = queue.Queue()
+        ready = [index for index in range(count) if not waiting[index]]
+        in_flight = 0
+        stopping = False
+        submissions = 0
+
+        def skip_downstream(index: int) -> None:
+            stack = list(dependents[index])
+            while stack:
+                item = stack.pop()
+                if states[item]["status"] == "not_submitted":
+                    states[item]["status"] = "skipped"
+                    stack.extend(dependents[item])
+
+        def settle(index: int, status: str, error: Any, execution_ms: Any) -> None:
+            nonlocal in_flight, stopping
+            if states[index]["status"] != "queued":
+                return
+            in_flight -= 1
+            completed_at[index] = time.perf_counter()
+            states[index].update(status=status, error=error, execution_ms=execution_ms)
+            if status == "succeeded":
+                for item in dependents[index]:
+                    waiting[item] -= 1
+                    if not waiting[item] and states[item]["status"] == "not_submitted":
+                        ready.append(item)
+            else:
+                skip_downstream(index)
+                stopping = stopping or self.stop_on_failure
+
+        def on_event(command_id: str, status: str, error: Any, execution_ms: Any) -> None:
+            index = by_id.get(command_id)
+            if index is None:
+                early[command_id] = (status, error, execution_ms)
+            else:
+                settle(index, status, error, execution_ms)
+
+        def reconcile(indices: Iterable[int]) -> None:
+            ids = [states[index]["command_id"] for index in indices]
+            try:
+                records = self.client.command_statuses(ids)
+            except NovaBloxError:
+                return
+            for command_id, command in records.items():
+                if command.get("status") in TERMINAL_STATUSES:
+                    settle(by_id[command_id], command["status"], command.get("error"), command.get("execution_ms"))
+
+        def submit(indices: List[int]) -> None:
+            nonlocal in_flight, submissions
+            for start in range(0, len(indices), self.batch_size):
+                chunk = indices[start : start + self.batch_size]
+                response = self.client.queue_commands([self._spec(index) for index in chunk])
+                submissions += 1
+                now = time.perf_counter()
+                for index, command_id in zip(chunk, response.get("command_ids") or []):
+                    command_id = str(command_id)
+                    by_id[command_id] = index
+                    submitted_at[index] = now
+                    states[index].update(status="queued", command_id=command_id)
+                    in_flight += 1
+                    if command_id in early:
+                        settle(index, *early.pop(command_id))
+                if response.get("deduped_count"):
+                    # Already-queued steps from an earlier run may have finished.
+                    reconcile(index for index in chunk if states[index]["status"] == "queued")
+
+        def on_terminal(event: BridgeEvent) -> None:
+            data = event.data if isinstance(event.data, dict) else {}
+            if data.get("id"):
+                events.put(("event", str(data["id"]), event.event, data))
+
+        stream = self.client.events(client_id=self.client_id)
+        stream.on("connected", lambda _event: events.put(("connected", None, None, None)))
+        for status in TERMINAL_STATUSES:
+            stream.on(status, on_terminal)
+        stream.on_exit(lambda _error: events.put(("closed", None, None, None)))
+        stream.start()
+        try:
+            while True:
+                if ready and not stopping:
+                    batch, ready[:] = sorted(ready), []
+                    submit(batch)
+                if not in_flight and not (ready and not stopping):
+                    break
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    break
+                try:
+                    item = events.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                while True:
+                    kind, command_id, status, data = item
+                    if kind == "closed":
+                        # No more completions can arrive once the stream thread is gone.
+                        if stream.error is not None:
+                            raise stream.error
+                        stopping = True
+                        in_flight = 0
+                        break
+                    if kind == "connected":
+                        reconcile(index for index in range(count) if states[index]["status"] == "queued")
+                    else:
+                        on_event(command_id, status, data.get("error"), data.get("execution_ms"))
+                    try:
+                        item = events.get_nowait()
+                    except queue.Empty:
+                        break
+        finally:
+            stream.close()
+
+        for state in states:
+            if state["status"] == "queued":
+                state["status"] = "pending"
+        return self._report(states, submitted_at, completed_at, started, submissions)
+
+    def _spec(self, index: int) -> Dict[str, Any]:
+        command = self.commands[index]
+        risk = command.get("risk") or "safe"
+        spec: Dict[str, Any] = {
+            "route": command.get("route"),
+            "category": command.get("category"),
+            "action": command.get("action"),
+            "payload": command.get("payload") or {},
+            "priority": 6 if risk == "dangerous" else 2 if risk == "caution" else 0,
+            "idempotency_key": f"{self.idempotency_prefix}:{index + 1}:{command.get('action')}",
+            "metadata": {
+                "planner": "novablox-python-executor",
+                "planner_template": (self.plan.get("workflow") or {}).get("template") or "custom",
+                "planner_title": self.plan.get("title"),
+                "planner_step": index + 1,
+                "planner_steps_total": len(self.commands),
+                "planner_risk": risk,
+                "planner_depends_on": [dep + 1 for dep in self.dependencies[index]],
+            },
+        }
+        if self.expires_in_ms is not None:
+            spec["expires_in_ms"] = int(self.expires_in_ms)
+        return spec
+
+    def _report(
+        self,
+        states: List[Dict[str, Any]],
+        submitted_at: List[Optional[float]],
+        completed_at: List[Optional[float]],
+        started: float,
+        submissions: int,
+    ) -> Dict[str, Any]:
+        def offset(value: Optional[float]) -> Optional[float]:
+            return None if value is None else (value - started) * 1000.0
+
+        durations = [
+            (done - sent) * 1000.0 if sent is not None and done is not None else 0.0
+            for sent, done in zip(submitted_at, completed_at)
+        ]
+        # Longest chain of dependent commands, weighted by observed duration.
+        finish: List[float] = []
+        previous: List[Optional[int]] = []
+        for index, deps in enumerate(self.dependencies):
+            best = max(deps, key=lambda dep: finish[dep], default=None)
+            finish.append(durations[index] + (finish[best] if best is not None else 0.0))
+            previous.append(best)
+        path: List[int] = []
+        cursor = max(range(len(finish)), key=finish.__getitem__, default=None)
+        while cursor is not None:
+            path.append(cursor)
+            cursor = previous[cursor]
+        path.reverse()
+
+        statuses = [state["status"] for state in states]
+        if all(status == "succeeded" for status in statuses):
+            overall = "succeeded"
+        elif "pending" in statuses or ("not_submitted" in statuses and "failed" not in statuses):
+            overall = "timeout"
+        else:
+            overall = "failed"
+        return {
+            "status": overall,
+            "plan_id": self.plan.get("id"),
+            "count": len(self.commands),
+            "submissions": submissions,
+            "elapsed_ms": (time.perf_counter() - started) * 1000.0,
+            "serial_ms": sum(durations),
+            "critical_path": {
+                "steps": [index + 1 for index in path],
+                "ms": finish[path[-1]] if path else 0.0,
+                "execution_ms": sum(states[index]["execution_ms"] or 0 for index in path),
+            },
+            "commands": [
+                {
+                    "step": index + 1,
+                    "action": command.get("action"),
+                    "command_id": state["command_id"],
+                    "status": state["status"],
+                    "error": state["error"],
+                    "depends_on": [dep + 1 for dep in self.dependencies[index]],
+                    "submitted_ms": offset(submitted_at[index]),
+                    "completed_ms": offset(completed_at[index]),
+                    "execution_ms": state["execution_ms"],
+                }
+                for index, (command, state) in enumerate(zip(self.commands, states))
+            ],
+        }
+
+
+@dataclass
+class BridgeEvent:
+    event: str
+    data: Any
+    id: Optional[str] = None
+
+
+def parse_sse(lines: Iterable[str]) -> Iterator[BridgeEvent]:
+    """Incrementally parse Server-Sent Events from an iterable of text lines."""
+    event_name = "message"
+    event_id: Optional[str] = None
+    data_lines: List[str] = []
+    for raw in lines:
+        line = raw.rstrip("\r\n")
+        if not line:
+            if data_lines:
+                text = "\n".join(data_lines)
+                try:
+                    data: Any = json.loads(text)
+                except json.JSONDecodeError:
+                    data = text
+                yield BridgeEvent(event=event_name, data=data, id=event_id)
+            event_name = "message"
+            data_lines = []
+            continue
+        if line.startswith(":"):
+            continue
+        key, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if key == "event":
+            event_name = value or "message"
+        elif key == "data":
+            data_lines.append(value)
+        elif key == "id":
+            event_id = value
+
+
+# Dropped or silent connections are reopened with exponential backoff; each new
+# connection begins with a "connected" event.
+class EventStream:
+    """Subscriber for `GET /bridge/stream` with automatic reconnects."""
+
+    def __init__(
+        self,
+        client: NovaBlox,
+        *,
+        client_id: str = "python-events",
+        read_timeout: float = DEFAULT_STREAM_READ_TIMEOUT,
+        backoff_initial: float = 0.5,
+        backoff_max: float = 15.0,
+        reconnect: bool = True,
+    ) -> None:
+        self.client = client
+        self.client_id = client_id
+        self.read_timeout = float(read_timeout)
+        self.backoff_initial = float(backoff_initial)
+        self.backoff_max = float(backoff_max)
+        self.reconnect = reconnect
+        self.reconnects = 0
+        self.error: Optional[NovaBloxError] = None
+        self._callbacks: Dict[str, List[Callable[[BridgeEvent], None]]] = {}
+        self._exit_callbacks: List[Callable[[Optional[NovaBloxError]], None]] = []
+        self._closed = threading.Event()
+        self._conn: Optional[http.client.HTTPConnection] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def on(self, event: str, callback: Callable[[BridgeEvent], None]) -> "EventStream":
+        self._callbacks.setdefault(event, []).append(callback)
+        return self
+
+    def on_exit(self, callback: Callable[[Optional[NovaBloxError]], None]) -> "EventStream":
+        """Call `callback(self.error)` once `run()` returns, whether closed or refused."""
+        self._exit_callbacks.append(callback)
+        return self
+
+    def __iter__(self) -> Iterator[BridgeEvent]:
+        delay = self.backoff_initial
+        while not self._closed.is_set():
+            try:
+                for event in self._read_stream():
+                    delay = self.backoff_initial
+                    self._dispatch(event)
+                    yield event
+            except NovaBloxError:
+                raise
+            except (OSError, http.client.HTTPException):
+                pass
+            if self._closed.is_set() or not self.reconnect:
+                return
+            self.reconnects += 1
+            self._closed.wait(delay * (0.5 + random.random() / 2))
+            delay = min(self.backoff_max, delay * 2)
+
+    def run(self) -> None:
+        try:
+            for _ in self:
+                pass
+        except NovaBloxError as exc:
+            self.error = exc
+        finally:
+            for callback in self._exit_callbacks:
+                callback(self.error)
+
+    def start(self) -> "EventStream":
+        self._thread = threading.Thread(target=self.run, name="novablox-events", daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        self._closed.set()
+        conn = self._conn
+        if conn is not None and conn.sock is not None:
+            try:
+                conn.sock.shutdown(2)
+            except OSError:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self.read_timeout)
+
+    def _read_stream(self) -> Iterator[BridgeEvent]:
+        query = urllib.parse.urlencode({"client_id": self.client_id})
+        headers = {"Accept": "text/event-stream", "Cache-Control": "no-cache"}
+        if self.client.api_key:
+            headers["X-API-Key"] = self.client.api_key
+        conn = http.client.HTTPConnection(self.client.host, self.client.port, timeout=self.read_timeout)
+        self._conn = conn
+        if self._closed.is_set():
+            conn.close()
+            return
+        try:
+            conn.request("GET", f"/bridge/stream?{query}", headers=headers)
+            resp = conn.getresponse()
+            if resp.status >= 400:
+                detail = resp.read().decode("utf-8", errors="replace")
+                if resp.status in (401, 403, 404):
+                    raise NovaBloxError(f"HTTP {resp.status}: {detail}", status=resp.status)
+                raise ConnectionError(f"HTTP {resp.status}: {detail}")
+            lines = (raw.decode("utf-8", errors="replace") for raw in iter(resp.readline, b""))
+            yield from parse_sse(lines)
+        finally:
+            self._conn = None
+            conn.close()
+
+    def _dispatch(self, event: BridgeEvent) -> None:
+        for callback in self._callbacks.get(event.event, []) + self._callbacks.get("*", []):
+            callback(event)
+
+
+def _as_list(values: Any) -> List[Any]:
+    if hasattr(values, "tolist"):  # numpy arrays and array.array
+        values = values.tolist()
+    return list(values)
+
+
+def _vector3(value: Any, label: str) -> List[float]:
+    try:
+        x, y, z = value
+        return [float(x), float(y), float(z)]
+    except (TypeError, ValueError) as exc:
+        raise NovaBloxError(f"{label} must be [x, y, z] numbers, got {value!r}") from exc
+
+
+def _is_color(value: Any) -> bool:
+    """A single BrickColor name or RGB triple, as opposed to one color per item."""
+    if isinstance(value, str):
+        return True
+    return (
+        isinstance(value, (list, tuple))
+        and len(value) == 3
+        and all(isinstance(channel, (int, float)) for channel in value)
+    )
+
+
+def _vector_rows(values: Any, label: str) -> List[List[float]]:
+    rows = _as_list(values)
+    if rows and not isinstance(rows[0], (list, tuple)):
+        # Flat [x0, y0, z0, x1, ...] sequences, e.g. a SceneColumns column.
+        if len(rows) % 3:
+            raise NovaBloxError(f"{label} has {len(rows)} values, expected a multiple of 3")
+        rows = [rows[i : i + 3] for i in range(0, len(rows), 3)]
+    return [_vector3(row, f"{label}[{index}]") for index, row in enumerate(rows)]
+
+
+def _broadcast(
+    values: Any,
+    count: int,
+    label: str,
+    default: Any,
+    *,
+    atom: Optional[Callable[[Any], bool]] = None,
+) -> List[Any]:
+    """One value per item: None -> default, a single value -> repeated, else per-item."""
+    if values is None:
+        return [default] * count
+    is_atom = atom(values) if atom is not None else isinstance(values, (str, bytes, int, float, bool, dict))
+    if is_atom:
+        return [values] * count
+    rows = _as_list(values)
+    if len(rows) != count:
+        raise NovaBloxError(f"{label} has {len(rows)} items, expected {count}")
+    return rows
+
+
+def _broadcast_vectors(
+    values: Any,
+    count: int,
+    label: str,
+    default: Optional[List[float]] = None,
+) -> List[Optional[List[float]]]:
+    if values is None:
+        return [default] * count
+    rows = _as_list(values)
+    if len(rows) == 3 and not isinstance(rows[0], (list, tuple)) and count != 1:
+        shared = _vector3(rows, label)
+        return [shared] * count
+    vectors = _vector_rows(rows, label)
+    if len(vectors) != count:
+        raise NovaBloxError(f"{label} has {len(vectors)} items, expected {count}")
+    return vectors
+
+
+def _target_paths(paths: Iterable[str]) -> List[str]:
+    """Normalize slashed or dotted `GetFullName()` paths into plugin `target_path`s."""
+    targets = []
+    for index, path in enumerate(_as_list(paths)):
+        if not isinstance(path, str) or not path:
+            raise NovaBloxError(f"paths[{index}] must be a non-empty string")
+        targets.append(path if "/" in path else path.replace(".", "/"))
+    return targets
+
+
+def _bulk_chunks(
+    route: str,
+    payloads: List[Dict[str, Any]],
+    chunk_size: int,
+    idempotency_prefix: Optional[str],
+) -> List[List[Dict[str, Any]]]:
+    category, action = COMMAND_ROUTES[route]
+    prefix = idempotency_prefix or f"sdk-bulk-{uuid.uuid4().hex[:12]}"
+    commands = [
+        {
+            "route": f"/bridge{route}",
+            "category": category,
+            "action": action,
+            "payload": payload,
+            "idempotency_key": f"{prefix}-{index}",
+        }
+        for index, payload in enumerate(payloads)
+    ]
+    size = max(1, int(chunk_size))
+    return [commands[start : start + size] for start in range(0, len(commands), size)]
+
+
+def _merge_bulk_responses(responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    command_ids: List[str] = []
+    deduped = 0
+    for response in responses:
+        command_ids.extend(response.get("command_ids") or [])
+        deduped += int(response.get("deduped_count") or 0)
+    return {
+        "status": "queued",
+        "count": len(command_ids),
+        "deduped_count": deduped,
+        "requests": len(responses),
+        "command_ids": command_ids,
+    }
+
+
+def _status_chunks(
+    command_ids: Iterable[str],
+    fields: Union[str, Iterable[str], None],
+    chunk_size: int,
+) -> List[Dict[str, Any]]:
+    ids = list(dict.fromkeys(str(item) for item in command_ids))
+    body: Dict[str, Any] = {}
+    if fields is not None:
+        body["fields"] = [fields] if isinstance(fields, str) else list(fields)
+    # The bridge accepts up to 1000 ids per request.
+    size = max(1, min(1000, int(chunk_size)))
+    return [dict(body, ids=ids[start : start + size]) for start in range(0, len(ids), size)]
+
+
+def _merge_status_responses(responses: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    return {str(record.get("id")): record for response in responses for record in response.get("commands") or []}
+
+
+def _take(items: Iterator[Any], count: int) -> List[Any]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= count:
+            break
+    return batch
+
+
+def _columnar_scene(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace `introspection.scene.objects` with a `SceneColumns` store."""
+    try:
+        from .novablox_scene import SceneColumns
+    except ImportError:
+        from novablox_scene import SceneColumns
+    scene = (response.get("introspection") or {}).get("scene")
+    if isinstance(scene, dict) and isinstance(scene.get("objects"), list):
+        scene["objects"] = SceneColumns.from_objects(scene["objects"])
+    return response
+
+
+def _utc_iso(timestamp: float) -> str:
+    moment = datetime.fromtimestamp(timestamp, timezone.utc)
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def _command_query(
+    limit: int,
+    cursor: Optional[str],
+    status: Any,
+    action: Any,
+    category: Any,
+    since: Any,
+    until: Any,
+    fields: Any,
+    order: str,
+) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"limit": max(1, min(500, int(limit)))}
+    if order != "desc":
+        params["order"] = order
+    if cursor:
+        params["cursor"] = cursor
+    for name, value in (("status", status), ("action", action), ("category", category), ("fields", fields)):
+        if value:
+            params[name] = value if isinstance(value, str) else ",".join(value)
+    for name, value in (("since", since), ("until", until)):
+        if isinstance(value, datetime):
+            params[name] = value.isoformat()
+        elif isinstance(value, (int, float)):
+            # Epoch seconds, like time.time().
+            params[name] = int(value * 1000)
+        elif value:
+            params[name] = str(value)
+    return params
+
+
+def _parse_iso_timestamp(value: Any) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def _run_handler(
+    handler: Callable[[Dict[str, Any]], Any],
+    command: Dict[str, Any],
+    start_by: float = float("inf"),
+) -> Dict[str, Any]:
+    # Checked here rather than at pull time: a command can sit in the pool's
+    # queue behind slow handlers until its lease has all but run out.
+    if time.time() > start_by:
+        return {"ok": False, "requeue": True, "error": "lease expired before start"}
+    started = time.perf_counter()
+    try:
+        result = handler(command)
+        ok, error = True, None
+    except Exception as exc:  # handler failures become command errors
+        result, ok, error = None, False, str(exc) or exc.__class__.__name__
+    return {
+        "ok": ok,
+        "result": result,
+        "error": error,
+        "execution_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+
+# Handlers are keyed by action and run on a thread pool, or a process pool with
+# executor="process" (they must then be picklable). Commands whose lease has
+# nearly run out are requeued rather than started. With wait_ms an idle worker
+# long-polls, so stop() takes effect once that pull returns.
+class NovaBloxWorker:
+    """Headless bridge executor: pulls commands, runs handlers, batches results."""
+
+    def __init__(
+        self,
+        client: NovaBlox,
+        handlers: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None,
+        *,
+        client_id: str = "python-worker",
+        max_workers: int = 4,
+        executor: str = "thread",
+        poll_interval: float = 0.2,
+        wait_ms: int = 0,
+        result_batch_size: int = 50,
+        result_flush_interval: float = 0.1,
+        lease_margin: float = 1.0,
+    ) -> None:
+        if executor not in ("thread", "process"):
+            raise ValueError("executor must be 'thread' or 'process'")
+        self.client = client
+        self.handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = dict(handlers or {})
+        self.client_id = client_id
+        self.max_workers = max(1, int(max_workers))
+        self.executor_kind = executor
+        self.poll_interval = max(0.0, float(poll_interval))
+        self.wait_ms = max(0, int(wait_ms))
+        self.result_batch_size = max(1, int(result_batch_size))
+        self.result_flush_interval = max(0.0, float(result_flush_interval))
+        self.lease_margin = max(0.0, float(lease_margin))
+        self.stats: Dict[str, int] = {
+            "pulled": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "unsupported": 0,
+            "lease_requeued": 0,
+            "reported": 0,
+            "rejected": 0,
+            "report_errors": 0,
+        }
+        self._results: List[Dict[str, Any]] = []
+        self._oldest_result_at: Optional[float] = None
+        self._stop = threading.Event()
+
+    def handler(self, action: str) -> Callable[[Callable[[Dict[str, Any]], Any]], Callable[[Dict[str, Any]], Any]]:
+        def register(func: Callable[[Dict[str, Any]], Any]) -> Callable[[Dict[str, Any]], Any]:
+            self.handlers[action] = func
+            return func
+
+        return register
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self, *, max_commands: Optional[int] = None, duration: Optional[float] = None) -> Dict[str, int]:
+        """Process commands until `stop()`, `max_commands` completions, or `duration` seconds."""
+        self._stop.clear()
+        deadline = None if duration is None else time.monotonic() + float(duration)
+        pool = self._make_executor()
+        in_flight: Dict[Future, Tuple[Dict[str, Any], float]] = {}
+        baseline = self._settled_count()
+        try:
+            while not self._stop.is_set():
+                completed = self._settled_count() - baseline
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                if max_commands is not None and completed >= max_commands:
+                    break
+                capacity = self.max_workers * 2 - len(in_flight)
+                if max_commands is not None:
+                    capacity = min(capacity, max_commands - completed - len(in_flight))
+                wait_ms = 0 if in_flight else self.wait_ms
+                if deadline is not None:
+                    wait_ms = min(wait_ms, int((deadline - time.monotonic()) * 1000))
+                pulled = self._pull(pool, in_flight, capacity, wait_ms) if capacity > 0 else 0
+
+                if in_flight:
+                    finished, _ = wait(
+                        list(in_flight),
+                        timeout=0 if pulled else self.poll_interval,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in finished:
+                        command, lease_deadline = in_flight.pop(future)
+                        self._complete(command, future.result(), lease_deadline)
+                elif not pulled:
+                    self._flush_results(force=True)
+                    if wait_ms <= 0:
+                        self._stop.wait(self.poll_interval)
+                self._flush_results()
+
+            for future in list(in_flight):
+                command, lease_deadline = in_flight.pop(future)
+                self._complete(command, future.result(), lease_deadline)
+        finally:
+            pool.shutdown(wait=True)
+            self._flush_results(force=True)
+        return dict(self.stats)
+
+    def _settled_count(self) -> int:
+        return self.stats["succeeded"] + self.stats["failed"] + self.stats["unsupported"]
+
+    def _make_executor(self) -> Executor:
+        if self.executor_kind == "process":
+            return ProcessPoolExecutor(max_workers=self.max_workers)
+        return ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="novablox-worker")
+
+    def _pull(
+        self,
+        pool: Executor,
+        in_flight: Dict[Future, Tuple[Dict[str, Any], float]],
+        capacity: int,
+        wait_ms: int = 0,
+    ) -> int:
+        # Results are flushed first: they must not wait behind a held pull.
+        if wait_ms > 0:
+            self._flush_results(force=True)
+        try:
+            response = self.client.pull_commands(client_id=self.client_id, limit=capacity, wait_ms=wait_ms)
+        except NovaBloxError:
+            self._stop.wait(self.poll_interval)
+            return 0
+        commands = response.get("commands") or []
+        if wait_ms > 0 and not commands and "wait_ms" not in response:
+            # The bridge predates long polling and answered at once.
+            self._stop.wait(self.poll_interval)
+        received_at = time.time()
+        for command in commands:
+            self.stats["pulled"] += 1
+            lease_deadline = self._lease_deadline(command, received_at)
+            handler = self.handlers.get(str(command.get("action")))
+            if handler is None:
+                self.stats["unsupported"] += 1
+                self._queue_result(
+                    command,
+                    {"ok": False, "error": f"unsupported action: {command.get('action')}", "execution_ms": 0.0},
+                )
+                continue
+            start_by = lease_deadline - self.lease_margin
+            in_flight[pool.submit(_run_handler, handler, command, start_by)] = (command, lease_deadline)
+        return len(commands)
+
+    def _lease_deadline(self, command: Dict[str, Any], received_at: float) -> float:
+        # Use the server's own lease length so clock skew between hosts cancels out.
+        dispatched = _parse_iso_timestamp(command.get("dispatched_at"))
+        expires = _parse_iso_timestamp(command.get("lease_expires_at"))
+        if dispatched is None or expires is None:
+            return float("inf")
+        return received_at + (expires - dispatched)
+
+    def _complete(self, command: Dict[str, Any], outcome: Dict[str, Any], lease_deadline: float) -> None:
+        if outcome.get("requeue"):
+            self.stats["lease_requeued"] += 1
+            self._queue_result(command, outcome, requeue=True)
+            return
+        self.stats["succeeded" if outcome["ok"] else "failed"] += 1
+        if time.time() > lease_deadline:
+            outcome = dict(outcome, lease_overrun=True)
+        self._queue_result(command, outcome)
+
+    def _queue_result(self, command: Dict[str, Any], outcome: Dict[str, Any], *, requeue: bool = False) -> None:
+        ok = bool(outcome.get("ok"))
+        self._results.append(
+            {
+                "command_id": command.get("id"),
+                "dispatch_token": command.get("dispatch_token"),
+                "ok": ok,
+                "status": "ok" if ok else "error",
+                "result": outcome.get("result"),
+                "error": outcome.get("error"),
+                "execution_ms": outcome.get("execution_ms"),
+                "requeue": requeue,
+                "client_id": self.client_id,
+            }
+        )
+        if self._oldest_result_at is None:
+            self._oldest_result_at = time.monotonic()
+
+    def _flush_results(self, *, force: bool = False) -> None:
+        if not self._results:
+            return
+        due = (
+            force
+            or len(self._results) >= self.result_batch_size
+            or time.monotonic() - (self._oldest_result_at or 0.0) >= self.result_flush_interval
+        )
+        if not due:
+            return
+        while self._results:
+            chunk = self._results[: self.result_batch_size]
+            try:
+                response = self.client.report_results(chunk, client_id=self.client_id)
+            except NovaBloxError:
+                # Keep results buffered; the bridge treats re-reports as duplicates.
+                self.stats["report_errors"] += 1
+                return
+            del self._results[: len(chunk)]
+            self.stats["reported"] += len(chunk)
+            self.stats["rejected"] += int(response.get("error_count") or 0)
+        self._oldest_result_at = None
+
+
+# Helpers are inherited unchanged; only _request is overridden, as a coroutine
+# on a pooled asyncio transport behind a max_concurrency semaphore.
+@dataclass
+class AsyncNovaBlox(NovaBlox):
+    """asyncio client exposing every `NovaBlox` request helper as a coroutine."""
+
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+
+    def __post_init__(self) -> None:
+        self.codec = default_codec(self.codec)
+        if self.throttle is None and self.rate_limit:
+            self.throttle = RateLimitThrottle()
+        if self.transport is None:
+            self.transport = AsyncHTTPConnectionPool(
+                self.host,
+                self.port,
+                pool_size=max(self.pool_size, self.max_concurrency),
+                idle_timeout=self.idle_timeout,
+                timeout=self.timeout,
+            )
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._sync: Optional[NovaBlox] = None
+        self._planner: Optional[LocalPlanner] = None
+        self._scene_etag: Optional[str] = None
+
+    async def __aenter__(self) -> "AsyncNovaBlox":
+        return self
+
+    async def __aexit__(self, *_exc: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:  # type: ignore[override]
+        if self.transport is not None:
+            await self.transport.close()
+        if self._sync is not None:
+            self._sync.close()
+
+    def batch(self, **_kwargs: Any) -> "CommandBatch":
+        raise NovaBloxError("batch() requires the synchronous NovaBlox client")
+
+    def spool(self, path: str, **_kwargs: Any) -> "CommandSpool":
+        raise NovaBloxError("spool() requires the synchronous NovaBlox client")
+
+    def events(self, *, client_id: str = "python-events", **options: Any) -> "EventStream":
+        return self._sync_client().events(client_id=client_id, **options)
+
+    async def wait_for(  # type: ignore[override]
+        self,
+        command_ids: Iterable[str],
+        timeout: Optional[float] = None,
+        *,
+        client_id: str = "python-wait",
+    ) -> Dict[str, Dict[str, Any]]:
+        ids = list(command_ids)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self._sync_client().wait_for(ids, timeout, client_id=client_id),
+        )
+
+    async def plan(  # type: ignore[override]
+        self,
+        *,
+        prompt: str,
+        template: Optional[str] = None,
+        use_llm: bool = False,
+        allow_dangerous: bool = False,
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        timeout_ms: Optional[int] = None,
+        include_scene_context: bool = True,
+        scene_context: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        if self.local_planner and plans_locally(use_llm, provider):
+            if self._planner is None:
+                try:
+                    catalog, templates = await asyncio.gather(self.planner_catalog(), self.planner_templates())
+                    self._planner = LocalPlanner.from_responses(catalog, templates)
+                except NovaBloxError:
+                    pass
+            local = self._plan_locally(prompt, template, provider, include_scene_context, scene_context)
+            if local is not None:
+                return local
+        key = None
+        if self.plan_cache is not None:
+            scene = await self._scene_fingerprint(include_scene_context, scene_context)
+            key = self._plan_cache_key(prompt, template, use_llm, allow_dangerous, provider, model, temperature, scene)
+            cached = self.plan_cache.get(key) if key else None
+            if cached is not None:
+                return cached
+        payload = self._plan_payload(
+            prompt=prompt,
+            template=template,
+            use_llm=use_llm,
+            allow_dangerous=allow_dangerous,
+            provider=provider,
+            model=model,
+            temperature=temperature,
+            timeout_ms=timeout_ms,
+            include_scene_context=include_scene_context,
+            scene_context=scene_context,
+        )
+        response = await self._post("/assistant/plan", payload)
+        self._cache_plan(key, response)
+        return response
+
+    async def _scene_fingerprint(  # type: ignore[override]
+        self,
+        include_scene_context: bool,
+        scene_context: Optional[Dict[str, Any]],
+    ) -> Optional[str]:
+        if not include_scene_context:
+            return "none"
+        if isinstance(scene_context, dict) and scene_context:
+            return scene_fingerprint(scene_context)
+        try:
+            response = await self.scene_introspection(if_none_match=self._scene_etag)
+        except NovaBloxError:
+            return None
+        return self._remember_scene_etag(response)
+
+    def _local_planner(self) -> Optional[LocalPlanner]:
+        # Loaded by plan() above; never fetched from here on the event loop.
+        return self._planner
+
+    async def run_plan(  # type: ignore[override]
+        self,
+        plan: Dict[str, Any],
+        *,
+        timeout: Optional[float] = None,
+        allow_dangerous: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        stop_on_failure: bool = False,
+        idempotency_prefix: Optional[str] = None,
+        expires_in_ms: Optional[int] = None,
+        client_id: str = "python-plan",
+    ) -> Dict[str, Any]:
+        # The executor waits on the event stream, so it runs on the sync twin.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self._sync_client().run_plan(
+                plan,
+                timeout=timeout,
+                allow_dangerous=allow_dangerous,
+                batch_size=batch_size,
+                stop_on_failure=stop_on_failure,
+                idempotency_prefix=idempotency_prefix,
+                expires_in_ms=expires_in_ms,
+                client_id=client_id,
+            ),
+        )
+
+    async def _submit_bulk(  # type: ignore[override]
+        self,
+        route: str,
+        payloads: List[Dict[str, Any]],
+        *,
+        chunk_size: int = DEFAULT_BATCH_SIZE,
+        idempotency_prefix: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        chunks = _bulk_chunks(route, payloads, chunk_size, idempotency_prefix)
+        responses = await asyncio.gather(*(self.queue_commands(chunk) for chunk in chunks))
+        return _merge_bulk_responses(list(responses))
+
+    async def command_statuses(  # type: ignore[override]
+        self,
+        command_ids: Iterable[str],
+        *,
+        fields: Union[str, Iterable[str], None] = STATUS_FIELDS,
+        chunk_size: int = 500,
+    ) -> Dict[str, Dict[str, Any]]:
+        bodies = _status_chunks(command_ids, fields, chunk_size)
+        responses = await asyncio.gather(*(self._post("/commands/status", body) for body in bodies))
+        return _merge_status_responses(list(responses))
+
+    async def iter_json(  # type: ignore[override]
+        self,
+        route: str,
+        path: Sequence[str],
+        params: Optional[Dict[str, Any]] = None,
+        *,
+        timeout: Optional[float] = None,
+        batch_size: int = 256,
+    ) -> AsyncIterator[Any]:
+        # The streaming parse blocks, so the sync twin runs it on a private
+        # worker thread and hands elements back a batch at a time. One worker
+        # means close() never races a read still in flight after cancellation.
+        # iter_scene_objects and iter_recent_commands inherit this.
+        loop = asyncio.get_running_loop()
+        items = self._sync_client().iter_json(route, path, params, timeout=timeout)
+        worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="novablox-iter-json")
+        size = max(1, int(batch_size))
+        try:
+            while True:
+                batch = await loop.run_in_executor(worker, _take, items, size)
+                for item in batch:
+                    yield item
+                if len(batch) < size:
+                    return
+        finally:
+            worker.submit(items.close)
+            worker.shutdown(wait=False)
+
+    async def iter_commands(  # type: ignore[override]
+        self,
+        *,
+        status: Union[str, Iterable[str], None] = None,
+        action: Union[str, Iterable[str], None] = None,
+        category: Union[str, Iterable[str], None] = None,
+        since: Any = None,
+        until: Any = None,
+        fields: Union[str, Iterable[str], None] = None,
+        order: str = "desc",
+        page_size: int = 500,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        cursor = None
+        while True:
+            page = await self.recent_commands(
+                page_size,
+                cursor=cursor,
+                status=status,
+                action=action,
+                category=category,
+                since=since,
+                until=until,
+                fields=fields,
+                order=order,
+            )
+            for command in page.get("commands") or []:
+                yield command
+            cursor = page.get("next_cursor")
+            if not cursor:
+                return
+
+    async def upload_file(  # type: ignore[override]
+        self,
+        route: str,
+        file_path: str,
+        *,
+        fields: Optional[Dict[str, Any]] = None,
+        progress: Optional[Callable[[int, int], None]] = None,
+        dedup: bool = True,
+        chunk_size: int = UPLOAD_CHUNK_SIZE,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        # Hashing and streaming from disk block, so they run on the sync twin.
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self._sync_client().upload_file(
+                route,
+                file_path,
+                fields=fields,
+                progress=progress,
+                dedup=dedup,
+                chunk_size=chunk_size,
+                timeout=timeout,
+            ),
+        )
+
+    async def scene_introspection(  # type: ignore[override]
+        self,
+        *,
+        include_objects: bool = False,
+        if_none_match: Optional[str] = None,
+        columnar: bool = False,
+    ) -> Dict[str, Any]:
+        response = await super().scene_introspection(
+            include_objects=include_objects,
+            if_none_match=if_none_match,
+        )
+        return _columnar_scene(response) if columnar else response
+
+    def _sync_client(self) -> NovaBlox:
+        """Blocking twin used for the streaming helpers, which run in threads."""
+        if self._sync is None:
+            self._sync = NovaBlox(
+                host=self.host,
+                port=self.port,
+                timeout=self.timeout,
+                api_key=self.api_key,
+                pool_size=self.pool_size,
+                idle_timeout=self.idle_timeout,
+                codec=self.codec,
+                throttle=self.throttle,
+                rate_limit=self.rate_limit,
+                hooks=self.hooks,
+            )
+        return self._sync
+
+    async def _request(  # type: ignore[override]
+        self,
+        method: str,
+        route: str,
+        data: Optional[Dict[str, Any]] = None,
+        *,
+        timeout: Optional[float] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Dict[str, Any]:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(max(1, int(self.max_concurrency)))
+        body, headers = self._encode_request(data, headers)
+        if not self.hooks:
+            return self._decode_response(await self._send(method, route, body, headers, timeout))
+        event = self._begin_event(method, route, data, body)
+        try:
+            resp = await self._send(method, route, body, headers, timeout, event)
+            return self._finish_event(event, resp)
+        except NovaBloxError as exc:
+            self._fail_event(event, exc)
+            raise
+
+    async def _send(  # type: ignore[override]
+        self,
+        method: str,
+        route: str,
+        body: Optional[bytes],
+        headers: Dict[str, str],
+        timeout: Optional[float],
+        event: Optional[RequestEvent] = None,
+    ) -> TransportResponse:
+        throttle = self.throttle
+        attempt = 0
+        while True:
+            if event is not None:
+                event.attempts += 1
+            if throttle is not None:
+                wait = throttle.reserve()
+                if wait:
+                    if event is not None:
+                        event.throttle_ms += wait * 1000.0
+                    await asyncio.sleep(wait)
+            async with self._semaphore:
+                if throttle is not None:
+                    throttle.begin()
+                try:
+                    resp = await self.transport.request(
+                        method,
+                        f"/bridge{route}",
+                        body=body,
+                        headers=headers,
+                        timeout=timeout,
+                    )
+                except asyncio.TimeoutError as exc:
+                    if throttle is not None:
+                        throttle.observe(None)
+                    raise NovaBloxError(f"Connection failed: timed out after {timeout or self.timeout}s") from exc
+                except (OSError, asyncio.IncompleteReadError, ValueError) as exc:
+                    if throttle is not None:
+                        throttle.observe(None)
+                    raise NovaBloxError(f"Connection failed: {exc}") from exc
+                except BaseException:
+                    if throttle is not None:
+                        throttle.observe(None)
+                    raise
+            if throttle is not None and throttle.observe(resp.status, resp.headers) is not None:
+                attempt += 1
+                if attempt <= throttle.max_retries:
+                    continue
+            return resp
@@ -0,0 +1,836 @@
+"""Local deterministic planner for the NovaBlox Python SDK.
+
+A port of the deterministic path of `server/assistant_engine.js`
+(`inferTemplate`, `buildTemplate`, `summarizeRisk`). Non-LLM plans are pure
+functions of the prompt and template, so the client can build them without
+a round trip to `POST /bridge/assistant/plan`. Route metadata and risk levels
+come from `/bridge/planner/catalog`, and the template ids the bridge offers
+come from `/bridge/planner/templates`. Keep the templates in step with the
+JS ones.
+
+LLM plans can't be rebuilt locally; `PlanCache` stores them instead, keyed
+by the request and a fingerprint of the scene they were planned against.
+`plan_dependencies` orders a plan's commands by the instances they touch,
+for running independent steps in parallel.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+# Mirrors TEMPLATE_ALIASES in server/assistant_engine.js.
+TEMPLATE_ALIASES = {
+    "starter": "starter_scene",
+    "starter_scene": "starter_scene",
+    "default": "starter_scene",
+    "obstacle": "obstacle_course_builder",
+    "obby": "obstacle_course_builder",
+    "obstacle_course": "obstacle_course_builder",
+    "obstacle_course_builder": "obstacle_course_builder",
+    "terrain": "terrain_generator",
+    "terrain_generator": "terrain_generator",
+    "landscape": "terrain_generator",
+    "lighting": "lighting_mood_presets",
+    "mood": "lighting_mood_presets",
+    "lighting_mood_presets": "lighting_mood_presets",
+}
+
+# Mirrors RISK_RANK in server/command_catalog.js.
+RISK_RANK = {"safe": 1, "caution": 2, "dangerous": 3}
+
+# Providers that make the bridge call an LLM; see resolveRequestedProvider.
+LLM_PROVIDERS = ("openai", "openrouter", "anthropic", "auto", "llm")
+
+DEFAULT_PLAN_CACHE_SIZE = 256
+DEFAULT_PLAN_CACHE_TTL = 3600.0
+DEFAULT_PLAN_CACHE_DISK_ENTRIES = 4096
+
+_COUNT_PATTERN = re.compile(r"(\d{1,3})\s*(?:platform|jump|stage|checkpoint|section)s?", re.IGNORECASE | re.ASCII)
+_HARD_PATTERN = re.compile(r"hard|difficult|challenge|insane", re.IGNORECASE)
+_EASY_PATTERN = re.compile(r"easy|beginner|casual", re.IGNORECASE)
+_LARGE_PATTERN = re.compile(r"large|huge|massive|open world", re.IGNORECASE)
+_COMPACT_PATTERN = re.compile(r"small|tiny|compact", re.IGNORECASE)
+
+_GOAL_SPIN_SOURCE = (
+    "local p = script.Parent:FindFirstChild('ObbyGoal')\\nif p then while true do "
+    "p.CFrame = p.CFrame * CFrame.Angles(0, math.rad(1), 0); task.wait(0.03) end end"
+)
+
+_LIGHTING_PROFILES: Dict[str, Dict[str, Any]] = {
+    "day": {
+        "time": 13.0,
+        "lighting": {"brightness": 2.3, "ambient": [166, 184, 205], "exposure_compensation": 0.12},
+        "atmosphere": {"density": 0.25, "color": [183, 216, 247]},
+        "fog": {"fog_start": 80, "fog_end": 650, "fog_color": [177, 209, 238]},
+        "summary": "Clean daytime baseline for gameplay prototyping.",
+    },
+    "sunset": {
+        "time": 18.7,
+        "lighting": {"brightness": 1.95, "ambient": [165, 118, 96], "exposure_compensation": -0.06},
+        "atmosphere": {"density": 0.39, "color": [255, 174, 115]},
+        "fog": {"fog_start": 45, "fog_end": 430, "fog_color": [236, 161, 116]},
+        "summary": "Warm late-afternoon cinematic palette.",
+    },
+    "noir": {
+        "time": 22.4,
+        "lighting": {"brightness": 0.95, "ambient": [88, 94, 108], "exposure_compensation": -0.32},
+        "atmosphere": {"density": 0.58, "color": [123, 132, 154]},
+        "fog": {"fog_start": 18, "fog_end": 220, "fog_color": [96, 102, 118]},
+        "summary": "Low-key night preset with strong contrast and fog.",
+    },
+    "neon": {
+        "time": 20.8,
+        "lighting": {"brightness": 1.4, "ambient": [96, 122, 170], "exposure_compensation": 0.0},
+        "atmosphere": {"density": 0.47, "color": [111, 200, 235]},
+        "fog": {"fog_start": 30, "fog_end": 280, "fog_color": [86, 164, 209]},
+        "summary": "Bold synthetic look for stylized worlds.",
+    },
+    "storm": {
+        "time": 17.2,
+        "lighting": {"brightness": 1.1, "ambient": [90, 103, 121], "exposure_compensation": -0.14},
+        "atmosphere": {"density": 0.62, "color": [123, 145, 166]},
+        "fog": {"fog_start": 16, "fog_end": 180, "fog_color": [115, 132, 153]},
+        "summary": "Heavy atmosphere preset for tense scenes.",
+    },
+}
+
+Annotate = Callable[[str, Dict[str, Any], str], Dict[str, Any]]
+
+
+def _clone(value: Any) -> Any:
+    # Plans are plain JSON; this is several times faster than deepcopy.
+    if isinstance(value, dict):
+        return {key: _clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clone(item) for item in value]
+    return value
+
+
+def normalize_prompt(value: Any) -> str:
+    """The bridge's normalization (`String(value || "").trim()`)."""
+    return str(value or "").strip()
+
+
+def plans_locally(use_llm: bool = False, provider: Optional[str] = None) -> bool:
+    """True when the bridge would answer with the deterministic planner."""
+    return not use_llm and str(provider or "").strip().lower() not in LLM_PROVIDERS
+
+
+def risk_rank(risk: Any) -> int:
+    return RISK_RANK.get(str(risk or "safe").lower(), RISK_RANK["safe"])
+
+
+def deterministic_number(seed: Any, low: int, high: int) -> int:
+    digest = hashlib.sha1(str(seed or "novablox").encode("utf-8")).digest()
+    span = max(1, high - low + 1)
+    return low + int.from_bytes(digest[:2], "big") % span
+
+
+def infer_template(prompt: str, explicit_template: Optional[str] = None) -> str:
+    explicit = normalize_prompt(explicit_template).lower()
+    if explicit and explicit in TEMPLATE_ALIASES:
+        return TEMPLATE_ALIASES[explicit]
+    text = normalize_prompt(prompt).lower()
+    if any(word in text for word in ("obby", "obstacle", "parkour")):
+        return "obstacle_course_builder"
+    if any(word in text for word in ("terrain", "mountain", "island", "biome")):
+        return "terrain_generator"
+    if any(word in text for word in ("lighting", "mood", "atmosphere", "sunset")):
+        return "lighting_mood_presets"
+    return "starter_scene"
+
+
+def extract_count(prompt: str, fallback: int, low: int, high: int) -> int:
+    match = _COUNT_PATTERN.search(normalize_prompt(prompt))
+    if not match:
+        return fallback
+    return max(low, min(high, int(match.group(1))))
+
+
+def _part(name: str, position: List[float], size: List[float], color: str, **extra: Any) -> Dict[str, Any]:
+    payload = {
+        "class_name": "Part",
+        "name": name,
+        "position": position,
+        "size": size,
+        "color": color,
+        "anchored": True,
+    }
+    payload.update(extra)
+    return payload
+
+
+def _starter_scene(prompt: str, annotate: Annotate) -> Dict[str, Any]:
+    folder = f"NovaBloxStarter_{deterministic_number(f'starter:{prompt}', 100, 999)}"
+    return {
+        "title": "Starter Scene",
+        "summary": "Creates a tiny starter scene and applies a neutral daylight setup.",
+        "commands": [
+            annotate(
+                "/bridge/scene/create-folder",
+                {"name": folder, "parent_path": "Workspace"},
+                "Create folder for starter scene.",
+            ),
+            annotate(
+                "/bridge/scene/spawn-object",
+                _part(
+                    "StarterFloor",
+                    [0, 2, 0],
+                    [24, 1, 24],
+                    "Medium stone grey",
+                    parent_path=f"Workspace/{folder}",
+                    material="Concrete",
+                ),
+                "Spawn the floor plate.",
+            ),
+            annotate(
+                "/bridge/scene/spawn-object",
+                _part(
+                    "StarterSpawn",
+                    [0, 5, 0],
+                    [6, 1, 6],
+                    "Lime green",
+                    parent_path=f"Workspace/{folder}",
+                    material="Neon",
+                ),
+                "Spawn a visible start pad.",
+            ),
+            annotate(
+                "/bridge/environment/set-lighting",
+                {"brightness": 2.1, "ambient": [160, 172, 186], "exposure_compensation": 0.1},
+                "Apply neutral baseline lighting.",
+            ),
+            annotate(
+                "/bridge/environment/set-time",
+                {"clock_time": 14.5},
+                "Set bright daytime clock.",
+            ),
+        ],
+    }
+
+
+def _obstacle_course(prompt: str, annotate: Annotate) -> Dict[str, Any]:
+    platform_count = extract_count(prompt, 10, 4, 30)
+    hard = _HARD_PATTERN.search(prompt) is not None
+    easy = _EASY_PATTERN.search(prompt) is not None
+    gap = 12 if hard else 7 if easy else 9
+    vertical_step = 3.2 if hard else 1.7 if easy else 2.4
+    lane = deterministic_number(f"obby_lane:{prompt}", -14, 14)
+    folder = f"NovaBloxObby_{deterministic_number(f'obby:{prompt}', 100, 999)}"
+    parent = f"Workspace/{folder}"
+
+    commands = [
+        annotate(
+            "/bridge/scene/create-folder",
+            {"name": folder, "parent_path": "Workspace"},
+            "Create obstacle course container.",
+        ),
+        annotate(
+            "/bridge/environment/set-time",
+            {"clock_time": 16.8},
+            "Set golden-hour visibility for obby readabilty.",
+        ),
+        annotate(
+            "/bridge/environment/set-lighting",
+            {"brightness": 2.35, "ambient": [133, 150, 178], "exposure_compensation": 0.12},
+            "Tune lighting to emphasize obstacle silhouettes.",
+        ),
+        annotate(
+            "/bridge/scene/spawn-object",
+            _part("ObbyStart", [0, 6, lane], [10, 1.2, 10], "Lime green", parent_path=parent, material="Neon"),
+            "Spawn start platform.",
+        ),
+    ]
+    for index in range(platform_count):
+        position = [
+            (index + 1) * gap,
+            6 + (index + 1) * vertical_step,
+            lane + (7 if index % 2 == 0 else -7),
+        ]
+        color = "Bright blue" if index % 2 == 0 else "Bright orange"
+        commands.append(
+            annotate(
+                "/bridge/scene/spawn-object",
+                _part(
+                    f"ObbyStep_{index + 1}",
+                    position,
+                    [8, 1, 8],
+                    color,
+                    parent_path=parent,
+                    material="SmoothPlastic",
+                ),
+                f"Spawn jump platform {index + 1}/{platform_count}.",
+            )
+        )
+    commands.append(
+        annotate(
+            "/bridge/scene/spawn-object",
+            _part(
+                "ObbyGoal",
+                [(platform_count + 2) * gap, 6 + (platform_count + 2) * vertical_step, lane],
+                [10, 1.2, 10],
+                "New Yeller",
+                parent_path=parent,
+                material="Neon",
+            ),
+            "Spawn goal platform.",
+        )
+    )
+    commands.append(
+        annotate(
+            "/bridge/script/insert-script",
+            {"parent_path": parent, "name": "GoalSpin", "source": _GOAL_SPIN_SOURCE},
+            "Add lightweight visual motion on goal for player guidance.",
+        )
+    )
+    return {
+        "title": "Obstacle Course Builder",
+        "summary": f"Builds a deterministic obby with {platform_count} jump platforms and a visual goal marker.",
+        "commands": commands,
+    }
+
+
+def _terrain(prompt: str, annotate: Annotate) -> Dict[str, Any]:
+    text = normalize_prompt(prompt).lower()
+    material = "Grass"
+    if "desert" in text:
+        material = "Sand"
+    elif "snow" in text or "ice" in text:
+        material = "Snow"
+    elif "volcan" in text:
+        material = "Basalt"
+    elif "moon" in text:
+        material = "Slate"
+    if _LARGE_PATTERN.search(text):
+        size = [420, 120, 420]
+    elif _COMPACT_PATTERN.search(text):
+        size = [160, 48, 160]
+    else:
+        size = [280, 80, 280]
+    fog_end = 460 if material == "Sand" else 380 if material == "Snow" else 520
+
+    return {
+        "title": "Terrain Generator",
+        "summary": f"Creates a {material.lower()} terrain seed with matching atmosphere and lighting.",
+        "commands": [
+            annotate(
+                "/bridge/terrain/generate-terrain",
+                {"center": [0, 0, 0], "size": size, "material": material},
+                "Generate primary terrain volume.",
+            ),
+            annotate(
+                "/bridge/environment/set-lighting",
+                {
+                    "brightness": 2.0,
+                    "ambient": [174, 186, 196] if material == "Snow" else [126, 139, 156],
+                    "exposure_compensation": 0.05,
+                },
+                "Tune global lighting for selected biome.",
+            ),
+            annotate(
+                "/bridge/environment/set-atmosphere",
+                {
+                    "density": 0.34 if material == "Sand" else 0.42 if material == "Snow" else 0.28,
+                    "color": (
+                        [248, 214, 152]
+                        if material == "Sand"
+                        else [214, 229, 255]
+                        if material == "Snow"
+                        else [180, 210, 234]
+                    ),
+                },
+                "Apply atmosphere to improve depth perception.",
+            ),
+            annotate(
+                "/bridge/environment/set-time",
+                {"clock_time": 11.2 if material == "Snow" else 15.4},
+                "Set biome-friendly time of day.",
+            ),
+            annotate(
+                "/bridge/environment/set-fog",
+                {
+                    "fog_start": 45,
+                    "fog_end": fog_end,
+                    "fog_color": [244, 205, 139] if material == "Sand" else [173, 195, 224],
+                },
+                "Set fog range to frame terrain scale.",
+            ),
+        ],
+    }
+
+
+def _lighting_mood(prompt: str, annotate: Annotate) -> Dict[str, Any]:
+    text = normalize_prompt(prompt).lower()
+    mood = "day"
+    if "sunset" in text or "golden" in text:
+        mood = "sunset"
+    elif any(word in text for word in ("noir", "dark", "cinematic")):
+        mood = "noir"
+    elif "neon" in text or "cyber" in text:
+        mood = "neon"
+    elif any(word in text for word in ("storm", "rain", "moody")):
+        mood = "storm"
+    profile = _clone(_LIGHTING_PROFILES[mood])
+
+    return {
+        "title": "Lighting Mood Presets",
+        "summary": f"Applies {mood} mood preset. {profile['summary']}",
+        "commands": [
+            annotate("/bridge/environment/set-time", {"clock_time": profile["time"]}, "Set mood clock time."),
+            annotate("/bridge/environment/set-lighting", profile["lighting"], "Apply lighting profile."),
+            annotate("/bridge/environment/set-atmosphere", profile["atmosphere"], "Apply atmosphere profile."),
+            annotate("/bridge/environment/set-fog", profile["fog"], "Apply fog profile."),
+        ],
+    }
+
+
+TEMPLATE_BUILDERS: Dict[str, Callable[[str, Annotate], Dict[str, Any]]] = {
+    "starter_scene": _starter_scene,
+    "obstacle_course_builder": _obstacle_course,
+    "terrain_generator": _terrain,
+    "lighting_mood_presets": _lighting_mood,
+}
+
+
+def summarize_risk(commands: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    summary: Dict[str, Any] = {"safe": 0, "caution": 0, "dangerous": 0, "max_risk": "safe"}
+    for command in commands:
+        risk = command.get("risk") or "safe"
+        if risk == "dangerous":
+            summary["dangerous"] += 1
+        elif risk == "caution":
+            summary["caution"] += 1
+        else:
+            summary["safe"] += 1
+        if risk_rank(risk) > risk_rank(summary["max_risk"]):
+            summary["max_risk"] = risk
+    return summary
+
+
+def build_warnings(plan: Dict[str, Any]) -> List[str]:
+    warnings = []
+    actions = {command.get("action") for command in plan["commands"]}
+    if plan["risk_summary"]["dangerous"] > 0:
+        warnings.append("Plan includes dangerous actions. Require allow_dangerous=true before queueing.")
+    if actions & {"import-model", "import-blender"}:
+        warnings.append("Local OBJ/FBX import can require manual Studio import UI on some builds.")
+    if actions & {"screenshot", "render-frame"}:
+        warnings.append(
+            "Programmatic screenshot/render support depends on Studio build; external capture may be required."
+        )
+    return warnings
+
+
+# plan() returns the same shape as NovaBlox.plan() for a non-LLM request, with
+# a fresh id and created_at, or None when a step needs a route the catalog does
+# not list, so callers can fall back to the bridge.
+class LocalPlanner:
+    """Builds deterministic plans client-side, with an LRU cache per prompt."""
+
+    def __init__(
+        self,
+        catalog: Iterable[Dict[str, Any]],
+        templates: Optional[Iterable[Dict[str, Any]]] = None,
+        *,
+        cache_size: int = DEFAULT_PLAN_CACHE_SIZE,
+    ) -> None:
+        self.routes = {str(item["route"]).strip(): dict(item) for item in catalog if item.get("route")}
+        self.template_ids = None if templates is None else {str(item.get("id")) for item in templates}
+        self.cache_size = max(0, int(cache_size))
+        self.hits = 0
+        self.misses = 0
+        self._cache: "OrderedDict[Tuple[str, str], Optional[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_responses(
+        cls,
+        catalog_response: Dict[str, Any],
+        templates_response: Optional[Dict[str, Any]] = None,
+        **options: Any,
+    ) -> "LocalPlanner":
+        templates = None if templates_response is None else templates_response.get("templates") or []
+        return cls(catalog_response.get("catalog") or [], templates, **options)
+
+    def supports(self, template_id: str) -> bool:
+        return template_id in TEMPLATE_BUILDERS and (self.template_ids is None or template_id in self.template_ids)
+
+    def plan(
+        self,
+        prompt: str,
+        template: Optional[str] = None,
+        *,
+        voice_mode: bool = False,
+        provider: Optional[str] = None,
+        scene_context: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        prompt = normalize_prompt(prompt)
+        requested = normalize_prompt(template)
+        built = self._built(prompt, requested)
+        if built is None:
+            return None
+        plan: Dict[str, Any] = {
+            "id": str(uuid.uuid4()),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z"),
+            "workflow": {"template": built["template"], "deterministic": True},
+            "input": {"prompt": prompt, "template_requested": requested or None, "voice_mode": voice_mode is True},
+        }
+        plan.update(_clone(built["plan"]))
+        return {
+            "status": "ok",
+            "plan": plan,
+            "assistant": {
+                "source": "deterministic",
+                "used_llm": False,
+                "fallback": False,
+                "provider_requested": normalize_prompt(provider) or None,
+            },
+            "scene_context": scene_context,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def _built(self, prompt: str, requested: str) -> Optional[Dict[str, Any]]:
+        key = (requested.lower(), prompt)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            self.misses += 1
+        built = self._build(prompt, requested)
+        if self.cache_size:
+            with self._lock:
+                self._cache[key] = built
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return built
+
+    def _build(self, prompt: str, requested: str) -> Optional[Dict[str, Any]]:
+        template_id = infer_template(prompt, requested)
+        if not self.supports(template_id):
+            return None
+        try:
+            built = TEMPLATE_BUILDERS[template_id](prompt, self._annotate)
+        except KeyError:
+            return None
+        built["risk_summary"] = summarize_risk(built["commands"])
+        built["warnings"] = build_warnings(built)
+        return {"template": template_id, "plan": built}
+
+    def _annotate(self, route: str, payload: Dict[str, Any], reason: str) -> Dict[str, Any]:
+        entry = self.routes[route]
+        return {
+            "route": entry["route"],
+            "category": entry.get("category"),
+            "action": entry.get("action"),
+            "risk": entry.get("risk") or "safe",
+            "reason": reason or entry.get("summary"),
+            "payload": payload,
+        }
+
+
+def _canonical_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def scene_fingerprint(scene_context: Optional[Dict[str, Any]]) -> str:
+    """Short stable digest of a scene context summary (key order ignored)."""
+    if scene_context is None:
+        return "none"
+    return hashlib.sha256(_canonical_json(scene_context).encode("utf-8")).hexdigest()[:32]
+
+
+def plan_cache_key(
+    prompt: str,
+    template: Optional[str] = None,
+    provider: Optional[str] = None,
+    model: Optional[str] = None,
+    temperature: Optional[float] = None,
+    scene: str = "none",
+    *,
+    use_llm: bool = True,
+    allow_dangerous: bool = False,
+) -> str:
+    """Content address of a plan request; ``scene`` is a fingerprint or ETag."""
+    fields = [
+        normalize_prompt(prompt),
+        normalize_prompt(template).lower(),
+        normalize_prompt(provider).lower(),
+        normalize_prompt(model),
+        None if temperature is None else float(temperature),
+        scene,
+        bool(use_llm),
+        bool(allow_dangerous),
+    ]
+    return hashlib.sha256(_canonical_json(fields).encode("utf-8")).hexdigest()
+
+
+# The bridge derives idempotency keys from the plan id, so a replayed plan must
+# not reuse the id it was cached with.
+def refresh_plan(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy a stored plan response with a new plan ``id`` and ``created_at``."""
+    fresh = _clone(response)
+    plan = fresh.get("plan")
+    if isinstance(plan, dict):
+        plan["id"] = str(uuid.uuid4())
+        plan["created_at"] = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    return fresh
+
+
+class PlanCache:
+    """LRU + TTL cache of plan responses, with an optional sqlite tier."""
+
+    def __init__(
+        self,
+        *,
+        max_entries: int = DEFAULT_PLAN_CACHE_SIZE,
+        ttl: float = DEFAULT_PLAN_CACHE_TTL,
+        path: Optional[str] = None,
+        max_disk_entries: int = DEFAULT_PLAN_CACHE_DISK_ENTRIES,
+    ) -> None:
+        self.max_entries = max(0, int(max_entries))
+        self.ttl = float(ttl)
+        self.path = os.path.expanduser(path) if path else None
+        self.max_disk_entries = max(1, int(max_disk_entries))
+        self.stats: Dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        if self.path:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS plans ("
+                "key TEXT PRIMARY KEY, stored_at REAL NOT NULL, expires_at REAL NOT NULL, body TEXT NOT NULL)"
+            )
+
+    def __len__(self) -> int:
+        return len(self._memory)
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return refresh_plan(entry[1])
+                del self._memory[key]
+                self.stats["expired"] += 1
+            entry = self._disk_get(key, now)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["disk_hits"] += 1
+            self._remember(key, entry)
+            return refresh_plan(entry[1])
+
+    def put(self, key: str, response: Dict[str, Any]) -> None:
+        now = time.time()
+        entry = (now + self.ttl, _clone(response))
+        with self._lock:
+            self.stats["stores"] += 1
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO plans (key, stored_at, expires_at, body) VALUES (?, ?, ?, ?)",
+                    (key, now, entry[0], _canonical_json(response)),
+                )
+                self._db.execute("DELETE FROM plans WHERE expires_at <= ?", (now,))
+                self._db.execute(
+                    "DELETE FROM plans WHERE key NOT IN (SELECT key FROM plans ORDER BY stored_at DESC LIMIT ?)",
+                    (self.max_disk_entries,),
+                )
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM plans")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            disk = self._db.execute("SELECT COUNT(*) FROM plans").fetchone()[0] if self._db is not None else None
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return dict(
+                self.stats,
+                entries=len(self._memory),
+                disk_entries=disk,
+                hit_rate=self.stats["hits"] / lookups if lookups else 0.0,
+                ttl=self.ttl,
+                path=self.path,
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, entry: Tuple[float, Dict[str, Any]]) -> None:
+        if not self.max_entries:
+            return
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _disk_get(self, key: str, now: float) -> Optional[Tuple[float, Dict[str, Any]]]:
+        if self._db is None:
+            return None
+        row = self._db.execute("SELECT expires_at, body FROM plans WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        if row[0] <= now:
+            self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+            self.stats["expired"] += 1
+            return None
+        return row[0], json.loads(row[1])
+
+
+# Actions that create an instance named by `name` (or `new_name`/`group_name`)
+# under `parent_path`, which defaults to Workspace in the plugin.
+CREATE_ACTIONS = {
+    "spawn-object": "name",
+    "create-folder": "name",
+    "create-script": "name",
+    "create-local-script": "name",
+    "create-module-script": "name",
+    "insert-script": "name",
+    "insert-local-script": "name",
+    "insert-module-script": "name",
+    "duplicate-object": "new_name",
+    "group-objects": "group_name",
+}
+# Actions whose effects can't be pinned to instances; they run alone.
+BARRIER_ACTIONS = {
+    "run-command",
+    "save-place",
+    "export-place",
+    "publish-place",
+    "playtest-start",
+    "playtest-stop",
+    "autosave",
+    "import-model",
+    "import-from-url",
+    "insert-asset-id",
+    "insert-toolbox-asset",
+    "import-blender",
+}
+# Categories that all write one shared service.
+SHARED_RESOURCES = {"environment": "@Lighting", "terrain": "@Terrain", "viewport": "@Camera"}
+
+
+class Footprint(NamedTuple):
+    """Instances a plan command reads and writes, as ``/`` paths from `game`."""
+
+    reads: FrozenSet[str]
+    writes: FrozenSet[str]
+    lookups: FrozenSet[str]
+    barrier: bool
+
+
+def _plan_path(value: Any) -> Optional[str]:
+    if not isinstance(value, str):
+        return None
+    path = "/".join(part for part in value.strip().split("/") if part)
+    return path or None
+
+
+def _is_within(path: str, ancestor: str) -> bool:
+    return path == ancestor or path.startswith(ancestor + "/")
+
+
+# Mirrors the plugin: target_path first, then a workspace-wide search for
+# target_name/name. Name lookups are kept apart because they may match any
+# instance with that name.
+def command_footprint(command: Dict[str, Any]) -> Footprint:
+    """Infer what a command touches from its action and payload."""
+    action = str(command.get("action") or "")
+    payload = command.get("payload") if isinstance(command.get("payload"), dict) else {}
+    reads, writes, lookups = set(), set(), set()
+    if action in BARRIER_ACTIONS:
+        return Footprint(frozenset(), frozenset(), frozenset(), True)
+    shared = SHARED_RESOURCES.get(str(command.get("category") or ""))
+    if shared:
+        writes.add(shared)
+
+    parent = _plan_path(payload.get("parent_path"))
+    if action in CREATE_ACTIONS:
+        reads.add(parent or "Workspace")
+        name = payload.get(CREATE_ACTIONS[action])
+        if isinstance(name, str) and name:
+            writes.add(f"{parent or 'Workspace'}/{name}")
+    elif parent:
+        # parent-object moves the target under parent_path.
+        reads.add(parent)
+
+    target = _plan_path(payload.get("target_path"))
+    if target:
+        writes.add(target)
+    elif action not in CREATE_ACTIONS or action == "duplicate-object":
+        for key in ("target_name", "name"):
+            if isinstance(payload.get(key), str) and payload[key]:
+                lookups.add(payload[key])
+                break
+    for item in payload.get("target_paths") or []:
+        path = _plan_path(item)
+        if path:
+            writes.add(path)
+
+    barrier = not (reads or writes or lookups) and action not in CREATE_ACTIONS and action != "clear-selection"
+    return Footprint(frozenset(reads), frozenset(writes), frozenset(lookups), barrier)
+
+
+def _conflicts(first: Footprint, second: Footprint) -> bool:
+    if first.barrier or second.barrier:
+        return True
+    for write in first.writes:
+        if any(_is_within(other, write) or _is_within(write, other) for other in second.writes):
+            return True
+        if any(_is_within(read, write) for read in second.reads):
+            return True
+    for read in first.reads:
+        if any(_is_within(read, write) for write in second.writes):
+            return True
+    if first.lookups or second.lookups:
+        first_names = {path.rsplit("/", 1)[-1] for path in first.writes} | first.lookups
+        second_names = {path.rsplit("/", 1)[-1] for path in second.writes} | second.lookups
+        if first.lookups & second_names or second.lookups & first_names:
+            return True
+    return False
+
+
+# Two commands conflict when one writes an instance (or an ancestor of it) the
+# other reads or writes, when a name lookup could match the other's instance,
+# or when either is a barrier.
+def plan_dependencies(commands: Sequence[Dict[str, Any]]) -> List[List[int]]:
+    """For each command, the earlier commands it must wait for."""
+    footprints = [command_footprint(command) for command in commands]
+    return [
+        [earlier for earlier in range(index) if _conflicts(footprints[earlier], footprints[index])]
+        for index in range(len(footprints))
+    ]
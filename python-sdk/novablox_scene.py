@@ -0,0 +1,1037 @@
+"""Client-side scene state for the NovaBlox Python SDK.
+
+Keeps the last introspection snapshot from the bridge, indexed by instance
+path and class, and patches it locally from the results of scene-mutating
+commands so planners don't re-download the whole place on every step.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+try:  # optional: vectorized SceneColumns transforms
+    import numpy as _np
+except ImportError:  # pragma: no cover - numpy is not a dependency
+    _np = None
+
+if TYPE_CHECKING:
+    from novablox import NovaBlox
+
+# Fields set-property can write that the introspection snapshot also records.
+PROPERTY_FIELDS = {
+    "Position": "position",
+    "Size": "size",
+    "Material": "material",
+    "Color": "color",
+    "Anchored": "anchored",
+    "CanCollide": "can_collide",
+}
+
+# Actions that add or move whole subtrees the cache can't reconstruct from a
+# command result; after one of these only a rescan brings the cache back.
+RESCAN_ACTIONS = {
+    "group-objects",
+    "duplicate-object",
+    "insert-asset-id",
+    "insert-toolbox-asset",
+    "import-blender",
+    "import",
+    "insert-script",
+    "insert-local-script",
+    "insert-module-script",
+    "run-command",
+    "test-spawn",
+}
+
+DEFAULT_CELL_SIZE = 32.0
+# Objects spanning more grid cells than this (baseplates, terrain) are kept on
+# a short list that every spatial query checks directly.
+MAX_CELLS_PER_OBJECT = 64
+
+Vector3 = Tuple[float, float, float]
+
+
+def _parent_of(path: str) -> str:
+    head, sep, _tail = path.rpartition(".")
+    return head if sep else "ROOT"
+
+
+def _vector(value: Any) -> Optional[List[float]]:
+    if isinstance(value, dict):
+        value = [value.get("x", 0), value.get("y", 0), value.get("z", 0)]
+    if isinstance(value, (list, tuple)) and len(value) == 3:
+        try:
+            return [float(v) for v in value]
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+class _PathNode:
+    __slots__ = ("children", "path")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, "_PathNode"] = {}
+        self.path: Optional[str] = None
+
+
+def _bounds(obj: Dict[str, Any]) -> Optional[Tuple[Vector3, Vector3]]:
+    center = _vector(obj.get("position")) or _vector(obj.get("pivot"))
+    if center is None:
+        return None
+    size = _vector(obj.get("size")) or [0.0, 0.0, 0.0]
+    half = [abs(v) / 2.0 for v in size]
+    return (
+        (center[0] - half[0], center[1] - half[1], center[2] - half[2]),
+        (center[0] + half[0], center[1] + half[1], center[2] + half[2]),
+    )
+
+
+def _box_distance(point: Vector3, box: Tuple[Vector3, Vector3]) -> float:
+    low, high = box
+    total = 0.0
+    for axis in range(3):
+        if point[axis] < low[axis]:
+            total += (low[axis] - point[axis]) ** 2
+        elif point[axis] > high[axis]:
+            total += (point[axis] - high[axis]) ** 2
+    return math.sqrt(total)
+
+
+# Objects with a position (parts) or pivot (models) go into the grid by
+# bounding box; folders and services are only indexed by path, name and class.
+class SceneIndex:
+    """Path trie, name/class lookup and uniform-grid spatial index over scene objects."""
+
+    def __init__(self, objects: Iterable[Dict[str, Any]] = (), *, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        if cell_size <= 0:
+            raise ValueError("cell_size must be positive")
+        self.cell_size = float(cell_size)
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        self._root = _PathNode()
+        self._by_name: Dict[str, Set[str]] = {}
+        self._by_class: Dict[str, Set[str]] = {}
+        self._grid: Dict[Tuple[int, int, int], Set[str]] = {}
+        self._bounds: Dict[str, Tuple[Vector3, Vector3]] = {}
+        self._oversized: Set[str] = set()
+        # Cell range ever occupied; only grows, which keeps nearest() bounded.
+        self._extent_low: Optional[List[int]] = None
+        self._extent_high: Optional[List[int]] = None
+        for obj in objects:
+            self.add(obj)
+
+    def __len__(self) -> int:
+        return len(self.objects)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self.objects
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        return self.objects.get(path)
+
+    def add(self, obj: Dict[str, Any]) -> None:
+        path = obj.get("path")
+        if not isinstance(path, str) or not path:
+            raise ValueError("scene object needs a path")
+        if path in self.objects:
+            self.remove(path)
+        self.objects[path] = obj
+        node = self._root
+        for segment in path.split("."):
+            node = node.children.setdefault(segment, _PathNode())
+        node.path = path
+        self._by_name.setdefault(str(obj.get("name") or path.rpartition(".")[2]), set()).add(path)
+        self._by_class.setdefault(str(obj.get("class_name") or "Instance"), set()).add(path)
+        box = _bounds(obj)
+        if box is not None:
+            self._bounds[path] = box
+            cells = self._cells(box[0], box[1])
+            if cells is None:
+                self._oversized.add(path)
+            else:
+                for cell in cells:
+                    self._grid.setdefault(cell, set()).add(path)
+                self._grow_extent(cells[0], cells[-1])
+
+    def remove(self, path: str) -> Optional[Dict[str, Any]]:
+        obj = self.objects.pop(path, None)
+        if obj is None:
+            return None
+        trail = [self._root]
+        for segment in path.split("."):
+            child = trail[-1].children.get(segment)
+            if child is None:
+                break
+            trail.append(child)
+        else:
+            trail[-1].path = None
+            segments = path.split(".")
+            # Prune trie nodes that no longer lead anywhere.
+            for depth in range(len(segments), 0, -1):
+                node = trail[depth]
+                if node.path is not None or node.children:
+                    break
+                del trail[depth - 1].children[segments[depth - 1]]
+        self._discard(self._by_name, str(obj.get("name") or path.rpartition(".")[2]), path)
+        self._discard(self._by_class, str(obj.get("class_name") or "Instance"), path)
+        box = self._bounds.pop(path, None)
+        if box is not None and path not in self._oversized:
+            for cell in self._cells(box[0], box[1]) or ():
+                self._discard(self._grid, cell, path)
+        self._oversized.discard(path)
+        return obj
+
+    def _grow_extent(self, low: Tuple[int, int, int], high: Tuple[int, int, int]) -> None:
+        if self._extent_low is None or self._extent_high is None:
+            self._extent_low = list(low)
+            self._extent_high = list(high)
+            return
+        for axis in range(3):
+            self._extent_low[axis] = min(self._extent_low[axis], low[axis])
+            self._extent_high[axis] = max(self._extent_high[axis], high[axis])
+
+    def _discard(self, table: Dict[Any, Set[str]], key: Any, path: str) -> None:
+        paths = table.get(key)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del table[key]
+
+    def _cell(self, point: Sequence[float]) -> Tuple[int, int, int]:
+        size = self.cell_size
+        return (math.floor(point[0] / size), math.floor(point[1] / size), math.floor(point[2] / size))
+
+    def _cells(self, low: Sequence[float], high: Sequence[float]) -> Optional[List[Tuple[int, int, int]]]:
+        lo = self._cell(low)
+        hi = self._cell(high)
+        count = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+        if count > MAX_CELLS_PER_OBJECT:
+            return None
+        return [
+            (x, y, z)
+            for x in range(lo[0], hi[0] + 1)
+            for y in range(lo[1], hi[1] + 1)
+            for z in range(lo[2], hi[2] + 1)
+        ]
+
+    def _node(self, path: str) -> Optional[_PathNode]:
+        node = self._root
+        for segment in path.split("."):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def children(self, path: str) -> List[Dict[str, Any]]:
+        node = self._node(path)
+        if node is None:
+            return []
+        return [
+            self.objects[child.path]
+            for _segment, child in sorted(node.children.items())
+            if child.path is not None
+        ]
+
+    def subtree(self, prefix: str, *, include_self: bool = True) -> List[str]:
+        """Paths under `prefix` (whole path segments), parents before children."""
+        node = self._node(prefix)
+        if node is None:
+            return []
+        found: List[str] = []
+        queue = [node]
+        index = 0
+        while index < len(queue):
+            current = queue[index]
+            index += 1
+            if current.path is not None and (include_self or current is not node):
+                found.append(current.path)
+            queue.extend(current.children[key] for key in sorted(current.children))
+        return found
+
+    def by_class(self, class_name: str) -> List[Dict[str, Any]]:
+        return [self.objects[path] for path in sorted(self._by_class.get(class_name, ()))]
+
+    def by_name(self, name: str) -> List[Dict[str, Any]]:
+        return [self.objects[path] for path in sorted(self._by_name.get(name, ()))]
+
+    def find(
+        self,
+        *,
+        name: Optional[str] = None,
+        class_name: Optional[str] = None,
+        under: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Objects matching every given filter, e.g. name="Checkpoint" under="Workspace.Course"."""
+        candidates: Optional[Set[str]] = None
+        if name is not None:
+            candidates = set(self._by_name.get(name, ()))
+        if class_name is not None:
+            paths = self._by_class.get(class_name, set())
+            candidates = set(paths) if candidates is None else candidates & paths
+        if under is not None:
+            if candidates is None:
+                candidates = set(self.subtree(under, include_self=False))
+            else:
+                prefix = under + "."
+                candidates = {path for path in candidates if path.startswith(prefix)}
+        if candidates is None:
+            candidates = set(self.objects)
+        return [self.objects[path] for path in sorted(candidates)]
+
+    def resolve(self, target: str) -> List[str]:
+        """Candidate paths for a `target_path`/`target_name` value, best match first."""
+        if not target:
+            return []
+        dotted = target.replace("/", ".")
+        for candidate in (target, dotted, f"Workspace.{dotted}"):
+            if candidate in self.objects:
+                return [candidate]
+        return sorted(self._by_name.get(target, ()), key=lambda path: (path.count("."), path))
+
+    def region(
+        self,
+        low: Sequence[float],
+        high: Sequence[float],
+        *,
+        class_name: Optional[str] = None,
+        contained: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Objects whose bounding box overlaps (or, with `contained`, lies inside) the box."""
+        query_low = tuple(min(a, b) for a, b in zip(low, high))
+        query_high = tuple(max(a, b) for a, b in zip(low, high))
+        cells = self._cells(query_low, query_high) if self._grid else []
+        if cells is None or len(cells) > len(self._grid):
+            candidates = set(self._bounds)
+        else:
+            candidates = set(self._oversized)
+            for cell in cells:
+                candidates.update(self._grid.get(cell, ()))
+        found = []
+        for path in candidates:
+            box_low, box_high = self._bounds[path]
+            if contained:
+                inside = all(query_low[i] <= box_low[i] and box_high[i] <= query_high[i] for i in range(3))
+            else:
+                inside = all(box_low[i] <= query_high[i] and query_low[i] <= box_high[i] for i in range(3))
+            if not inside:
+                continue
+            if class_name is not None and self.objects[path].get("class_name") != class_name:
+                continue
+            found.append(path)
+        return [self.objects[path] for path in sorted(found)]
+
+    # Distance is to each bounding box, so a point inside a part is at 0. The
+    # search widens ring by ring over the grid and stops once no unvisited cell
+    # can hold anything closer.
+    def nearest(
+        self,
+        point: Sequence[float],
+        k: int = 1,
+        *,
+        class_name: Optional[str] = None,
+        max_distance: Optional[float] = None,
+    ) -> List[Tuple[float, Dict[str, Any]]]:
+        """The `k` closest objects to `point` as (distance, object), nearest first."""
+        if k <= 0 or not self._bounds:
+            return []
+        origin = (float(point[0]), float(point[1]), float(point[2]))
+        best: List[Tuple[float, str]] = []  # max-heap via negated distance
+        seen: Set[str] = set()
+
+        def consider(paths: Iterable[str]) -> None:
+            for path in paths:
+                if path in seen:
+                    continue
+                seen.add(path)
+                if class_name is not None and self.objects[path].get("class_name") != class_name:
+                    continue
+                distance = _box_distance(origin, self._bounds[path])
+                if max_distance is not None and distance > max_distance:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, path))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, path))
+
+        consider(self._oversized)
+        if self._grid and self._extent_low is not None and self._extent_high is not None:
+            cx, cy, cz = center = self._cell(origin)
+            extent = max(
+                max(abs(self._extent_low[axis] - center[axis]), abs(self._extent_high[axis] - center[axis]))
+                for axis in range(3)
+            )
+            ring = 0
+            while ring <= extent:
+                ring_cells = (2 * ring + 1) ** 3 - max(0, 2 * ring - 1) ** 3
+                if ring_cells > len(self._grid):
+                    # The ring is bigger than the occupied grid; just scan what's left.
+                    for paths in self._grid.values():
+                        consider(paths)
+                    break
+                for dx in range(-ring, ring + 1):
+                    for dy in range(-ring, ring + 1):
+                        if abs(dx) == ring or abs(dy) == ring:
+                            dz_values: Iterable[int] = range(-ring, ring + 1)
+                        else:
+                            dz_values = (-ring, ring)
+                        for dz in dz_values:
+                            consider(self._grid.get((cx + dx, cy + dy, cz + dz), ()))
+                # Anything in a later ring is at least `ring` whole cells away.
+                floor_distance = ring * self.cell_size
+                if len(best) == k and -best[0][0] <= floor_distance:
+                    break
+                if max_distance is not None and floor_distance > max_distance:
+                    break
+                ring += 1
+        ordered = sorted((-neg, path) for neg, path in best)
+        return [(distance, self.objects[path]) for distance, path in ordered]
+
+
+@dataclass
+class SceneDelta:
+    """Paths that changed between two states of a SceneCache."""
+
+    added: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+# refresh() sends the previous ETag as If-None-Match, so an unchanged snapshot
+# costs one empty 304.
+class SceneCache:
+    """Last known scene snapshot, refreshed with conditional GETs."""
+
+    def __init__(self, client: "NovaBlox", *, cell_size: float = DEFAULT_CELL_SIZE) -> None:
+        self.client = client
+        self.index = SceneIndex(cell_size=cell_size)
+        self.etag: Optional[str] = None
+        self.revision: Optional[int] = None
+        self.collected_at: Optional[str] = None
+        self.scene: Dict[str, Any] = {}
+        # Set when a command touched the scene in a way the cache can't model;
+        # the bridge's own snapshot is older still, so call rescan().
+        self.stale = False
+        self.stats = {
+            "refreshes": 0,
+            "not_modified": 0,
+            "full_fetches": 0,
+            "applied": 0,
+            "skipped": 0,
+        }
+
+    @property
+    def objects(self) -> Dict[str, Dict[str, Any]]:
+        return self.index.objects
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, path: object) -> bool:
+        return path in self.index
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.index.objects.values())
+
+    def get(self, path: str) -> Optional[Dict[str, Any]]:
+        return self.index.get(path)
+
+    def by_class(self, class_name: str) -> List[Dict[str, Any]]:
+        return self.index.by_class(class_name)
+
+    def children(self, path: str) -> List[Dict[str, Any]]:
+        return self.index.children(path)
+
+    def find_name(self, name: str) -> List[Dict[str, Any]]:
+        return self.index.by_name(name)
+
+    def refresh(self, *, force: bool = False) -> Optional[SceneDelta]:
+        """Pull the bridge's snapshot if it changed; returns None on a 304."""
+        self.stats["refreshes"] += 1
+        etag = None if force else self.etag
+        response = self.client.scene_introspection(include_objects=True, if_none_match=etag)
+        if response.get("status") == "not_modified":
+            self.stats["not_modified"] += 1
+            return None
+
+        introspection = response.get("introspection") or {}
+        scene = introspection.get("scene") or {}
+        # Bridges without ETag support still expose collected_at, which is
+        # enough to skip rebuilding the indexes for a snapshot we already hold.
+        if (
+            not introspection.get("etag")
+            and not force
+            and scene.get("collected_at")
+            and scene.get("collected_at") == self.collected_at
+        ):
+            self.stats["not_modified"] += 1
+            return None
+
+        self.stats["full_fetches"] += 1
+        self.etag = introspection.get("etag")
+        self.revision = introspection.get("revision")
+        self.collected_at = scene.get("collected_at")
+        self.scene = {key: value for key, value in scene.items() if key != "objects"}
+        self.stale = False
+        return self._replace(scene.get("objects") or [])
+
+    def rescan(self, *, timeout: float = 60.0, **options: Any) -> Optional[SceneDelta]:
+        """Queue a fresh traversal in Studio, wait for it, then refresh."""
+        queued = self.client.introspect_scene(**options)
+        command_id = queued.get("command_id")
+        if command_id:
+            self.client.wait_for([command_id], timeout=timeout)
+        return self.refresh()
+
+    def apply_command(self, command: Dict[str, Any]) -> bool:
+        """Fold one finished command record into the cache; return True if it changed."""
+        if command.get("status") != "succeeded":
+            return False
+        action = command.get("action")
+        payload = command.get("payload") or {}
+        result = command.get("result") or {}
+        handler = getattr(self, f"_apply_{str(action).replace('-', '_')}", None)
+        if handler is None:
+            if action in RESCAN_ACTIONS:
+                self.stale = True
+            self.stats["skipped"] += 1
+            return False
+        applied = handler(payload, result)
+        self.stats["applied" if applied else "skipped"] += 1
+        return applied
+
+    def apply_commands(self, commands: Iterable[Dict[str, Any]]) -> int:
+        return sum(1 for command in commands if self.apply_command(command))
+
+    def track(self, command_ids: Iterable[str], *, timeout: Optional[float] = None) -> int:
+        """Wait for queued commands, then apply the ones that succeeded."""
+        ids = list(command_ids)
+        if not ids:
+            return 0
+        settled = self.client.wait_for(ids, timeout=timeout)
+        succeeded = [cid for cid in ids if (settled.get(cid) or {}).get("status") == "succeeded"]
+        if not succeeded:
+            return 0
+        records = self.client.command_statuses(succeeded, fields=None)
+        return sum(1 for cid in succeeded if cid in records and self.apply_command(records[cid]))
+
+    def _replace(self, objects: List[Dict[str, Any]]) -> SceneDelta:
+        fresh = {}
+        for obj in objects:
+            path = obj.get("path")
+            if isinstance(path, str) and path:
+                fresh[path] = obj
+        delta = SceneDelta()
+        for path in list(self.objects):
+            if path not in fresh:
+                self._unindex(path)
+                delta.removed.append(path)
+        for path, obj in fresh.items():
+            previous = self.objects.get(path)
+            if previous is None:
+                delta.added.append(path)
+            elif previous != obj:
+                self._unindex(path)
+                delta.changed.append(path)
+            else:
+                continue
+            self._index(path, obj)
+        return delta
+
+    def _index(self, path: str, obj: Dict[str, Any]) -> None:
+        obj.setdefault("parent_path", _parent_of(path))
+        self.index.add(obj)
+
+    def _unindex(self, path: str) -> Optional[Dict[str, Any]]:
+        return self.index.remove(path)
+
+    def _subtree(self, path: str) -> List[str]:
+        return self.index.subtree(path)
+
+    def _move(self, old_path: str, new_path: str) -> bool:
+        if old_path not in self.objects or old_path == new_path:
+            return False
+        for path in self._subtree(old_path):
+            obj = self._unindex(path)
+            if obj is None:
+                continue
+            moved = dict(obj)
+            moved["path"] = new_path + path[len(old_path):]
+            moved["parent_path"] = _parent_of(moved["path"])
+            if path == old_path:
+                moved["name"] = new_path.rpartition(".")[2]
+            self._index(moved["path"], moved)
+        return True
+
+    def _update(self, path: Optional[str], **fields: Any) -> bool:
+        obj = self._unindex(path) if path else None
+        if obj is None:
+            return False
+        obj.update({key: value for key, value in fields.items() if value is not None})
+        self._index(path, obj)
+        return True
+
+    def _apply_spawn_object(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        path = result.get("path")
+        if not path:
+            return False
+        obj = {
+            "name": result.get("name") or payload.get("name"),
+            "class_name": result.get("class_name") or payload.get("class_name") or "Part",
+            "path": path,
+            "parent_path": _parent_of(path),
+        }
+        for key in ("position", "size"):
+            vector = _vector(payload.get(key))
+            if vector is not None:
+                obj[key] = vector
+        for key in ("material", "anchored", "can_collide"):
+            if payload.get(key) is not None:
+                obj[key] = payload[key]
+        self._unindex(path)
+        self._index(path, obj)
+        return True
+
+    def _apply_delete_object(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        path = result.get("deleted")
+        if path not in self.objects:
+            return False
+        for child in reversed(self._subtree(path)):
+            self._unindex(child)
+        return True
+
+    def _apply_set_transform(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        target = result.get("target")
+        obj = self.objects.get(target) if target else None
+        if obj is None:
+            return False
+        fields: Dict[str, Any] = {}
+        position = _vector(payload.get("position"))
+        if position is not None:
+            if "pivot" in obj:
+                # PivotTo moves every descendant part as well.
+                fields["pivot"] = position
+                self.stale = self.stale or len(self._subtree(target)) > 1
+            else:
+                fields["position"] = position
+        size = _vector(payload.get("size"))
+        if size is not None and "size" in obj:
+            fields["size"] = size
+        return self._update(target, **fields)
+
+    def _apply_set_size(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        return self._update(result.get("target"), size=_vector(result.get("size") or payload.get("size")))
+
+    def _apply_set_material(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        material = result.get("material")
+        if isinstance(material, str) and material.startswith("Enum.Material."):
+            material = material[len("Enum.Material."):]
+        return self._update(result.get("target"), material=material)
+
+    def _apply_set_anchored(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        return self._update(result.get("target"), anchored=result.get("anchored"))
+
+    def _apply_set_collidable(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        return self._update(result.get("target"), can_collide=result.get("can_collide"))
+
+    def _apply_set_color(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        # The plugin parses several color formats; only plain RGB triples are
+        # recorded locally, anything else waits for the next refresh.
+        color = payload.get("color")
+        if isinstance(color, (list, tuple)) and len(color) == 3:
+            return self._update(result.get("target"), color=list(color))
+        self.stale = True
+        return False
+
+    def _apply_set_property(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        field_name = PROPERTY_FIELDS.get(str(result.get("property") or payload.get("property")))
+        value = payload.get("value")
+        if field_name in ("position", "size", "color"):
+            value = _vector(value)
+        if field_name is None or value is None:
+            self.stale = True
+            return False
+        return self._update(result.get("target"), **{field_name: value})
+
+    def _apply_rename_object(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        new_path = result.get("target")
+        if not new_path:
+            return False
+        old_path = payload.get("target_path")
+        if isinstance(old_path, str):
+            old_path = old_path.replace("/", ".")
+        if old_path not in self.objects:
+            old_path = f"{_parent_of(new_path)}.{payload.get('target_name') or payload.get('name')}"
+        if old_path in self.objects:
+            return self._move(old_path, new_path)
+        self.stale = True
+        return False
+
+    def _apply_parent_object(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        new_path = result.get("target")
+        if not new_path:
+            return False
+        name = new_path.rpartition(".")[2]
+        candidates = [
+            path for path, obj in self.objects.items() if obj.get("name") == name and path != new_path
+        ]
+        target_path = payload.get("target_path")
+        if isinstance(target_path, str) and target_path.replace("/", ".") in self.objects:
+            candidates = [target_path.replace("/", ".")]
+        if len(candidates) == 1:
+            return self._move(candidates[0], new_path)
+        self.stale = True
+        return False
+
+    def _apply_create_folder(self, payload: Dict[str, Any], result: Dict[str, Any]) -> bool:
+        path = result.get("folder")
+        if not path:
+            return False
+        self._index(
+            path,
+            {"name": path.rpartition(".")[2], "class_name": "Folder", "path": path, "parent_path": _parent_of(path)},
+        )
+        return True
+
+
+# Keys SceneColumns stores as columns; anything else goes to the sparse `extras`.
+_COLUMN_KEYS = {
+    "name",
+    "class_name",
+    "path",
+    "parent_path",
+    "position",
+    "pivot",
+    "size",
+    "material",
+    "color",
+    "anchored",
+    "can_collide",
+}
+_NAN = float("nan")
+
+
+def _flag(value: Any) -> int:
+    if value is None:
+        return -1
+    return 1 if value else 0
+
+
+class SceneRow:
+    """Read/write view of one object in a SceneColumns store."""
+
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store: "SceneColumns", row: int) -> None:
+        self._store = store
+        self._row = row
+
+    def __repr__(self) -> str:
+        return f"SceneRow({self.path!r}, {self.class_name!r})"
+
+    @property
+    def index(self) -> int:
+        return self._row
+
+    @property
+    def path(self) -> str:
+        return self._store.paths[self._row]
+
+    @property
+    def name(self) -> str:
+        return self._store.names[self._row]
+
+    @property
+    def parent_path(self) -> str:
+        return _parent_of(self.path)
+
+    @property
+    def class_name(self) -> str:
+        store = self._store
+        return store.class_names[store.class_ids[self._row]]
+
+    @property
+    def material(self) -> Optional[str]:
+        store = self._store
+        return store.material_names[store.material_ids[self._row]]
+
+    @property
+    def position(self) -> Optional[Vector3]:
+        return self._store._vector_at(self._store.position, self._row)
+
+    @position.setter
+    def position(self, value: Sequence[float]) -> None:
+        self._store._set_vector(self._store.position, self._row, value)
+
+    @property
+    def size(self) -> Optional[Vector3]:
+        return self._store._vector_at(self._store.size, self._row)
+
+    @size.setter
+    def size(self, value: Sequence[float]) -> None:
+        self._store._set_vector(self._store.size, self._row, value)
+
+    @property
+    def color(self) -> Optional[Vector3]:
+        return self._store._vector_at(self._store.color, self._row)
+
+    @property
+    def anchored(self) -> Optional[bool]:
+        flag = self._store.anchored[self._row]
+        return None if flag < 0 else bool(flag)
+
+    @property
+    def can_collide(self) -> Optional[bool]:
+        flag = self._store.can_collide[self._row]
+        return None if flag < 0 else bool(flag)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return self._store.object_at(self._row)
+
+
+# Positions, sizes and colors live in flat array('d') columns (x, y, z per row,
+# NaN when absent); model pivots share the position column and are flagged in
+# is_pivot. With NumPy, translate()/scale() run over zero-copy views of those
+# columns.
+class SceneColumns:
+    """Columnar copy of a snapshot's `objects` list."""
+
+    def __init__(self) -> None:
+        self.paths: List[str] = []
+        self.names: List[str] = []
+        self.class_names: List[str] = []
+        self.material_names: List[Optional[str]] = [None]
+        self.class_ids = array("H")
+        self.material_ids = array("H")
+        self.position = array("d")
+        self.size = array("d")
+        self.color = array("d")
+        self.is_pivot = array("b")
+        self.anchored = array("b")
+        self.can_collide = array("b")
+        self.extras: Dict[int, Dict[str, Any]] = {}
+        self._class_lookup: Dict[str, int] = {}
+        self._material_lookup: Dict[Optional[str], int] = {None: 0}
+        self._rows_by_path: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[Dict[str, Any]]) -> "SceneColumns":
+        store = cls()
+        for obj in objects:
+            store.append(obj)
+        return store
+
+    def append(self, obj: Dict[str, Any]) -> int:
+        path = obj.get("path")
+        if not isinstance(path, str) or not path:
+            raise ValueError("scene object needs a path")
+        row = len(self.paths)
+        self.paths.append(sys.intern(path))
+        self.names.append(sys.intern(str(obj.get("name") or path.rpartition(".")[2])))
+        self.class_ids.append(self._intern(self._class_lookup, self.class_names, str(obj.get("class_name") or "Instance")))
+        material = obj.get("material")
+        self.material_ids.append(
+            self._intern(self._material_lookup, self.material_names, str(material) if material is not None else None)
+        )
+        position = _vector(obj.get("position"))
+        pivot = _vector(obj.get("pivot")) if position is None else None
+        self.position.extend(position or pivot or (_NAN, _NAN, _NAN))
+        self.is_pivot.append(1 if pivot is not None else 0)
+        self.size.extend(_vector(obj.get("size")) or (_NAN, _NAN, _NAN))
+        self.color.extend(_vector(obj.get("color")) or (_NAN, _NAN, _NAN))
+        self.anchored.append(_flag(obj.get("anchored")))
+        self.can_collide.append(_flag(obj.get("can_collide")))
+        extra = {key: value for key, value in obj.items() if key not in _COLUMN_KEYS}
+        if extra:
+            self.extras[row] = extra
+        if self._rows_by_path is not None:
+            self._rows_by_path[self.paths[row]] = row
+        return row
+
+    def _intern(self, lookup: Dict[Any, int], table: List[Any], value: Any) -> int:
+        index = lookup.get(value)
+        if index is None:
+            index = len(table)
+            table.append(sys.intern(value) if isinstance(value, str) else value)
+            lookup[value] = index
+        return index
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, row: int) -> SceneRow:
+        if row < 0:
+            row += len(self.paths)
+        if not 0 <= row < len(self.paths):
+            raise IndexError(row)
+        return SceneRow(self, row)
+
+    def __iter__(self) -> Iterator[SceneRow]:
+        return (SceneRow(self, row) for row in range(len(self.paths)))
+
+    def row(self, path: str) -> Optional[SceneRow]:
+        if self._rows_by_path is None:
+            self._rows_by_path = {p: i for i, p in enumerate(self.paths)}
+        index = self._rows_by_path.get(path)
+        return None if index is None else SceneRow(self, index)
+
+    def _vector_at(self, column: array, row: int) -> Optional[Vector3]:
+        base = row * 3
+        x = column[base]
+        if x != x:  # NaN marks a missing vector
+            return None
+        return (x, column[base + 1], column[base + 2])
+
+    def _set_vector(self, column: array, row: int, value: Sequence[float]) -> None:
+        base = row * 3
+        column[base] = float(value[0])
+        column[base + 1] = float(value[1])
+        column[base + 2] = float(value[2])
+
+    def object_at(self, row: int) -> Dict[str, Any]:
+        path = self.paths[row]
+        obj: Dict[str, Any] = {
+            "name": self.names[row],
+            "class_name": self.class_names[self.class_ids[row]],
+            "path": path,
+            "parent_path": _parent_of(path),
+        }
+        position = self._vector_at(self.position, row)
+        if position is not None:
+            obj["pivot" if self.is_pivot[row] else "position"] = list(position)
+        for key, column in (("size", self.size), ("color", self.color)):
+            vector = self._vector_at(column, row)
+            if vector is not None:
+                obj[key] = list(vector)
+        material = self.material_names[self.material_ids[row]]
+        if material is not None:
+            obj["material"] = material
+        for key, flags in (("anchored", self.anchored), ("can_collide", self.can_collide)):
+            if flags[row] >= 0:
+                obj[key] = bool(flags[row])
+        obj.update(self.extras.get(row, {}))
+        return obj
+
+    def to_objects(self) -> List[Dict[str, Any]]:
+        return [self.object_at(row) for row in range(len(self.paths))]
+
+    def select(
+        self,
+        *,
+        class_name: Optional[str] = None,
+        material: Optional[str] = None,
+        under: Optional[str] = None,
+    ) -> array:
+        """Row numbers matching every given filter, as an `array('l')`."""
+        class_id = self._class_lookup.get(class_name) if class_name is not None else None
+        material_id = self._material_lookup.get(material) if material is not None else None
+        if (class_name is not None and class_id is None) or (material is not None and material_id is None):
+            return array("l")
+        prefix = under + "." if under is not None else None
+        rows = array("l")
+        for row in range(len(self.paths)):
+            if class_id is not None and self.class_ids[row] != class_id:
+                continue
+            if material_id is not None and self.material_ids[row] != material_id:
+                continue
+            if prefix is not None and not self.paths[row].startswith(prefix):
+                continue
+            rows.append(row)
+        return rows
+
+    def as_numpy(self) -> Tuple[Any, Any]:
+        """Zero-copy (n, 3) NumPy views over the position and size columns."""
+        if _np is None:
+            raise ImportError("SceneColumns.as_numpy() requires numpy")
+        return (
+            _np.frombuffer(self.position, dtype=_np.float64).reshape(-1, 3),
+            _np.frombuffer(self.size, dtype=_np.float64).reshape(-1, 3),
+        )
+
+    def translate(self, offset: Sequence[float], rows: Optional[Iterable[int]] = None) -> None:
+        """Add `offset` to the position of every row (or only `rows`)."""
+        dx, dy, dz = (float(v) for v in offset)
+        if not self.paths:
+            return
+        if _np is not None:
+            position, _size = self.as_numpy()
+            if rows is None:
+                position += (dx, dy, dz)
+            else:
+                position[_np.asarray(list(rows), dtype=_np.intp)] += (dx, dy, dz)
+            return
+        column = self.position
+        for row in range(len(self.paths)) if rows is None else rows:
+            base = row * 3
+            column[base] += dx
+            column[base + 1] += dy
+            column[base + 2] += dz
+
+    def scale(
+        self,
+        factor: float,
+        *,
+        origin: Optional[Sequence[float]] = None,
+        rows: Optional[Iterable[int]] = None,
+    ) -> None:
+        """Scale positions about `origin` (default: the rows' centroid) and sizes by `factor`."""
+        factor = float(factor)
+        selected = list(range(len(self.paths))) if rows is None else list(rows)
+        if not selected:
+            return
+        if origin is None:
+            origin = self._centroid(selected)
+        ox, oy, oz = (float(v) for v in origin)
+        if _np is not None:
+            position, size = self.as_numpy()
+            index = _np.asarray(selected, dtype=_np.intp)
+            position[index] = (position[index] - (ox, oy, oz)) * factor + (ox, oy, oz)
+            size[index] = size[index] * factor
+            return
+        column = self.position
+        sizes = self.size
+        for row in selected:
+            base = row * 3
+            column[base] = (column[base] - ox) * factor + ox
+            column[base + 1] = (column[base + 1] - oy) * factor + oy
+            column[base + 2] = (column[base + 2] - oz) * factor + oz
+            sizes[base] *= factor
+            sizes[base + 1] *= factor
+            sizes[base + 2] *= factor
+
+    def _centroid(self, rows: Sequence[int]) -> Vector3:
+        totals = [0.0, 0.0, 0.0]
+        count = 0
+        column = self.position
+        for row in rows:
+            base = row * 3
+            if column[base] != column[base]:
+                continue
+            totals[0] += column[base]
+            totals[1] += column[base + 1]
+            totals[2] += column[base + 2]
+            count += 1
+        if not count:
+            return (0.0, 0.0, 0.0)
+        return (totals[0] / count, totals[1] / count, totals[2] / count)
+
+    def nbytes(self) -> int:
+        """Approximate size of the numeric columns, for comparing against dict snapshots."""
+        columns = (
+            self.class_ids,
+            self.material_ids,
+            self.position,
+            self.size,
+            self.color,
+            self.is_pivot,
+            self.anchored,
+            self.can_collide,
+        )
+        return sum(column.itemsize * len(column) for column in columns)
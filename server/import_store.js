@@ -0,0 +1,186 @@
+"use strict";
+
+const crypto = require("crypto");
+const fs = require("fs");
+const path = require("path");
+const { Transform, pipeline } = require("stream");
+
+const SHA256_PATTERN = /^[0-9a-f]{64}$/;
+const EXTENSION_PATTERN = /^\.[a-z0-9]{1,16}$/;
+const STORED_NAME_PATTERN = /^[0-9a-f]{64}(\.[a-z0-9]{1,16})?$/;
+
+function normalizeSha256(value) {
+  const text = String(value === undefined || value === null ? "" : value)
+    .trim()
+    .toLowerCase();
+  return SHA256_PATTERN.test(text) ? text : null;
+}
+
+function safeExtension(fileName) {
+  const extension = path.extname(String(fileName || "")).toLowerCase();
+  return EXTENSION_PATTERN.test(extension) ? extension : "";
+}
+
+// multer storage engine: writes the upload to disk like `dest` does and
+// hashes it on the way through, so large files are read only once.
+class HashingDiskStorage {
+  constructor(options = {}) {
+    this.directory = options.directory;
+  }
+
+  _handleFile(_req, file, cb) {
+    const filename = crypto.randomBytes(16).toString("hex");
+    const filePath = path.join(this.directory, filename);
+    const hash = crypto.createHash("sha256");
+    let size = 0;
+    const hasher = new Transform({
+      transform(chunk, _encoding, done) {
+        hash.update(chunk);
+        size += chunk.length;
+        done(null, chunk);
+      },
+    });
+    pipeline(file.stream, hasher, fs.createWriteStream(filePath), (err) => {
+      if (err) {
+        fs.unlink(filePath, () => cb(err));
+        return;
+      }
+      cb(null, {
+        destination: this.directory,
+        filename,
+        path: filePath,
+        size,
+        sha256: hash.digest("hex"),
+      });
+    });
+  }
+
+  _removeFile(_req, file, cb) {
+    fs.unlink(file.path, () => cb(null));
+  }
+}
+
+// Content-addressed import directory: an upload is kept as
+// `<sha256><ext>`, so identical files are stored once and clients can ask
+// for them by hash instead of sending them again. With `maxBytes` set, the
+// least recently used files are removed once the directory outgrows it;
+// adopting or finding a file counts as a use.
+class ImportStore {
+  constructor(options = {}) {
+    this.directory = options.directory;
+    this.maxBytes = Math.max(0, Number(options.maxBytes) || 0);
+  }
+
+  pathFor(sha256, fileName) {
+    return path.join(this.directory, `${sha256}${safeExtension(fileName)}`);
+  }
+
+  async find(sha256, fileName) {
+    const digest = normalizeSha256(sha256);
+    if (!digest) {
+      return null;
+    }
+    const filePath = this.pathFor(digest, fileName);
+    const stat = await statFile(filePath);
+    if (!stat) {
+      return null;
+    }
+    await touch(filePath);
+    return { path: filePath, sha256: digest, bytes: stat.size };
+  }
+
+  async adopt(file, expectedSha256 = null) {
+    const digest = file.sha256 || (await hashFile(file.path));
+    if (expectedSha256 && expectedSha256 !== digest) {
+      await fs.promises.rm(file.path, { force: true });
+      return { ok: false, sha256: digest };
+    }
+    const filePath = this.pathFor(digest, file.originalname);
+    const deduped = Boolean(await statFile(filePath));
+    if (deduped) {
+      await fs.promises.rm(file.path, { force: true });
+      await touch(filePath);
+    } else {
+      await fs.promises.rename(file.path, filePath);
+      await this.prune(filePath);
+    }
+    return {
+      ok: true,
+      path: filePath,
+      sha256: digest,
+      bytes: file.size,
+      deduped,
+    };
+  }
+
+  // Removes the least recently used stored files until the directory fits
+  // in maxBytes. `keep` (the file just adopted) is never removed, and
+  // in-flight multer temp files do not match the stored-name pattern.
+  async prune(keep = null) {
+    if (this.maxBytes <= 0) {
+      return [];
+    }
+    const entries = [];
+    let total = 0;
+    for (const name of await fs.promises.readdir(this.directory)) {
+      if (!STORED_NAME_PATTERN.test(name)) {
+        continue;
+      }
+      const filePath = path.join(this.directory, name);
+      const stat = await statFile(filePath);
+      if (stat) {
+        entries.push({ path: filePath, bytes: stat.size, at: stat.mtimeMs });
+        total += stat.size;
+      }
+    }
+    entries.sort((a, b) => a.at - b.at);
+    const removed = [];
+    for (const entry of entries) {
+      if (total <= this.maxBytes) {
+        break;
+      }
+      if (entry.path === keep) {
+        continue;
+      }
+      await fs.promises.rm(entry.path, { force: true });
+      total -= entry.bytes;
+      removed.push(entry.path);
+    }
+    return removed;
+  }
+}
+
+async function statFile(filePath) {
+  try {
+    const stat = await fs.promises.stat(filePath);
+    return stat.isFile() ? stat : null;
+  } catch (_err) {
+    return null;
+  }
+}
+
+async function touch(filePath) {
+  const now = new Date();
+  try {
+    await fs.promises.utimes(filePath, now, now);
+  } catch (_err) {
+    // Only affects pruning order.
+  }
+}
+
+function hashFile(filePath) {
+  return new Promise((resolve, reject) => {
+    const hash = crypto.createHash("sha256");
+    fs.createReadStream(filePath)
+      .on("error", reject)
+      .on("data", (chunk) => hash.update(chunk))
+      .on("end", () => resolve(hash.digest("hex")));
+  });
+}
+
+module.exports = {
+  HashingDiskStorage,
+  ImportStore,
+  normalizeSha256,
+  safeExtension,
+};
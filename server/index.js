@@ -10,6 +10,11 @@ const multer = require("multer");
 
 const { CommandStore } = require("./command_store");
 const { FixedWindowRateLimiter } = require("./rate_limiter");
+const {
+  HashingDiskStorage,
+  ImportStore,
+  normalizeSha256,
+} = require("./import_store");
 const {
   buildPlanWithAssistant,
   normalizeExternalPlan,
@@ -41,6 +46,10 @@ const MAX_UPLOAD_MB = parseInt(
   process.env.ROBLOXBRIDGE_MAX_UPLOAD_MB || "250",
   10,
 );
+const IMPORT_MAX_MB = parseInt(
+  process.env.ROBLOXBRIDGE_IMPORT_MAX_MB || "2048",
+  10,
+);
 const RATE_LIMIT_WINDOW_MS_RAW = parseInt(
   process.env.ROBLOXBRIDGE_RATE_LIMIT_WINDOW_MS || "60000",
   10,
@@ -64,6 +73,9 @@ const ALLOW_UNAUTHENTICATED_REMOTE =
 const BLENDER_TO_ROBLOX_SCALE = Number.parseFloat(
   process.env.ROBLOXBRIDGE_BLENDER_SCALE || "3.571428",
 );
+const MAX_STATUS_IDS = 1000;
+// Upper bound on how long GET /bridge/commands holds a long poll.
+const MAX_COMMAND_WAIT_MS = 25000;
 const MAX_EXPIRES_IN_MS_RAW = parseInt(
   process.env.ROBLOXBRIDGE_MAX_EXPIRES_IN_MS || String(7 * 24 * 60 * 60 * 1000),
   10,
@@ -82,6 +94,15 @@ const QUEUE_SNAPSHOT_PATH =
   QUEUE_SNAPSHOT_PATH_ENV === undefined
     ? DEFAULT_QUEUE_SNAPSHOT_PATH
     : String(QUEUE_SNAPSHOT_PATH_ENV || "").trim();
+const QUEUE_PERSISTENCE = String(
+  process.env.ROBLOXBRIDGE_QUEUE_PERSISTENCE || "journal",
+)
+  .trim()
+  .toLowerCase();
+const QUEUE_FSYNC_MS = parseInt(
+  process.env.ROBLOXBRIDGE_QUEUE_FSYNC_MS || "200",
+  10,
+);
 const RATE_LIMIT_WINDOW_MS =
   Number.isFinite(RATE_LIMIT_WINDOW_MS_RAW) && RATE_LIMIT_WINDOW_MS_RAW > 0
     ? RATE_LIMIT_WINDOW_MS_RAW
@@ -159,6 +180,8 @@ const store = new CommandStore({
   leaseMs: Number.isFinite(COMMAND_LEASE_MS) ? COMMAND_LEASE_MS : 120000,
   maxRetention: Number.isFinite(MAX_RETENTION) ? MAX_RETENTION : 10000,
   snapshotPath: QUEUE_SNAPSHOT_PATH || null,
+  persistence: QUEUE_PERSISTENCE,
+  fsyncIntervalMs: Number.isFinite(QUEUE_FSYNC_MS) ? QUEUE_FSYNC_MS : 200,
 });
 
 const sceneIntrospectionState = {
@@ -169,8 +192,29 @@ const sceneIntrospectionState = {
   updated_at: null,
   error: null,
   scene: null,
+  revision: 0,
 };
 
+// Revisions restart at zero with the process, so tag them with a boot id to
+// keep ETags from a previous run from matching a fresh snapshot.
+const SCENE_ETAG_EPOCH = Date.now().toString(36);
+
+function sceneIntrospectionEtag(includeObjects) {
+  return `"scene-${SCENE_ETAG_EPOCH}-${sceneIntrospectionState.revision}-${
+    includeObjects ? "full" : "summary"
+  }"`;
+}
+
+function etagMatches(ifNoneMatch, etag) {
+  if (!ifNoneMatch) {
+    return false;
+  }
+  return String(ifNoneMatch)
+    .split(",")
+    .map((value) => value.trim().replace(/^W\//, ""))
+    .some((value) => value === "*" || value === etag);
+}
+
 function shallowCopyObject(value) {
   if (!value || typeof value !== "object" || Array.isArray(value)) {
     return {};
@@ -349,6 +393,7 @@ function updateSceneStateOnQueued(command) {
     command.created_at || new Date().toISOString();
   sceneIntrospectionState.updated_at = sceneIntrospectionState.queued_at;
   sceneIntrospectionState.error = null;
+  sceneIntrospectionState.revision += 1;
 }
 
 function updateSceneStateFromCommand(command) {
@@ -359,6 +404,7 @@ function updateSceneStateFromCommand(command) {
   sceneIntrospectionState.queued_command_id = null;
   sceneIntrospectionState.updated_at =
     command.updated_at || new Date().toISOString();
+  sceneIntrospectionState.revision += 1;
 
   if (command.status === "succeeded") {
     const scene = normalizeSceneSnapshot(command.result);
@@ -403,8 +449,12 @@ function resolvePlannerSceneContext(body) {
   return null;
 }
 
+const importStore = new ImportStore({
+  directory: IMPORT_DIR,
+  maxBytes: Math.max(0, IMPORT_MAX_MB) * 1024 * 1024,
+});
 const upload = multer({
-  dest: IMPORT_DIR,
+  storage: new HashingDiskStorage({ directory: IMPORT_DIR }),
   limits: {
     fileSize: Math.max(1, MAX_UPLOAD_MB) * 1024 * 1024,
   },
@@ -661,6 +711,56 @@ function parseExpiresAt(payload) {
   return { ok: true, expiresAt: null };
 }
 
+// Resolves the file for an import route: a multipart upload (stored by
+// content hash) or `content_sha256` naming one uploaded earlier. Returns
+// null when neither was sent.
+async function resolveImportUpload(req) {
+  const body = req.body || {};
+  const hasDigest =
+    body.content_sha256 !== undefined && body.content_sha256 !== "";
+  const expected = hasDigest ? normalizeSha256(body.content_sha256) : null;
+  if (hasDigest && !expected) {
+    return {
+      ok: false,
+      statusCode: 400,
+      error: "content_sha256 must be a hex SHA-256 digest",
+    };
+  }
+  if (req.file && req.file.path) {
+    const stored = await importStore.adopt(req.file, expected);
+    if (!stored.ok) {
+      return {
+        ok: false,
+        statusCode: 400,
+        error: "content_sha256 does not match the uploaded file",
+      };
+    }
+    return {
+      ok: true,
+      file_path: stored.path,
+      content_sha256: stored.sha256,
+      original_name: req.file.originalname || null,
+    };
+  }
+  if (expected) {
+    const found = await importStore.find(expected, body.original_name);
+    if (!found) {
+      return {
+        ok: false,
+        statusCode: 404,
+        error: "no uploaded file with that content_sha256",
+      };
+    }
+    return {
+      ok: true,
+      file_path: found.path,
+      content_sha256: found.sha256,
+      original_name: body.original_name || null,
+    };
+  }
+  return null;
+}
+
 function queueCommand(req, res, spec, extraPayload = {}, options = {}) {
   const expires = parseExpiresAt(req.body || {});
   if (!expires.ok) {
@@ -1121,6 +1221,7 @@ app.get("/bridge/capabilities", (_req, res) => {
       persistence: {
         queue_snapshot: Boolean(QUEUE_SNAPSHOT_PATH),
         queue_snapshot_path: QUEUE_SNAPSHOT_PATH || null,
+        queue_persistence: QUEUE_SNAPSHOT_PATH ? store.persistence : null,
       },
       auth: {
         enabled: AUTH_ENABLED,
@@ -1232,6 +1333,12 @@ app.get("/bridge/introspection/scene", ...readAccess, (req, res) => {
     String(req.query.include_objects || "true")
       .trim()
       .toLowerCase() !== "false";
+  const etag = sceneIntrospectionEtag(includeObjects);
+  res.set("ETag", etag);
+  res.set("Cache-Control", "no-cache");
+  if (etagMatches(req.get("If-None-Match"), etag)) {
+    return res.status(304).end();
+  }
   const scene = includeObjects
     ? sceneIntrospectionState.scene
     : sceneContextSummary(sceneIntrospectionState.scene);
@@ -1244,6 +1351,8 @@ app.get("/bridge/introspection/scene", ...readAccess, (req, res) => {
       queued_at: sceneIntrospectionState.queued_at,
       updated_at: sceneIntrospectionState.updated_at,
       error: sceneIntrospectionState.error,
+      revision: sceneIntrospectionState.revision,
+      etag,
       scene: scene || null,
     },
   });
@@ -1373,8 +1482,55 @@ app.get("/bridge/stats", ...readAccess, (_req, res) => {
 });
 
 app.get("/bridge/commands/recent", ...readAccess, (req, res) => {
-  const limit = parseInteger(req.query.limit, 50, 1, 500);
-  res.json({ status: "ok", commands: store.listRecent(limit) });
+  const page = store.listCommands({
+    limit: parseInteger(req.query.limit, 50, 1, 500),
+    cursor: req.query.cursor,
+    order: req.query.order,
+    status: req.query.status,
+    action: req.query.action,
+    category: req.query.category,
+    since: req.query.since,
+    until: req.query.until,
+    fields: req.query.fields,
+  });
+  if (!page.ok) {
+    return res.status(400).json({ status: "error", error: page.error });
+  }
+  return res.json({
+    status: "ok",
+    count: page.commands.length,
+    commands: page.commands,
+    next_cursor: page.next_cursor,
+  });
+});
+
+app.post("/bridge/commands/status", ...readAccess, (req, res) => {
+  const body = req.body || {};
+  const ids = Array.from(
+    new Set(
+      (Array.isArray(body.ids) ? body.ids : [])
+        .map((id) => String(id || "").trim())
+        .filter(Boolean),
+    ),
+  );
+  if (ids.length === 0) {
+    return res
+      .status(400)
+      .json({ status: "error", error: "ids[] is required" });
+  }
+  if (ids.length > MAX_STATUS_IDS) {
+    return res.status(400).json({
+      status: "error",
+      error: `at most ${MAX_STATUS_IDS} ids per request`,
+    });
+  }
+  const lookup = store.getMany(ids, body.fields);
+  return res.json({
+    status: "ok",
+    count: lookup.commands.length,
+    commands: lookup.commands,
+    missing: lookup.missing,
+  });
 });
 
 app.get("/bridge/commands/:id", ...readAccess, (req, res) => {
@@ -1460,13 +1616,17 @@ app.post("/bridge/commands/batch", ...writeAccess, (req, res) => {
 app.get("/bridge/commands", ...writeAccess, (req, res) => {
   const clientId = inferClientId(req);
   const limit = parseInteger(req.query.limit, 20, 1, 100);
-  const commands = store.dispatch(clientId, limit);
-  res.json({
-    status: "ok",
-    client_id: clientId,
-    count: commands.length,
-    commands,
+  const waitMs = parseInteger(req.query.wait_ms, 0, 0, MAX_COMMAND_WAIT_MS);
+  const cancel = store.waitForDispatch(clientId, limit, waitMs, (commands) => {
+    res.json({
+      status: "ok",
+      client_id: clientId,
+      count: commands.length,
+      commands,
+      wait_ms: waitMs,
+    });
   });
+  res.on("close", cancel);
 });
 
 app.post("/bridge/results", ...writeAccess, (req, res) => {
@@ -1587,20 +1747,24 @@ app.post(
   "/bridge/blender/import",
   ...writeAccess,
   upload.single("file"),
-  (req, res) => {
-    let localPath = req.body.file_path || null;
-    if (req.file && req.file.path) {
-      const extension = path.extname(req.file.originalname || "").toLowerCase();
-      const safeName = `${req.file.filename}${extension}`;
-      const finalPath = path.join(IMPORT_DIR, safeName);
-      fs.renameSync(req.file.path, finalPath);
-      localPath = finalPath;
+  async (req, res, next) => {
+    let imported;
+    try {
+      imported = await resolveImportUpload(req);
+    } catch (err) {
+      return next(err);
+    }
+    if (imported && !imported.ok) {
+      return res
+        .status(imported.statusCode)
+        .json({ status: "error", error: imported.error });
     }
+    const localPath = imported ? imported.file_path : req.body.file_path;
 
     if (!localPath) {
       return res.status(400).json({
         status: "error",
-        error: "Provide multipart file upload or file_path",
+        error: "Provide multipart file upload, content_sha256, or file_path",
       });
     }
 
@@ -1624,6 +1788,7 @@ app.post(
       },
       {
         file_path: localPath,
+        content_sha256: imported ? imported.content_sha256 : undefined,
         scale_fix: scaleFix,
         scale_factor: scaleFactor,
         recommended_blender_to_roblox_scale: BLENDER_TO_ROBLOX_SCALE,
@@ -1636,7 +1801,7 @@ app.post(
   "/bridge/asset/import-blender",
   ...writeAccess,
   upload.single("file"),
-  (req, res) => {
+  async (req, res, next) => {
     const scaleFix = req.body.scale_fix || "blender_to_roblox";
     const rawScale =
       req.body.scale_factor !== undefined
@@ -1651,21 +1816,27 @@ app.post(
         ? Number.parseInt(req.body.asset_id, 10)
         : null;
 
-    let localPath = req.body.file_path || null;
-    let originalName = null;
-    if (req.file && req.file.path) {
-      const extension = path.extname(req.file.originalname || "").toLowerCase();
-      const safeName = `${req.file.filename}${extension}`;
-      const finalPath = path.join(IMPORT_DIR, safeName);
-      fs.renameSync(req.file.path, finalPath);
-      localPath = finalPath;
-      originalName = req.file.originalname || null;
+    let imported;
+    try {
+      imported = await resolveImportUpload(req);
+    } catch (err) {
+      return next(err);
     }
+    if (imported && !imported.ok) {
+      return res
+        .status(imported.statusCode)
+        .json({ status: "error", error: imported.error });
+    }
+    const localPath = imported
+      ? imported.file_path
+      : req.body.file_path || null;
+    const originalName = imported ? imported.original_name : null;
 
     if (!localPath && !Number.isFinite(assetId)) {
       return res.status(400).json({
         status: "error",
-        error: "Provide multipart file upload, file_path, or asset_id",
+        error:
+          "Provide multipart file upload, content_sha256, file_path, or asset_id",
       });
     }
 
@@ -1681,6 +1852,7 @@ app.post(
         file_path: localPath,
         asset_id: Number.isFinite(assetId) ? assetId : undefined,
         original_name: originalName,
+        content_sha256: imported ? imported.content_sha256 : undefined,
         scale_fix: scaleFix,
         scale_factor: scaleFactor,
         recommended_blender_to_roblox_scale: BLENDER_TO_ROBLOX_SCALE,
@@ -1689,20 +1861,46 @@ app.post(
   },
 );
 
+app.get("/bridge/asset/imports/:sha256", ...readAccess, async (req, res) => {
+  const digest = normalizeSha256(req.params.sha256);
+  if (!digest) {
+    return res.status(400).json({
+      status: "error",
+      error: "sha256 must be a hex SHA-256 digest",
+    });
+  }
+  const found = await importStore.find(digest, req.query.name);
+  return res.json({
+    status: "ok",
+    content_sha256: digest,
+    exists: Boolean(found),
+    path: found ? found.path : null,
+    bytes: found ? found.bytes : null,
+  });
+});
+
 app.post(
   "/bridge/asset/import-model/upload",
   ...writeAccess,
   upload.single("file"),
-  (req, res) => {
-    if (!req.file || !req.file.path) {
+  async (req, res, next) => {
+    let imported;
+    try {
+      imported = await resolveImportUpload(req);
+    } catch (err) {
+      return next(err);
+    }
+    if (!imported) {
+      return res.status(400).json({
+        status: "error",
+        error: "multipart file or content_sha256 is required",
+      });
+    }
+    if (!imported.ok) {
       return res
-        .status(400)
-        .json({ status: "error", error: "multipart file is required" });
+        .status(imported.statusCode)
+        .json({ status: "error", error: imported.error });
     }
-    const extension = path.extname(req.file.originalname || "").toLowerCase();
-    const safeName = `${req.file.filename}${extension}`;
-    const finalPath = path.join(IMPORT_DIR, safeName);
-    fs.renameSync(req.file.path, finalPath);
 
     return queueCommand(
       req,
@@ -1712,7 +1910,11 @@ app.post(
         category: "asset",
         action: "import-model",
       },
-      { file_path: finalPath, original_name: req.file.originalname },
+      {
+        file_path: imported.file_path,
+        original_name: imported.original_name,
+        content_sha256: imported.content_sha256,
+      },
     );
   },
 );
@@ -1762,11 +1964,13 @@ const rateLimitCleanupInterval = setInterval(
 process.on("SIGINT", () => {
   clearInterval(heartbeatInterval);
   clearInterval(rateLimitCleanupInterval);
+  store.close();
   process.exit(0);
 });
 process.on("SIGTERM", () => {
   clearInterval(heartbeatInterval);
   clearInterval(rateLimitCleanupInterval);
+  store.close();
   process.exit(0);
 });
 
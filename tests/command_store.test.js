@@ -214,3 +214,384 @@ test("resultBatch supports mixed outcomes and duplicate reporting", () => {
   assert.equal(duplicate.error_count, 0);
   assert.equal(duplicate.duplicate_count, 1);
 });
+
+test("listCommands pages with a cursor, filters and projects fields", () => {
+  const store = makeStore();
+  for (let i = 0; i < 25; i += 1) {
+    store.enqueueWithMeta({
+      route: "/bridge/test-spawn",
+      category: "test",
+      action: i % 2 === 0 ? "test-spawn" : "autosave",
+      payload: { index: i },
+    });
+  }
+  const done = store.dispatch("studio-a", 5);
+  for (const cmd of done) {
+    store.result({
+      command_id: cmd.id,
+      dispatch_token: cmd.dispatch_token,
+      ok: true,
+      status: "ok",
+    });
+  }
+
+  const seen = [];
+  let cursor = null;
+  let pages = 0;
+  do {
+    const page = store.listCommands({ limit: 10, cursor });
+    assert.equal(page.ok, true);
+    seen.push(...page.commands.map((cmd) => cmd.id));
+    cursor = page.next_cursor;
+    pages += 1;
+  } while (cursor);
+  assert.equal(pages, 3);
+  assert.equal(new Set(seen).size, 25);
+  assert.deepEqual(
+    seen,
+    store.listCommands({ limit: 500 }).commands.map((cmd) => cmd.id),
+  );
+  assert.deepEqual(
+    store
+      .listCommands({ limit: 500, order: "asc" })
+      .commands.map((cmd) => cmd.id),
+    [...seen].reverse(),
+  );
+
+  const succeeded = store.listCommands({
+    status: "succeeded",
+    fields: "status,execution_ms,missing",
+  });
+  assert.equal(succeeded.commands.length, 5);
+  assert.deepEqual(Object.keys(succeeded.commands[0]).sort(), [
+    "execution_ms",
+    "id",
+    "status",
+  ]);
+  assert.equal(
+    store.listCommands({ action: "autosave,unknown" }).commands.length,
+    12,
+  );
+  assert.equal(
+    store.listCommands({ since: Date.now() + 60_000 }).commands.length,
+    0,
+  );
+  assert.equal(store.listCommands({ cursor: "not-a-cursor" }).ok, false);
+  assert.equal(store.listCommands({ until: "yesterday" }).ok, false);
+});
+
+test("dispatch follows priority then FIFO, including after a restart", () => {
+  const tempDir = fs.mkdtempSync(
+    path.join(os.tmpdir(), "novablox-store-test-"),
+  );
+  const snapshotPath = path.join(tempDir, "queue-snapshot.json");
+
+  try {
+    const writer = makeStore({ snapshotPath });
+    const queued = writer.enqueueBatchWithMeta(
+      [0, 5, 0, 5, 0, -1, 0].map((priority, index) => ({
+        route: "/bridge/test-spawn",
+        category: "test",
+        action: "test-spawn",
+        payload: { index },
+        priority,
+      })),
+    );
+    const order = [1, 3, 0, 2, 4, 6, 5].map(
+      (index) => queued[index].command.id,
+    );
+
+    const reader = makeStore({ snapshotPath });
+    assert.deepEqual(
+      reader.dispatch("studio-a", 10).map((cmd) => cmd.id),
+      order,
+    );
+    assert.deepEqual(
+      writer.dispatch("studio-a", 3).map((cmd) => cmd.id),
+      order.slice(0, 3),
+    );
+    writer.cancel(order[3]);
+    assert.deepEqual(
+      writer.dispatch("studio-a", 10).map((cmd) => cmd.id),
+      order.slice(4),
+    );
+    assert.equal(writer.summary().pending_count, 0);
+  } finally {
+    fs.rmSync(tempDir, { recursive: true, force: true });
+  }
+});
+
+test("expired leases are requeued and queued deadlines expire", async () => {
+  const store = makeStore({ leaseMs: 20 });
+  const leased = store.enqueueWithMeta({
+    route: "/bridge/test-spawn",
+    category: "test",
+    action: "test-spawn",
+    payload: {},
+  }).command;
+  const doomed = store.enqueueWithMeta({
+    route: "/bridge/test-spawn",
+    category: "test",
+    action: "test-spawn",
+    payload: {},
+    expiresAt: new Date(Date.now() + 20),
+  }).command;
+
+  const first = store.dispatch("studio-a", 1)[0];
+  const firstToken = first.dispatch_token;
+  assert.equal(first.id, leased.id);
+  await new Promise((resolve) => setTimeout(resolve, 40));
+
+  const again = store.dispatch("studio-b", 10);
+  assert.deepEqual(again.map((cmd) => cmd.id), [leased.id]);
+  assert.equal(again[0].attempts, 2);
+  assert.notEqual(again[0].dispatch_token, firstToken);
+  assert.equal(store.get(doomed.id).status, "expired");
+  assert.equal(store.summary().counters.requeued_total, 1);
+});
+
+test("pruning drops the oldest completed commands first", () => {
+  const store = makeStore({ maxRetention: 3 });
+  const enqueue = (name) =>
+    store.enqueueWithMeta({
+      route: "/bridge/test-spawn",
+      category: "test",
+      action: "test-spawn",
+      payload: { name },
+      idempotencyKey: name,
+    }).command;
+
+  const a = enqueue("a");
+  const b = enqueue("b");
+  const pulled = store.dispatch("studio-a", 2);
+  store.cancel(b.id);
+  store.result({
+    command_id: a.id,
+    dispatch_token: pulled[0].dispatch_token,
+    ok: true,
+    status: "ok",
+  });
+  const c = enqueue("c");
+  const d = enqueue("d");
+
+  assert.equal(store.get(b.id), null);
+  assert.ok(store.get(a.id));
+  // Pruning b released its idempotency key; this enqueue prunes a.
+  assert.notEqual(enqueue("b").id, b.id);
+  assert.equal(store.get(a.id), null);
+  assert.ok(store.get(c.id));
+  assert.ok(store.get(d.id));
+});
+
+test("journal replay restores mutations and tolerates a torn tail", () => {
+  const tempDir = fs.mkdtempSync(
+    path.join(os.tmpdir(), "novablox-store-test-"),
+  );
+  const snapshotPath = path.join(tempDir, "queue-snapshot.json");
+
+  try {
+    const writer = makeStore({ snapshotPath, maxRetention: 2 });
+    const ids = [0, 1, 2].map(
+      (index) =>
+        writer.enqueueWithMeta({
+          route: "/bridge/test-spawn",
+          category: "test",
+          action: "test-spawn",
+          payload: { index },
+          idempotencyKey: `journal-${index}`,
+        }).command.id,
+    );
+    const first = writer.dispatch("studio-journal", 1)[0];
+    writer.result({
+      command_id: first.id,
+      dispatch_token: first.dispatch_token,
+      ok: true,
+      status: "ok",
+    });
+    writer.enqueueWithMeta({
+      route: "/bridge/test-spawn",
+      category: "test",
+      action: "test-spawn",
+      payload: { index: 3 },
+    });
+    writer.close();
+
+    assert.equal(fs.existsSync(snapshotPath), false);
+    const journalPath = `${snapshotPath}.journal.1`;
+    fs.appendFileSync(journalPath, '{"put":[{"id":"torn"');
+
+    const reader = makeStore({ snapshotPath, maxRetention: 2 });
+    assert.equal(reader.get(ids[0]), null);
+    assert.equal(reader.get("torn"), null);
+    assert.equal(reader.summary().persistence, "journal");
+    assert.equal(reader.summary().counters.succeeded_total, 1);
+    assert.deepEqual(
+      reader.dispatch("studio-journal", 10).map((cmd) => cmd.payload.index),
+      [1, 2, 3],
+    );
+    assert.equal(
+      reader.enqueueWithMeta({
+        route: "/bridge/test-spawn",
+        category: "test",
+        action: "test-spawn",
+        payload: {},
+        idempotencyKey: "journal-1",
+      }).deduped,
+      true,
+    );
+    assert.ok(fs.existsSync(snapshotPath));
+    assert.equal(fs.existsSync(journalPath), false);
+    assert.ok(fs.existsSync(`${snapshotPath}.journal.2`));
+  } finally {
+    fs.rmSync(tempDir, { recursive: true, force: true });
+  }
+});
+
+test("journal compacts into the snapshot in the background", async () => {
+  const tempDir = fs.mkdtempSync(
+    path.join(os.tmpdir(), "novablox-store-test-"),
+  );
+  const snapshotPath = path.join(tempDir, "queue-snapshot.json");
+
+  try {
+    const writer = makeStore({ snapshotPath, compactBytes: 1024 });
+    for (let index = 0; index < 20; index += 1) {
+      writer.enqueueWithMeta({
+        route: "/bridge/test-spawn",
+        category: "test",
+        action: "test-spawn",
+        payload: { index },
+      });
+    }
+    for (let i = 0; i < 50 && writer.stats.compactions_total === 0; i += 1) {
+      await new Promise((resolve) => setTimeout(resolve, 10));
+    }
+    assert.ok(writer.stats.compactions_total >= 1);
+    assert.equal(fs.existsSync(`${snapshotPath}.journal.1`), false);
+
+    writer.dispatch("studio-compact", 5);
+    writer.close();
+
+    const reader = makeStore({ snapshotPath });
+    const summary = reader.summary();
+    assert.equal(summary.total_commands, 20);
+    assert.equal(summary.by_status.dispatched, 5);
+    assert.equal(summary.pending_count, 15);
+  } finally {
+    fs.rmSync(tempDir, { recursive: true, force: true });
+  }
+});
+
+test("compaction closes the old journal only after an in-flight fsync", async () => {
+  const tempDir = fs.mkdtempSync(
+    path.join(os.tmpdir(), "novablox-store-test-"),
+  );
+  const snapshotPath = path.join(tempDir, "queue-snapshot.json");
+
+  try {
+    const store = makeStore({ snapshotPath, compactBytes: 1024 * 1024 });
+    store.enqueueWithMeta({
+      route: "/bridge/test-spawn",
+      category: "test",
+      action: "test-spawn",
+      payload: {},
+    });
+    const journal = store._journal;
+    const previous = journal.fd;
+    store._syncJournal();
+    assert.equal(journal.syncing, true);
+
+    journal.compacting = true;
+    store._compact();
+    assert.notEqual(journal.fd, previous);
+    assert.equal(journal.afterSync.length, 1);
+
+    for (let i = 0; i < 50 && journal.compacting; i += 1) {
+      await new Promise((resolve) => setTimeout(resolve, 10));
+    }
+    assert.equal(journal.syncing, false);
+    assert.equal(journal.afterSync.length, 0);
+    assert.equal(store.stats.compactions_total, 1);
+    store.close();
+  } finally {
+    fs.rmSync(tempDir, { recursive: true, force: true });
+  }
+});
+
+test("long-poll waiters wake on enqueue and time out empty", async () => {
+  const store = makeStore();
+  const pulls = [];
+  store.waitForDispatch("studio-a", 5, 5000, (commands) => {
+    pulls.push(["a", commands.length, commands[0] && commands[0].status]);
+  });
+  const cancel = store.waitForDispatch("studio-b", 5, 5000, () => {
+    pulls.push(["b"]);
+  });
+  cancel();
+  assert.equal(store.summary().long_poll_waiters, 1);
+
+  const queued = store.enqueueWithMeta({
+    route: "/bridge/test-spawn",
+    category: "test",
+    action: "test-spawn",
+    payload: {},
+  });
+  assert.equal(queued.command.status, "queued");
+  assert.deepEqual(pulls, []);
+  await Promise.resolve();
+  assert.deepEqual(pulls, [["a", 1, "dispatched"]]);
+
+  const started = Date.now();
+  const empty = await new Promise((resolve) => {
+    store.waitForDispatch("studio-c", 5, 30, resolve);
+  });
+  assert.deepEqual(empty, []);
+  assert.ok(Date.now() - started >= 25);
+  assert.equal(store.summary().long_poll_waiters, 0);
+});
+
+test("long-poll waiters wake when a lease expires mid-wait", async () => {
+  const store = makeStore({ leaseMs: 100 });
+  store.enqueue({
+    route: "/bridge/test-spawn",
+    category: "test",
+    action: "test-spawn",
+    payload: {},
+  });
+  assert.equal(store.dispatch("studio-a", 1).length, 1);
+
+  const started = Date.now();
+  const commands = await new Promise((resolve) => {
+    store.waitForDispatch("studio-b", 1, 2000, resolve);
+  });
+  assert.equal(commands.length, 1);
+  assert.equal(commands[0].delivered_to, "studio-b");
+  assert.equal(commands[0].attempts, 2);
+  assert.ok(Date.now() - started < 1000);
+  assert.equal(store.summary().long_poll_waiters, 0);
+});
+
+test("getMany returns commands in request order with projection", () => {
+  const store = makeStore();
+  const ids = [0, 1].map(
+    (index) =>
+      store.enqueueWithMeta({
+        route: "/bridge/test-spawn",
+        category: "test",
+        action: "test-spawn",
+        payload: { index },
+      }).command.id,
+  );
+
+  const full = store.getMany([ids[1], "gone", ids[0]]);
+  assert.deepEqual(full.commands.map((cmd) => cmd.payload.index), [1, 0]);
+  assert.deepEqual(full.missing, ["gone"]);
+
+  const slim = store.getMany(ids, "status,attempts,error");
+  assert.deepEqual(slim.commands[0], {
+    id: ids[0],
+    status: "queued",
+    attempts: 0,
+    error: null,
+  });
+});
@@ -0,0 +1,150 @@
+"use strict";
+
+const test = require("node:test");
+const assert = require("node:assert/strict");
+const crypto = require("crypto");
+const fs = require("fs");
+const os = require("os");
+const path = require("path");
+const { Readable } = require("stream");
+
+const {
+  HashingDiskStorage,
+  ImportStore,
+  normalizeSha256,
+  safeExtension,
+} = require("../server/import_store");
+
+function makeTempDir() {
+  return fs.mkdtempSync(path.join(os.tmpdir(), "novablox-imports-"));
+}
+
+function sha256(buffer) {
+  return crypto.createHash("sha256").update(buffer).digest("hex");
+}
+
+function storeUpload(storage, buffer, originalname) {
+  const stream = Readable.from([
+    buffer.subarray(0, 5),
+    buffer.subarray(5),
+  ]);
+  return new Promise((resolve, reject) => {
+    storage._handleFile({}, { stream, originalname }, (err, info) => {
+      if (err) {
+        reject(err);
+        return;
+      }
+      resolve(Object.assign({ originalname }, info));
+    });
+  });
+}
+
+test("normalizes digests and extensions", () => {
+  const digest = sha256(Buffer.from("x"));
+  assert.equal(normalizeSha256(digest.toUpperCase()), digest);
+  assert.equal(normalizeSha256("abc"), null);
+  assert.equal(normalizeSha256("../" + digest.slice(3)), null);
+  assert.equal(safeExtension("Tower.FBX"), ".fbx");
+  assert.equal(safeExtension("../../etc/passwd"), "");
+});
+
+test("hashing storage writes the upload and reports its sha256", async () => {
+  const directory = makeTempDir();
+  const storage = new HashingDiskStorage({ directory });
+  const content = Buffer.from("mesh data for a hashing test");
+
+  const file = await storeUpload(storage, content, "Tower.fbx");
+
+  assert.equal(file.size, content.length);
+  assert.equal(file.sha256, sha256(content));
+  assert.equal(path.dirname(file.path), directory);
+  assert.deepEqual(fs.readFileSync(file.path), content);
+});
+
+test("import store keeps one copy per content hash", async () => {
+  const directory = makeTempDir();
+  const storage = new HashingDiskStorage({ directory });
+  const store = new ImportStore({ directory });
+  const content = Buffer.from("identical export");
+  const digest = sha256(content);
+
+  const first = await store.adopt(
+    await storeUpload(storage, content, "a.fbx"),
+  );
+  const second = await store.adopt(
+    await storeUpload(storage, content, "b.FBX"),
+    digest,
+  );
+
+  assert.equal(first.ok, true);
+  assert.equal(first.deduped, false);
+  assert.equal(first.path, path.join(directory, `${digest}.fbx`));
+  assert.equal(second.deduped, true);
+  assert.equal(second.path, first.path);
+  assert.deepEqual(fs.readdirSync(directory), [`${digest}.fbx`]);
+
+  assert.deepEqual(await store.find(digest, "other.fbx"), {
+    path: first.path,
+    sha256: digest,
+    bytes: content.length,
+  });
+  assert.equal(await store.find(digest, "other.obj"), null);
+  assert.equal(await store.find("not-a-digest", "x.fbx"), null);
+});
+
+test("import store rejects an upload that does not match its digest", async () => {
+  const directory = makeTempDir();
+  const storage = new HashingDiskStorage({ directory });
+  const store = new ImportStore({ directory });
+
+  const file = await storeUpload(storage, Buffer.from("actual"), "m.obj");
+  const result = await store.adopt(file, sha256(Buffer.from("expected")));
+
+  assert.equal(result.ok, false);
+  assert.equal(result.sha256, sha256(Buffer.from("actual")));
+  assert.deepEqual(fs.readdirSync(directory), []);
+});
+
+test("import store hashes files the storage engine did not", async () => {
+  const directory = makeTempDir();
+  const store = new ImportStore({ directory });
+  const content = Buffer.from("written by plain disk storage");
+  const tempPath = path.join(directory, "upload-temp");
+  fs.writeFileSync(tempPath, content);
+
+  const result = await store.adopt({
+    path: tempPath,
+    originalname: "m.obj",
+    size: content.length,
+  });
+
+  assert.equal(result.sha256, sha256(content));
+  assert.deepEqual(fs.readdirSync(directory), [`${sha256(content)}.obj`]);
+});
+
+test("import store prunes least recently used files past maxBytes", async () => {
+  const directory = makeTempDir();
+  const storage = new HashingDiskStorage({ directory });
+  const store = new ImportStore({ directory, maxBytes: 30 });
+  const contents = ["first export.", "second export", "third export."].map(
+    (text) => Buffer.from(text),
+  );
+
+  const first = await store.adopt(
+    await storeUpload(storage, contents[0], "a.fbx"),
+  );
+  const second = await store.adopt(
+    await storeUpload(storage, contents[1], "b.fbx"),
+  );
+  const past = new Date(Date.now() - 60_000);
+  fs.utimesSync(second.path, past, past);
+  fs.utimesSync(first.path, new Date(past.getTime() - 60_000), past);
+  await store.find(first.sha256, "a.fbx");
+  const third = await store.adopt(
+    await storeUpload(storage, contents[2], "c.fbx"),
+  );
+
+  assert.equal(fs.existsSync(second.path), false);
+  assert.equal(fs.existsSync(first.path), true);
+  assert.equal(fs.existsSync(third.path), true);
+});
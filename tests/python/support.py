@@ -0,0 +1,9 @@
+"""Shared setup for the Python SDK tests: puts the SDK and mock bridge on sys.path."""
+
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[2]
+for _path in (ROOT / "python-sdk", ROOT / "examples" / "mock", ROOT / "mcp-server"):
+    if str(_path) not in sys.path:
+        sys.path.insert(0, str(_path))
@@ -0,0 +1,35 @@
+import asyncio
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import AsyncNovaBlox
+
+
+class AsyncNovaBloxTest(unittest.TestCase):
+    def test_streaming_helpers_are_async_iterators(self) -> None:
+        async def main(port):
+            client = AsyncNovaBlox(port=port)
+            try:
+                for index in range(7):
+                    await client.spawn_part(name=f"Part{index}")
+                commands = [command async for command in client.iter_recent_commands(limit=50)]
+                stream = client.iter_json("/commands/recent", ("commands",), {"limit": 50}, batch_size=2)
+                first = [command async for command in stream]
+                partial = client.iter_recent_commands(limit=50)
+                head = await partial.__anext__()
+                await partial.aclose()
+                return commands, first, head
+            finally:
+                await client.close()
+
+        with MockBridge() as bridge:
+            commands, first, head = asyncio.run(main(bridge.port))
+        self.assertEqual(len(commands), 7)
+        self.assertEqual([c["id"] for c in first], [c["id"] for c in commands])
+        self.assertEqual(head["id"], commands[0]["id"])
+
+
+if __name__ == "__main__":
+    unittest.main()
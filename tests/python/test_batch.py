@@ -0,0 +1,59 @@
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import CommandBatch, NovaBlox, NovaBloxError
+
+
+class FailingClient:
+    """Accepts the first `ok_calls` batches and fails the rest."""
+
+    def __init__(self, ok_calls: int) -> None:
+        self.ok_calls = ok_calls
+        self.calls = []
+
+    def queue_commands(self, commands):
+        self.calls.append(commands)
+        if len(self.calls) > self.ok_calls:
+            raise NovaBloxError("HTTP 503: bridge unavailable")
+        return {"command_ids": [f"id-{len(self.calls)}-{i}" for i in range(len(commands))], "deduped_count": 0}
+
+
+class CommandBatchTest(unittest.TestCase):
+    def test_flushes_helpers_through_the_bridge(self) -> None:
+        with MockBridge() as bridge:
+            client = NovaBlox(port=bridge.port)
+            with CommandBatch(client, max_size=3, max_delay=None) as batch:
+                futures = [batch.spawn_part(name=f"Part{i}") for i in range(7)]
+            ids = [future.result(timeout=5) for future in futures]
+            client.close()
+        self.assertEqual(len(set(ids)), 7)
+        self.assertEqual(batch.requests_sent, 3)
+
+    def test_failed_chunk_fails_every_remaining_future(self) -> None:
+        client = FailingClient(ok_calls=1)
+        batch = CommandBatch(client, max_size=10, max_delay=None)
+        futures = [batch.add(route="/bridge/scene/spawn-object", action="spawn-object") for _ in range(6)]
+        # More pending than max_size, as when adds race a running flush.
+        batch.max_size = 2
+        with self.assertRaises(NovaBloxError):
+            batch.flush()
+        self.assertEqual(len(client.calls), 2)
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(futures[0].result(), "id-1-0")
+        for future in futures[2:]:
+            self.assertIsInstance(future.exception(), NovaBloxError)
+        self.assertIs(batch.last_error, futures[5].exception())
+
+    def test_timer_flush_failure_is_recorded(self) -> None:
+        client = FailingClient(ok_calls=0)
+        batch = CommandBatch(client, max_size=10, max_delay=0.01)
+        future = batch.add(route="/bridge/scene/spawn-object", action="spawn-object")
+        self.assertIsInstance(future.exception(timeout=5), NovaBloxError)
+        self.assertIsInstance(batch.last_error, NovaBloxError)
+        batch.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
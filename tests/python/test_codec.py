@@ -0,0 +1,49 @@
+import json
+import unittest
+
+import support  # noqa: F401
+
+from novablox import default_codec, iter_json_array
+
+DOCUMENT = {
+    "status": "ok",
+    "meta": {"skip": [1, {"deep": "]}"}], "note": "quote \" and \\\\ backslash"},
+    "introspection": {
+        "scene": {
+            "objects": [
+                {"path": "Workspace.Part", "position": [1.5, -2e3, 0], "anchored": True},
+                {"path": "Workspace.Ünïcode ☃", "tags": [], "extra": None},
+                "plain string",
+                42,
+                [],
+            ]
+        }
+    },
+}
+PATH = ("introspection", "scene", "objects")
+
+
+def chunked(data: bytes, size: int):
+    return [data[start : start + size] for start in range(0, len(data), size)]
+
+
+class IterJsonArrayTest(unittest.TestCase):
+    def test_matches_json_loads_for_every_chunk_size(self) -> None:
+        data = json.dumps(DOCUMENT, ensure_ascii=False).encode("utf-8")
+        expected = DOCUMENT["introspection"]["scene"]["objects"]
+        for size in range(1, 40):
+            with self.subTest(size=size):
+                self.assertEqual(list(iter_json_array(chunked(data, size), PATH)), expected)
+
+    def test_missing_or_null_arrays_yield_nothing(self) -> None:
+        self.assertEqual(list(iter_json_array([b'{"introspection": null}'], PATH)), [])
+        self.assertEqual(list(iter_json_array([b'{"other": [1]}'], ("commands",))), [])
+        self.assertEqual(list(iter_json_array([b"[1, 2, 3]"])), [1, 2, 3])
+
+    def test_default_codec_round_trips(self) -> None:
+        codec = default_codec()
+        self.assertEqual(codec.loads(codec.dumps(DOCUMENT)), DOCUMENT)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import asyncio
+import time
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge, _chunk
+from novablox import NovaBlox, NovaBloxError
+
+
+class MissingStreamBridge(MockBridge):
+    """A bridge built without /bridge/stream."""
+
+    async def _stream(self, writer, target, headers):
+        self._write_response(writer, 404, {}, {"status": "error", "error": "not found"}, False)
+        await writer.drain()
+
+
+class DroppingStreamBridge(MockBridge):
+    """Drops the first stream connection, finishing queued commands while it is down."""
+
+    streams = 0
+
+    async def _stream(self, writer, target, headers):
+        self.streams += 1
+        if self.streams > 1:
+            return await super()._stream(writer, target, headers)
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+        writer.write(_chunk(b"event: connected\ndata: {}\n\n"))
+        await writer.drain()
+        await asyncio.sleep(0.1)
+        for command in self.queue.dispatch("test-executor", 100):
+            self.queue.result({"command_id": command["id"], "dispatch_token": command["dispatch_token"], "ok": True})
+
+
+class WaitForTest(unittest.TestCase):
+    def test_returns_once_commands_finish(self) -> None:
+        with MockBridge(auto_complete=True) as bridge:
+            client = NovaBlox(port=bridge.port)
+            ids = [client.spawn_part(name=f"P{index}")["command_id"] for index in range(3)]
+            outcomes = client.wait_for(ids, timeout=10)
+            client.close()
+        self.assertEqual({outcomes[cid]["status"] for cid in ids}, {"succeeded"})
+
+    def test_raises_at_once_when_the_stream_is_refused(self) -> None:
+        with MissingStreamBridge() as bridge:
+            client = NovaBlox(port=bridge.port)
+            command_id = client.spawn_part(name="P")["command_id"]
+            started = time.monotonic()
+            with self.assertRaises(NovaBloxError) as caught:
+                client.wait_for([command_id])
+            client.close()
+        self.assertEqual(caught.exception.status, 404)
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_reconnects_and_reconciles_missed_completions(self) -> None:
+        with DroppingStreamBridge() as bridge:
+            client = NovaBlox(port=bridge.port)
+            command_id = client.spawn_part(name="P")["command_id"]
+            outcomes = client.wait_for([command_id], timeout=10)
+            client.close()
+        self.assertEqual(outcomes[command_id]["status"], "succeeded")
+        self.assertEqual(bridge.streams, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import asyncio
+import json
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import AsyncNovaBlox
+
+try:
+    import novablox_mcp
+except (ImportError, SystemExit):  # mcp is an optional dependency
+    novablox_mcp = None
+
+CATALOG = [
+    {"route": "/bridge/scene/spawn-object", "category": "scene", "action": "spawn-object", "risk": "safe"},
+    {"route": "/bridge/scene/set-property", "category": "scene", "action": "set-property", "risk": "caution"},
+    {"route": "/bridge/scene/delete-object", "category": "scene", "action": "delete-object", "risk": "dangerous"},
+]
+
+
+def catalog_index():
+    by_route = {entry["route"]: entry for entry in CATALOG}
+    by_action = {entry["action"]: entry for entry in CATALOG}
+    return by_route, by_action
+
+
+@unittest.skipIf(novablox_mcp is None, "mcp is not installed")
+class ValidateOperationsTest(unittest.TestCase):
+    def validate(self, operations, allow_dangerous=False):
+        return novablox_mcp._validate_operations(operations, *catalog_index(), allow_dangerous)
+
+    def test_resolves_actions_and_routes(self) -> None:
+        resolved, errors = self.validate(
+            [
+                {"action": "Spawn-Object", "payload": {"name": "A"}},
+                {"route": "/scene/set-property", "payload": {"property": "Anchored", "value": True}},
+                {"route": "/bridge/scene/spawn-object"},
+            ]
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual([item["action"] for item in resolved], ["spawn-object", "set-property", "spawn-object"])
+        self.assertEqual(resolved[2]["payload"], {})
+
+    def test_reports_every_invalid_operation(self) -> None:
+        resolved, errors = self.validate(
+            [
+                "spawn-object",
+                {"action": "teleport"},
+                {"action": "spawn-object", "payload": [1, 2]},
+                {"action": "delete-object", "payload": {"target_name": "Base"}},
+            ]
+        )
+        self.assertEqual(resolved, [])
+        self.assertEqual([error["index"] for error in errors], [0, 1, 2, 3])
+        self.assertIn("allow_dangerous", errors[3]["error"])
+
+    def test_dangerous_actions_need_opt_in(self) -> None:
+        resolved, errors = self.validate([{"action": "delete-object"}], allow_dangerous=True)
+        self.assertEqual(errors, [])
+        self.assertEqual(resolved[0]["risk"], "dangerous")
+
+
+@unittest.skipIf(novablox_mcp is None, "mcp is not installed")
+class RobloxBatchToolTest(unittest.TestCase):
+    def run_tool(self, bridge, operations_json, **options):
+        async def main():
+            previous = novablox_mcp.client, novablox_mcp._catalog
+            novablox_mcp.client = AsyncNovaBlox(port=bridge.port)
+            novablox_mcp._catalog = catalog_index()
+            try:
+                return await novablox_mcp.roblox_batch(operations_json, **options)
+            finally:
+                await novablox_mcp.client.close()
+                novablox_mcp.client, novablox_mcp._catalog = previous
+
+        return asyncio.run(main())
+
+    def test_queues_in_order_and_waits(self) -> None:
+        operations = [{"action": "spawn-object", "payload": {"name": f"P{i}"}} for i in range(3)]
+        with MockBridge(auto_complete=True) as bridge:
+            response = self.run_tool(bridge, json.dumps(operations), idempotency_prefix="run-1", timeout_s=10)
+            again = self.run_tool(bridge, json.dumps(operations), idempotency_prefix="run-1", wait=False)
+        self.assertEqual(response["status"], "ok")
+        self.assertEqual(response["by_status"], {"succeeded": 3})
+        self.assertEqual([item["index"] for item in response["items"]], [0, 1, 2])
+        self.assertEqual(again["deduped_count"], 3)
+
+    def test_invalid_batch_queues_nothing(self) -> None:
+        with MockBridge() as bridge:
+            invalid = self.run_tool(bridge, json.dumps([{"action": "spawn-object"}, {"action": "teleport"}]))
+            malformed = self.run_tool(bridge, "{not json")
+            empty = self.run_tool(bridge, "[]")
+            queued = len(bridge.queue.commands)
+        self.assertEqual(invalid["status"], "error")
+        self.assertEqual([error["index"] for error in invalid["errors"]], [1])
+        self.assertIn("valid JSON", malformed["error"])
+        self.assertIn("non-empty", empty["error"])
+        self.assertEqual(queued, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+
+import support  # noqa: F401
+
+from novablox_planner import command_footprint, plan_dependencies
+
+
+def command(action, category="scene", **payload):
+    return {"action": action, "category": category, "payload": payload}
+
+
+class PlanDependenciesTest(unittest.TestCase):
+    def test_independent_creates_run_in_parallel(self) -> None:
+        commands = [
+            command("spawn-object", name="A"),
+            command("spawn-object", name="B"),
+            command("spawn-object", name="C", parent_path="Workspace/Folder"),
+        ]
+        footprint = command_footprint(commands[2])
+        self.assertEqual((footprint.reads, footprint.writes), ({"Workspace/Folder"}, {"Workspace/Folder/C"}))
+        self.assertEqual(plan_dependencies(commands), [[], [], []])
+
+    def test_edits_wait_for_the_instance_they_touch(self) -> None:
+        commands = [
+            command("create-folder", name="Tower"),
+            command("spawn-object", name="Base", parent_path="Workspace/Tower"),
+            command("set-property", target_path="Workspace/Tower/Base", property="Anchored", value=True),
+            command("delete-object", target_path="Workspace/Tower"),
+            command("set-property", target_path="Workspace/Other", property="Anchored", value=True),
+        ]
+        self.assertEqual(plan_dependencies(commands), [[], [0], [0, 1], [0, 1, 2], []])
+
+    def test_name_lookups_and_barriers(self) -> None:
+        commands = [
+            command("spawn-object", name="Door"),
+            command("set-color", target_name="Door", color=[1, 0, 0]),
+            command("run-command", category="script", code="print(1)"),
+            command("spawn-object", name="Window"),
+        ]
+        self.assertTrue(command_footprint(commands[2]).barrier)
+        self.assertEqual(plan_dependencies(commands), [[], [0], [0, 1], [2]])
+
+
+if __name__ == "__main__":
+    unittest.main()
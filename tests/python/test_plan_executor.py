@@ -0,0 +1,57 @@
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import NovaBlox, NovaBloxError
+
+
+class MissingStreamBridge(MockBridge):
+    async def _stream(self, writer, target, headers):
+        self._write_response(writer, 404, {}, {"status": "error", "error": "not found"}, False)
+        await writer.drain()
+
+
+def step(action, **payload):
+    return {"route": f"/bridge/scene/{action}", "category": "scene", "action": action, "payload": payload}
+
+
+PLAN = {
+    "id": "plan-executor-test",
+    "commands": [
+        step("create-folder", name="Tower"),
+        step("spawn-object", name="Base", parent_path="Workspace/Tower"),
+        step("spawn-object", name="Roof", parent_path="Workspace/Tower"),
+        step("set-property", target_path="Workspace/Tower/Base", property="Anchored", value=True),
+        step("spawn-object", name="Lamp"),
+    ],
+}
+
+
+class PlanExecutorTest(unittest.TestCase):
+    def test_runs_dependents_after_their_inputs(self) -> None:
+        with MockBridge(auto_complete=True, execution_delay=0.02) as bridge:
+            client = NovaBlox(port=bridge.port)
+            report = client.run_plan(PLAN, timeout=10)
+            client.close()
+        self.assertEqual(report["status"], "succeeded")
+        self.assertEqual(report["submissions"], 3)
+        commands = {item["step"]: item for item in report["commands"]}
+        self.assertEqual([commands[index]["depends_on"] for index in range(1, 6)], [[], [1], [1], [1, 2], []])
+        for item in commands.values():
+            for dep in item["depends_on"]:
+                self.assertGreaterEqual(item["submitted_ms"], commands[dep]["completed_ms"])
+        self.assertEqual(report["critical_path"]["steps"], [1, 2, 4])
+        self.assertGreater(report["critical_path"]["ms"], 0)
+
+    def test_raises_when_the_stream_is_refused(self) -> None:
+        with MissingStreamBridge() as bridge:
+            client = NovaBlox(port=bridge.port)
+            with self.assertRaises(NovaBloxError) as caught:
+                client.run_plan(PLAN)
+            client.close()
+        self.assertEqual(caught.exception.status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import shutil
+import subprocess
+import unittest
+
+from support import ROOT
+
+from novablox_planner import LocalPlanner
+
+CASES = [
+    ("build a starter scene", None),
+    ("obstacle course with 12 platforms", None),
+    ("make an obby with 40 jumps and lava", None),
+    ("generate terrain with hills", None),
+    ("terrain please", "terrain_generator"),
+    ("make it a spooky night", None),
+    ("sunset lighting mood", "lighting_mood_presets"),
+    ("  Something   unrelated  ", None),
+    ("", "starter_scene"),
+]
+
+NODE_SCRIPT = """
+const engine = require(process.argv[1]);
+const cases = JSON.parse(process.argv[2]);
+const plans = cases.map(([prompt, template]) => engine.buildPlan({ prompt, template: template || "" }));
+process.stdout.write(JSON.stringify({ catalog: engine.listCommandCatalog(), plans }));
+"""
+
+
+def strip_volatile(plan):
+    return {key: value for key, value in plan.items() if key not in ("id", "created_at")}
+
+
+@unittest.skipUnless(shutil.which("node"), "node is not installed")
+class LocalPlannerParityTest(unittest.TestCase):
+    def test_matches_assistant_engine_build_plan(self) -> None:
+        output = subprocess.run(
+            ["node", "-e", NODE_SCRIPT, str(ROOT / "server" / "assistant_engine.js"), json.dumps(CASES)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        expected = json.loads(output)
+        planner = LocalPlanner(expected["catalog"])
+        for (prompt, template), node_plan in zip(CASES, expected["plans"]):
+            with self.subTest(prompt=prompt, template=template):
+                local = planner.plan(prompt, template)
+                self.assertIsNotNone(local)
+                self.assertEqual(strip_volatile(local["plan"]), strip_volatile(node_plan))
+
+
+class LocalPlannerTest(unittest.TestCase):
+    def test_missing_route_defers_to_the_bridge(self) -> None:
+        self.assertIsNone(LocalPlanner([]).plan("build a starter scene"))
+
+    def test_caches_built_plans_per_prompt(self) -> None:
+        planner = LocalPlanner([], cache_size=2)
+        planner.plan("build a starter scene")
+        planner.plan("build a starter scene")
+        self.assertEqual((planner.hits, planner.misses), (1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
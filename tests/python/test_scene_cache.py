@@ -0,0 +1,85 @@
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import NovaBlox
+from novablox_scene import SceneCache
+
+
+def record(action, payload, result, status="succeeded"):
+    return {"action": action, "status": status, "payload": payload, "result": result}
+
+
+class SceneCacheApplyTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.cache = SceneCache(client=None)
+        self.cache.apply_command(record("create-folder", {"name": "Tower"}, {"folder": "Workspace.Tower"}))
+        self.cache.apply_command(
+            record(
+                "spawn-object",
+                {"class_name": "Part", "name": "Base", "position": [0, 1, 0], "size": [4, 1, 4], "anchored": True},
+                {"path": "Workspace.Tower.Base", "name": "Base"},
+            )
+        )
+
+    def test_spawn_indexes_the_new_part(self) -> None:
+        base = self.cache.get("Workspace.Tower.Base")
+        self.assertEqual(base["position"], [0.0, 1.0, 0.0])
+        self.assertTrue(base["anchored"])
+        self.assertEqual([obj["name"] for obj in self.cache.children("Workspace.Tower")], ["Base"])
+        self.assertEqual(self.cache.index.nearest([0, 1, 0])[0][1]["path"], "Workspace.Tower.Base")
+
+    def test_property_updates_and_reindexing(self) -> None:
+        self.assertTrue(
+            self.cache.apply_command(
+                record("set-transform", {"position": [100, 1, 0]}, {"target": "Workspace.Tower.Base"})
+            )
+        )
+        self.assertTrue(
+            self.cache.apply_command(
+                record("set-material", {}, {"target": "Workspace.Tower.Base", "material": "Enum.Material.Wood"})
+            )
+        )
+        base = self.cache.get("Workspace.Tower.Base")
+        self.assertEqual(base["position"], [100.0, 1.0, 0.0])
+        self.assertEqual(base["material"], "Wood")
+        self.assertEqual(self.cache.index.region([90, 0, -5], [110, 5, 5])[0]["path"], "Workspace.Tower.Base")
+
+    def test_rename_moves_the_subtree_and_delete_removes_it(self) -> None:
+        self.assertTrue(
+            self.cache.apply_command(
+                record("rename-object", {"target_path": "Workspace.Tower", "name": "Keep"}, {"target": "Workspace.Keep"})
+            )
+        )
+        self.assertNotIn("Workspace.Tower.Base", self.cache)
+        self.assertEqual(self.cache.get("Workspace.Keep.Base")["parent_path"], "Workspace.Keep")
+
+        self.assertTrue(self.cache.apply_command(record("delete-object", {}, {"deleted": "Workspace.Keep"})))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_failed_and_unmodelled_commands(self) -> None:
+        failed = record("delete-object", {}, {"deleted": "Workspace.Tower"}, status="failed")
+        self.assertFalse(self.cache.apply_command(failed))
+        self.assertIn("Workspace.Tower", self.cache)
+        self.assertFalse(self.cache.stale)
+
+        self.assertFalse(self.cache.apply_command(record("duplicate-object", {}, {})))
+        self.assertTrue(self.cache.stale)
+
+
+class SceneCacheRefreshTest(unittest.TestCase):
+    def test_unchanged_snapshot_is_a_304(self) -> None:
+        with MockBridge(auto_complete=True, scene_objects=50) as bridge:
+            client = NovaBlox(port=bridge.port)
+            cache = SceneCache(client)
+            delta = cache.rescan(timeout=10)
+            self.assertEqual(len(delta.added), len(cache))
+            self.assertGreater(len(cache), 0)
+            self.assertIsNone(cache.refresh())
+            client.close()
+        self.assertEqual(cache.stats["not_modified"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
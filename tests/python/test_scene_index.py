@@ -0,0 +1,91 @@
+import math
+import random
+import unittest
+
+import support  # noqa: F401
+
+from novablox_scene import SceneIndex
+
+
+def box_distance(point, obj):
+    total = 0.0
+    for axis in range(3):
+        half = abs(obj["size"][axis]) / 2.0
+        low = obj["position"][axis] - half
+        high = obj["position"][axis] + half
+        if point[axis] < low:
+            total += (low - point[axis]) ** 2
+        elif point[axis] > high:
+            total += (point[axis] - high) ** 2
+    return math.sqrt(total)
+
+
+def random_scene(rng, count):
+    objects = []
+    for index in range(count):
+        # A few baseplate-sized parts exercise the oversized list.
+        size = [rng.uniform(500, 2000), 1.0, rng.uniform(500, 2000)] if index % 97 == 0 else [
+            rng.uniform(0.5, 40) for _ in range(3)
+        ]
+        objects.append(
+            {
+                "name": f"Part{index}",
+                "class_name": rng.choice(["Part", "MeshPart", "WedgePart"]),
+                "path": f"Workspace.Part{index}",
+                "position": [rng.uniform(-1000, 1000), rng.uniform(-50, 300), rng.uniform(-1000, 1000)],
+                "size": size,
+            }
+        )
+    return objects
+
+
+class SceneIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.rng = random.Random(1234)
+        self.objects = random_scene(self.rng, 600)
+        self.index = SceneIndex(self.objects, cell_size=16.0)
+
+    def brute_nearest(self, point, k, class_name=None, max_distance=None):
+        distances = sorted(
+            box_distance(point, obj)
+            for obj in self.index.objects.values()
+            if (class_name is None or obj["class_name"] == class_name)
+            and (max_distance is None or box_distance(point, obj) <= max_distance)
+        )
+        return distances[:k]
+
+    def test_nearest_matches_brute_force(self) -> None:
+        for _ in range(60):
+            point = [self.rng.uniform(-1500, 1500), self.rng.uniform(-100, 400), self.rng.uniform(-1500, 1500)]
+            k = self.rng.choice([1, 3, 10])
+            class_name = self.rng.choice([None, "MeshPart"])
+            max_distance = self.rng.choice([None, 50.0, 400.0])
+            found = self.index.nearest(point, k, class_name=class_name, max_distance=max_distance)
+            for distance, obj in found:
+                self.assertAlmostEqual(distance, box_distance(point, obj))
+            expected = self.brute_nearest(point, k, class_name, max_distance)
+            self.assertEqual([round(d, 6) for d, _ in found], [round(d, 6) for d in expected])
+
+    def test_nearest_after_removals(self) -> None:
+        for obj in self.objects[::3]:
+            self.index.remove(obj["path"])
+        point = [10.0, 20.0, 30.0]
+        found = self.index.nearest(point, 5)
+        self.assertEqual([round(d, 6) for d, _ in found], [round(d, 6) for d in self.brute_nearest(point, 5)])
+
+    def test_region_matches_brute_force(self) -> None:
+        low, high = (-200.0, -50.0, -300.0), (150.0, 100.0, 50.0)
+        expected = sorted(
+            obj["path"]
+            for obj in self.objects
+            if all(
+                obj["position"][i] - abs(obj["size"][i]) / 2 <= high[i]
+                and low[i] <= obj["position"][i] + abs(obj["size"][i]) / 2
+                for i in range(3)
+            )
+        )
+        self.assertEqual([obj["path"] for obj in self.index.region(low, high)], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
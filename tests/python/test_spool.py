@@ -0,0 +1,92 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import CommandSpool, NovaBlox, NovaBloxError
+
+
+class ScriptedClient:
+    """Stands in for NovaBlox.queue_commands, raising the queued errors first."""
+
+    def __init__(self, *errors) -> None:
+        self.codec = NovaBlox().codec
+        self.errors = list(errors)
+        self.batches = []
+
+    def queue_commands(self, commands):
+        if self.errors:
+            raise self.errors.pop(0)
+        self.batches.append(commands)
+        return {"command_ids": [f"cmd-{len(self.batches)}-{i}" for i in range(len(commands))]}
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+class CommandSpoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "spool.log")
+
+    def tearDown(self) -> None:
+        self.tmp.cleanup()
+
+    def test_recovers_unacknowledged_commands_after_a_crash(self) -> None:
+        down = ScriptedClient(*[NovaBloxError("Connection failed: refused")] * 1000)
+        spool = CommandSpool(down, self.path, retry_delay=0.01, idempotency_prefix="job")
+        for index in range(3):
+            spool.spawn_part(name=f"Part{index}")
+        self.assertTrue(spool.sync(timeout=5))
+        self.assertFalse(spool.close(timeout=0.05))
+        with open(self.path, "ab") as handle:
+            handle.write(b'{"seq": 4, "comm')  # torn write from the crash
+
+        with MockBridge() as bridge:
+            client = NovaBlox(port=bridge.port)
+            spool = CommandSpool(client, self.path, idempotency_prefix="job")
+            self.assertEqual(spool.stats["recovered"], 3)
+            self.assertTrue(spool.flush(timeout=5))
+            self.assertTrue(spool.close(timeout=5))
+            client.close()
+            self.assertEqual(len(bridge.queue.commands), 3)
+
+    def test_compaction_keeps_the_sequence_high_water_mark(self) -> None:
+        client = ScriptedClient()
+        spool = CommandSpool(client, self.path, compact_bytes=0, idempotency_prefix="job")
+        for index in range(3):
+            spool.spawn_part(name=f"Part{index}")
+        self.assertTrue(spool.flush(timeout=5))
+        wait_until(lambda: spool.snapshot()["compactions"] > 0)
+        spool.close(timeout=5)
+        with open(self.path, "rb") as handle:
+            records = [json.loads(line) for line in handle]
+        self.assertIn({"ack": 3}, records)
+
+        spool = CommandSpool(client, self.path, idempotency_prefix="job")
+        spool.spawn_part(name="Part3").result(timeout=5)
+        spool.close(timeout=5)
+        self.assertEqual(client.batches[-1][0]["idempotency_key"], "job-4")
+
+    def test_client_errors_are_dropped_and_server_errors_retried(self) -> None:
+        client = ScriptedClient(NovaBloxError("HTTP 503: busy", status=503), NovaBloxError("HTTP 422: bad", status=422))
+        with CommandSpool(client, self.path, retry_delay=0.01) as spool:
+            rejected = spool.spawn_part(name="Bad")
+            self.assertIsInstance(rejected.exception(timeout=5), NovaBloxError)
+            accepted = spool.spawn_part(name="Good")
+            self.assertEqual(accepted.result(timeout=5), "cmd-1-0")
+        self.assertEqual(spool.stats["retries"], 1)
+        self.assertEqual(spool.stats["rejected"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
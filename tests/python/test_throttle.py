@@ -0,0 +1,41 @@
+import time
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import NovaBlox, NovaBloxError, RateLimitThrottle
+
+
+class RateLimitThrottleTest(unittest.TestCase):
+    def test_paces_requests_instead_of_hitting_429(self) -> None:
+        with MockBridge(rate_limit_max=20, rate_limit_window_ms=1000) as bridge:
+            client = NovaBlox(port=bridge.port)
+            started = time.monotonic()
+            for index in range(30):
+                client.spawn_part(name=f"P{index}")
+            elapsed = time.monotonic() - started
+            client.close()
+        self.assertEqual(client.throttle.stats["rate_limited"], 0)
+        self.assertGreater(elapsed, 0.5)
+
+    def test_without_throttle_the_bridge_answers_429(self) -> None:
+        with MockBridge(rate_limit_max=5, rate_limit_window_ms=60000) as bridge:
+            client = NovaBlox(port=bridge.port, rate_limit=False)
+            with self.assertRaises(NovaBloxError) as caught:
+                for index in range(10):
+                    client.spawn_part(name=f"P{index}")
+            client.close()
+        self.assertEqual(caught.exception.status, 429)
+
+    def test_429_blocks_until_retry_after(self) -> None:
+        throttle = RateLimitThrottle()
+        throttle.reserve()
+        throttle.begin()
+        delay = throttle.observe(429, {"retry-after": "2", "x-ratelimit-limit": "10", "x-ratelimit-remaining": "0"})
+        self.assertEqual(delay, 2.0)
+        self.assertGreaterEqual(throttle.reserve(), 1.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
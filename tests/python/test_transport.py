@@ -0,0 +1,145 @@
+import asyncio
+import socket
+import socketserver
+import threading
+import time
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import AsyncHTTPConnectionPool, HTTPConnectionPool, NovaBlox
+
+
+class DroppingServer(socketserver.ThreadingTCPServer):
+    """Answers the first request on each connection, then drops the next one unanswered."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), DroppingHandler)
+        self.received = []
+        self.lock = threading.Lock()
+        self.close_after_response = False
+
+
+class DroppingHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        stream = self.request.makefile("rb")
+        served = 0
+        while True:
+            line = stream.readline()
+            if not line:
+                return
+            length = 0
+            while True:
+                header = stream.readline()
+                if header in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = header.decode("latin-1").partition(":")
+                if name.strip().lower() == "content-length":
+                    length = int(value.strip())
+            if length:
+                stream.read(length)
+            with self.server.lock:
+                self.server.received.append(line.decode("latin-1").split(" ")[0])
+            if served:
+                self.request.shutdown(socket.SHUT_RDWR)
+                return
+            served += 1
+            self.request.sendall(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: 2\r\n\r\n{}")
+            if self.server.close_after_response:
+                self.request.shutdown(socket.SHUT_WR)
+                return
+
+
+class PoolTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self.server = DroppingServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+        self.pool = HTTPConnectionPool("127.0.0.1", self.port, timeout=5.0)
+
+    def tearDown(self) -> None:
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class HTTPConnectionPoolTest(PoolTestCase):
+    def test_reuses_keep_alive_connections(self) -> None:
+        with MockBridge() as bridge:
+            pool = HTTPConnectionPool("127.0.0.1", bridge.port)
+            try:
+                for _ in range(3):
+                    self.assertEqual(pool.request("GET", "/bridge/health").status, 200)
+            finally:
+                pool.close()
+        self.assertEqual(pool.stats["opened"], 1)
+        self.assertEqual(pool.stats["reused"], 2)
+
+    def test_evicts_connection_closed_by_server(self) -> None:
+        self.server.close_after_response = True
+        self.pool.request("POST", "/bridge/command", body=b"{}")
+        time.sleep(0.05)  # let the FIN arrive before the socket is reused
+        self.pool.request("POST", "/bridge/command", body=b"{}")
+        self.assertEqual(self.pool.stats["evicted"], 1)
+        self.assertEqual(self.pool.stats["retried"], 0)
+        self.assertEqual(self.server.received, ["POST", "POST"])
+
+    def test_replays_idempotent_request_on_stale_connection(self) -> None:
+        self.pool.request("GET", "/bridge/health")
+        resp = self.pool.request("GET", "/bridge/health")
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(self.pool.stats["retried"], 1)
+        self.assertEqual(self.server.received, ["GET", "GET", "GET"])
+
+    def test_replays_post_with_idempotency_key(self) -> None:
+        self.pool.request("GET", "/bridge/health")
+        headers = {"X-Idempotency-Key": "abc"}
+        self.assertEqual(self.pool.request("POST", "/bridge/command", body=b"{}", headers=headers).status, 200)
+        self.assertEqual(self.pool.stats["retried"], 1)
+
+    def test_does_not_replay_plain_post_after_it_was_sent(self) -> None:
+        self.pool.request("GET", "/bridge/health")
+        with self.assertRaises(ConnectionError):
+            self.pool.request("POST", "/bridge/command", body=b"{}")
+        self.assertEqual(self.pool.stats["retried"], 0)
+        self.assertEqual(self.server.received, ["GET", "POST"])
+
+    def test_client_sends_body_idempotency_key_as_header(self) -> None:
+        client = NovaBlox(port=self.port, transport=self.pool)
+        client.transport.request("GET", "/bridge/health")
+        client._request("POST", "/command", {"route": "/scene/spawn-object", "idempotency_key": "k1"})
+        self.assertEqual(self.pool.stats["retried"], 1)
+
+
+class AsyncHTTPConnectionPoolTest(PoolTestCase):
+    def run_pool(self, *requests):
+        async def main():
+            pool = AsyncHTTPConnectionPool("127.0.0.1", self.port, timeout=5.0)
+            try:
+                statuses = []
+                for method, headers in requests:
+                    resp = await pool.request(method, "/bridge/command", body=b"{}", headers=headers)
+                    statuses.append(resp.status)
+                return pool.stats, statuses
+            finally:
+                await pool.close()
+
+        return asyncio.run(main())
+
+    def test_replays_post_with_idempotency_key(self) -> None:
+        stats, statuses = self.run_pool(("POST", {}), ("POST", {"X-Idempotency-Key": "abc"}))
+        self.assertEqual(statuses, [200, 200])
+        self.assertEqual(stats["retried"], 1)
+
+    def test_does_not_replay_plain_post_after_it_was_sent(self) -> None:
+        with self.assertRaises(ConnectionError):
+            self.run_pool(("POST", {}), ("POST", {}))
+        self.assertEqual(self.server.received, ["POST", "POST"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,52 @@
+import time
+import unittest
+
+import support  # noqa: F401
+
+from mock_bridge import MockBridge
+from novablox import NovaBlox, NovaBloxWorker
+
+
+class NovaBloxWorkerTest(unittest.TestCase):
+    def test_runs_handlers_and_reports_results(self) -> None:
+        with MockBridge() as bridge:
+            client = NovaBlox(port=bridge.port)
+            ids = [client.spawn_part(name=f"P{index}")["command_id"] for index in range(5)]
+            ids.append(client.set_lighting(brightness=2)["command_id"])
+            worker = NovaBloxWorker(client, wait_ms=200, result_flush_interval=0.01)
+
+            @worker.handler("spawn-object")
+            def spawn(command):
+                if command["payload"]["name"] == "P3":
+                    raise RuntimeError("no room")
+                return {"path": f"Workspace.{command['payload']['name']}"}
+
+            stats = worker.run(max_commands=6, duration=10)
+            statuses = client.command_statuses(ids, fields=None)
+            client.close()
+        self.assertEqual((stats["succeeded"], stats["failed"], stats["unsupported"]), (4, 1, 1))
+        self.assertEqual(statuses[ids[0]]["result"], {"path": "Workspace.P0"})
+        self.assertEqual(statuses[ids[3]]["status"], "failed")
+        self.assertEqual(statuses[ids[5]]["status"], "failed")
+
+    def test_requeues_commands_whose_lease_ran_out_in_the_pool_queue(self) -> None:
+        with MockBridge(lease_ms=600) as bridge:
+            client = NovaBlox(port=bridge.port)
+            ids = [client.spawn_part(name=f"P{index}")["command_id"] for index in range(2)]
+            worker = NovaBloxWorker(client, max_workers=1, lease_margin=0.3, result_flush_interval=0.01)
+
+            @worker.handler("spawn-object")
+            def spawn(command):
+                time.sleep(0.4)
+                return {"path": f"Workspace.{command['payload']['name']}"}
+
+            stats = worker.run(max_commands=2, duration=10)
+            statuses = client.command_statuses(ids, fields=None)
+            client.close()
+        self.assertEqual((stats["succeeded"], stats["lease_requeued"]), (2, 1))
+        self.assertEqual([statuses[cid]["status"] for cid in ids], ["succeeded", "succeeded"])
+        self.assertEqual([statuses[cid]["attempts"] for cid in ids], [1, 2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,8 +3,11 @@
 const test = require("node:test");
 const assert = require("node:assert/strict");
 const { spawn } = require("child_process");
+const crypto = require("crypto");
 const { once } = require("events");
+const fs = require("fs");
 const http = require("http");
+const os = require("os");
 const path = require("path");
 
 const REPO_ROOT = path.resolve(__dirname, "..");
@@ -514,6 +517,35 @@ test("scene introspection endpoint queues and caches latest snapshot", async ()
     assert.ok(
       Array.isArray(introspection.body.introspection.scene.sample_objects),
     );
+
+    const etag = introspection.headers.etag;
+    assert.ok(etag);
+    assert.equal(introspection.body.introspection.etag, etag);
+
+    const unchanged = await requestJson(
+      port,
+      "GET",
+      "/bridge/introspection/scene?include_objects=false",
+      {
+        apiKey: READ_KEY,
+        headers: { "If-None-Match": etag },
+      },
+    );
+    assert.equal(unchanged.statusCode, 304);
+    assert.equal(unchanged.raw, "");
+
+    const full = await requestJson(
+      port,
+      "GET",
+      "/bridge/introspection/scene",
+      {
+        apiKey: READ_KEY,
+        headers: { "If-None-Match": etag },
+      },
+    );
+    assert.equal(full.statusCode, 200);
+    assert.notEqual(full.headers.etag, etag);
+    assert.equal(full.body.introspection.scene.objects.length, 2);
   } finally {
     await server.stop();
     assert.equal(server.child.exitCode, 0, server.getStderr());
@@ -575,3 +607,94 @@ test("scene introspection queue normalizes traversal scope and services", async
     assert.equal(server.child.exitCode, 0, server.getStderr());
   }
 });
+
+test("import uploads are stored by content hash and reusable by digest", async () => {
+  const port = makePort(8);
+  const importDir = fs.mkdtempSync(path.join(os.tmpdir(), "novablox-test-"));
+  const server = startServer(port, { ROBLOXBRIDGE_IMPORT_DIR: importDir });
+  try {
+    await waitForServer(port);
+    const content = Buffer.from("v 0 0 0\nv 1 0 0\nv 0 1 0\nf 1 2 3\n");
+    const digest = crypto.createHash("sha256").update(content).digest("hex");
+    const base = `http://${HOST}:${port}`;
+
+    const missing = await requestJson(
+      port,
+      "GET",
+      `/bridge/asset/imports/${digest}?name=tri.obj`,
+      { apiKey: READ_KEY },
+    );
+    assert.equal(missing.statusCode, 200);
+    assert.equal(missing.body.exists, false);
+
+    const form = new FormData();
+    form.append("content_sha256", digest);
+    form.append("file", new Blob([content]), "tri.obj");
+    const uploaded = await fetch(`${base}/bridge/asset/import-model/upload`, {
+      method: "POST",
+      headers: { "X-API-Key": WRITE_KEY },
+      body: form,
+    });
+    assert.equal(uploaded.status, 200);
+    assert.equal((await uploaded.json()).status, "queued");
+
+    const found = await requestJson(
+      port,
+      "GET",
+      `/bridge/asset/imports/${digest}?name=tri.obj`,
+      { apiKey: READ_KEY },
+    );
+    assert.equal(found.body.exists, true);
+    assert.equal(found.body.bytes, content.length);
+    assert.equal(found.body.path, path.join(importDir, `${digest}.obj`));
+
+    const reused = await requestJson(
+      port,
+      "POST",
+      "/bridge/asset/import-model/upload",
+      {
+        apiKey: WRITE_KEY,
+        body: { content_sha256: digest, original_name: "tri.obj" },
+      },
+    );
+    assert.equal(reused.statusCode, 200);
+    assert.equal(reused.body.status, "queued");
+
+    const unknown = await requestJson(
+      port,
+      "POST",
+      "/bridge/asset/import-blender",
+      {
+        apiKey: WRITE_KEY,
+        body: { content_sha256: "0".repeat(64), original_name: "x.fbx" },
+      },
+    );
+    assert.equal(unknown.statusCode, 404);
+
+    const badForm = new FormData();
+    badForm.append("content_sha256", "f".repeat(64));
+    badForm.append("file", new Blob([content]), "tri.obj");
+    const mismatch = await fetch(`${base}/bridge/asset/import-model/upload`, {
+      method: "POST",
+      headers: { "X-API-Key": WRITE_KEY },
+      body: badForm,
+    });
+    assert.equal(mismatch.status, 400);
+
+    const pulled = await requestJson(
+      port,
+      "GET",
+      "/bridge/commands?client_id=import-test&limit=5",
+      { apiKey: WRITE_KEY },
+    );
+    assert.equal(pulled.body.count, 2);
+    for (const command of pulled.body.commands) {
+      assert.equal(command.payload.file_path, found.body.path);
+      assert.equal(command.payload.content_sha256, digest);
+    }
+    assert.deepEqual(fs.readdirSync(importDir), [`${digest}.obj`]);
+  } finally {
+    await server.stop();
+    fs.rmSync(importDir, { recursive: true, force: true });
+  }
+});